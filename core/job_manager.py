@@ -1,3 +1,4 @@
+import os
 import signal
 import sys
 import time
@@ -24,7 +25,13 @@ class JobManager:
         """Инициализация джобов"""
         self.jobs = {
             "notion_sync": NotionSyncJob(),
-            "reviews_parsing": ReviewsParsingJob(batch_size=10, max_reviews=100),
+            "reviews_parsing": ReviewsParsingJob(
+                batch_size=10,
+                max_reviews=100,
+                workers=int(os.getenv("REVIEWS_WORKERS", "1")),
+                # Ежедневный прогон: только отзывы новее уже сохраненных
+                incremental=True,
+            ),
             "nlp_processing": NLPProcessingJob(batch_size=50, force_reprocess=False),
         }
         logger.info(f"Инициализировано джобов: {len(self.jobs)}")
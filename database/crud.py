@@ -1,13 +1,25 @@
 import contextlib
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
-from sqlalchemy import and_
+from sqlalchemy import and_, func, or_, text
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from logger import logger
 
-from .models import Restaurant, Review
+from .models import (
+    Restaurant,
+    RestaurantHeaderState,
+    RestaurantScrapeState,
+    RestaurantScrollStats,
+    Review,
+    ScrapeMetric,
+    ScrapeQueueItem,
+    ScrapeRun,
+    ScrapeRunItem,
+    SuggestCacheEntry,
+)
 
 
 def create_restaurant(
@@ -103,6 +115,15 @@ def get_review_by_yandex_id(
     )
 
 
+def get_known_review_ids(db: Session, restaurant_id: int) -> set[str]:
+    rows = (
+        db.query(Review.yandex_review_id)
+        .filter(Review.restaurant_id == restaurant_id)
+        .all()
+    )
+    return {row[0] for row in rows}
+
+
 def get_reviews_by_restaurant(
     db: Session, restaurant_id: int, skip: int = 0, limit: int = 100
 ) -> list[Review]:
@@ -148,12 +169,67 @@ def get_reviews_stats(db: Session, restaurant_id: int) -> dict[str, Any]:
     }
 
 
+def _parse_review_date(date_raw: Any) -> datetime | None:
+    original_date = None
+    if date_raw and date_raw != "Дата не указана":
+        try:
+            cleaned = str(date_raw).strip()
+            if cleaned.endswith("Z"):
+                cleaned = cleaned[:-1] + "+00:00"
+            try:
+                original_date = datetime.fromisoformat(cleaned)
+            except ValueError:
+                if "." in cleaned:
+                    base, tail = cleaned.split(".", 1)
+                    tz_part = ""
+                    if "+" in tail:
+                        _, tz_part = tail.split("+", 1)
+                        tz_part = "+" + tz_part
+                    elif "-" in tail:
+                        _, tz_part = tail.split("-", 1)
+                        tz_part = "-" + tz_part
+                    else:
+                        pass
+                    cleaned2 = base + tz_part
+                    original_date = datetime.fromisoformat(cleaned2)
+                else:
+                    raise
+        except Exception:
+            for fmt in (
+                "%Y-%m-%dT%H:%M:%S%z",
+                "%Y-%m-%dT%H:%M:%S",
+                "%Y-%m-%d",
+                "%d.%m.%Y",
+            ):
+                try:
+                    original_date = datetime.strptime(cleaned, fmt)
+                    break
+                except Exception as e:
+                    logger.debug(f"Не удалось распарсить дату {cleaned} с форматом {fmt}: {e}")
+                    continue
+    return original_date
+
+
 def save_reviews_batch(
-    db: Session, restaurant_id: int, reviews_data: list[dict[str, Any]]
+    db: Session,
+    restaurant_id: int,
+    reviews_data: list[dict[str, Any]],
+    update_existing: bool = False,
 ) -> dict[str, int]:
+    """Сохранить отзывы ресторана, пропуская уже известные
+
+    Args:
+        db: сессия БД; новые отзывы коммитятся по одному в create_review
+        restaurant_id: id ресторана в БД
+        reviews_data: отзывы в виде build_review_data; уже сохраненные
+            определяются по yandex_review_id
+        update_existing: обновить поля уже сохраненных отзывов (upsert),
+            например при повторном разборе снимков страниц
+    """
     logger.info(f"Сохранение {len(reviews_data)} отзывов для ресторана {restaurant_id}")
     reviews_found = len(reviews_data)
     reviews_new = 0
+    reviews_updated = 0
 
     for review_data in reviews_data:
         yandex_review_id = review_data.get("yandex_review_id")
@@ -161,45 +237,6 @@ def save_reviews_batch(
         existing_review = get_review_by_yandex_id(db, restaurant_id, yandex_review_id)
 
         if not existing_review:
-            original_date = None
-            date_raw = review_data.get("date_iso")
-            if date_raw and date_raw != "Дата не указана":
-                try:
-                    cleaned = str(date_raw).strip()
-                    if cleaned.endswith("Z"):
-                        cleaned = cleaned[:-1] + "+00:00"
-                    try:
-                        original_date = datetime.fromisoformat(cleaned)
-                    except ValueError:
-                        if "." in cleaned:
-                            base, tail = cleaned.split(".", 1)
-                            tz_part = ""
-                            if "+" in tail:
-                                _, tz_part = tail.split("+", 1)
-                                tz_part = "+" + tz_part
-                            elif "-" in tail:
-                                _, tz_part = tail.split("-", 1)
-                                tz_part = "-" + tz_part
-                            else:
-                                pass
-                            cleaned2 = base + tz_part
-                            original_date = datetime.fromisoformat(cleaned2)
-                        else:
-                            raise
-                except Exception:
-                    for fmt in (
-                        "%Y-%m-%dT%H:%M:%S%z",
-                        "%Y-%m-%dT%H:%M:%S",
-                        "%Y-%m-%d",
-                        "%d.%m.%Y",
-                    ):
-                        try:
-                            original_date = datetime.strptime(cleaned, fmt)
-                            break
-                        except Exception as e:
-                            logger.debug(f"Не удалось распарсить дату {cleaned} с форматом {fmt}: {e}")
-                            continue
-
             create_review(
                 db=db,
                 restaurant_id=restaurant_id,
@@ -207,14 +244,41 @@ def save_reviews_batch(
                 author_name=review_data["author"],
                 rating=review_data["rating"],
                 comment_text=review_data["text"],
-                original_date=original_date,
+                original_date=_parse_review_date(review_data.get("date_iso")),
             )
             reviews_new += 1
+        elif update_existing and _update_review_fields(existing_review, review_data):
+            reviews_updated += 1
+
+    if reviews_updated:
+        db.commit()
 
     logger.success(
         f"Сохранено {reviews_new} новых отзывов из {reviews_found} найденных"
     )
-    return {"reviews_found": reviews_found, "reviews_new": reviews_new}
+    return {
+        "reviews_found": reviews_found,
+        "reviews_new": reviews_new,
+        "reviews_updated": reviews_updated,
+    }
+
+
+def _update_review_fields(review: Review, review_data: dict[str, Any]) -> bool:
+    changed = False
+    fields = {
+        "author_name": review_data["author"],
+        "rating": review_data["rating"],
+        "comment_text": review_data["text"],
+    }
+    original_date = _parse_review_date(review_data.get("date_iso"))
+    if original_date is not None:
+        fields["original_date"] = original_date
+
+    for field_name, new_value in fields.items():
+        if getattr(review, field_name) != new_value:
+            setattr(review, field_name, new_value)
+            changed = True
+    return changed
 
 
 def update_restaurant_rating(
@@ -310,3 +374,377 @@ def delete_restaurants_not_in_notion(
         with contextlib.suppress(Exception):
             db.rollback()
         raise
+
+
+def get_suggest_cache_entry(db: Session, cache_key: str) -> SuggestCacheEntry | None:
+    return (
+        db.query(SuggestCacheEntry)
+        .filter(SuggestCacheEntry.cache_key == cache_key)
+        .first()
+    )
+
+
+def upsert_suggest_cache_entry(
+    db: Session, cache_key: str, reviews_url: str | None, commit: bool = True
+) -> SuggestCacheEntry:
+    entry = get_suggest_cache_entry(db, cache_key)
+    if not entry:
+        entry = SuggestCacheEntry(cache_key=cache_key)
+        db.add(entry)
+    entry.reviews_url = reviews_url
+    entry.resolved_at = datetime.now(UTC)
+    if commit:
+        db.commit()
+    return entry
+
+
+def delete_suggest_cache_entry(db: Session, cache_key: str) -> bool:
+    """Удалить запись кэша (без коммита — вызывается внутри синхронизации)"""
+    deleted = (
+        db.query(SuggestCacheEntry)
+        .filter(SuggestCacheEntry.cache_key == cache_key)
+        .delete(synchronize_session=False)
+    )
+    return deleted > 0
+
+
+def get_scrape_states(
+    db: Session, restaurant_ids: list[int]
+) -> dict[int, RestaurantScrapeState]:
+    states = (
+        db.query(RestaurantScrapeState)
+        .filter(RestaurantScrapeState.restaurant_id.in_(restaurant_ids))
+        .all()
+    )
+    return {state.restaurant_id: state for state in states}
+
+
+def get_recent_review_counts(
+    db: Session, restaurant_ids: list[int], since: datetime
+) -> dict[int, int]:
+    """Число отзывов, опубликованных после since, по ресторанам"""
+    rows = (
+        db.query(Review.restaurant_id, func.count(Review.id))
+        .filter(
+            Review.restaurant_id.in_(restaurant_ids),
+            Review.original_date >= since,
+        )
+        .group_by(Review.restaurant_id)
+        .all()
+    )
+    return dict(rows)
+
+
+def record_scrape_attempt(
+    db: Session, restaurant_id: int, success: bool
+) -> RestaurantScrapeState:
+    state = db.get(RestaurantScrapeState, restaurant_id)
+    if not state:
+        state = RestaurantScrapeState(
+            restaurant_id=restaurant_id, consecutive_failures=0, total_failures=0
+        )
+        db.add(state)
+
+    now = datetime.now(UTC)
+    state.last_attempt_at = now
+    if success:
+        state.last_success_at = now
+        state.consecutive_failures = 0
+    else:
+        state.consecutive_failures += 1
+        state.total_failures += 1
+    db.commit()
+    return state
+
+
+def get_scroll_stats(db: Session, restaurant_id: int) -> RestaurantScrollStats | None:
+    return db.get(RestaurantScrollStats, restaurant_id)
+
+
+def update_scroll_stats(
+    db: Session,
+    restaurant_id: int,
+    scrolls: int,
+    cards_loaded: int,
+    smoothing: float = 0.5,
+) -> RestaurantScrollStats | None:
+    """Обновить среднее число карточек на прокрутку (экспоненциальное среднее)"""
+    if scrolls <= 0:
+        return None
+
+    cards_per_scroll = cards_loaded / scrolls
+    stats = db.get(RestaurantScrollStats, restaurant_id)
+    if not stats:
+        stats = RestaurantScrollStats(
+            restaurant_id=restaurant_id, cards_per_scroll=cards_per_scroll
+        )
+        db.add(stats)
+    else:
+        stats.cards_per_scroll = (
+            smoothing * cards_per_scroll + (1 - smoothing) * stats.cards_per_scroll
+        )
+
+    stats.last_scrolls = scrolls
+    stats.last_cards_loaded = cards_loaded
+    stats.updated_at = datetime.now(UTC)
+    db.commit()
+    return stats
+
+
+def get_header_state(db: Session, restaurant_id: int) -> RestaurantHeaderState | None:
+    return db.get(RestaurantHeaderState, restaurant_id)
+
+
+def save_header_state(
+    db: Session,
+    restaurant_id: int,
+    review_count: int | None,
+    rating: float | None,
+) -> RestaurantHeaderState:
+    now = datetime.now(UTC)
+    state = db.get(RestaurantHeaderState, restaurant_id)
+    if not state:
+        state = RestaurantHeaderState(restaurant_id=restaurant_id, changed_at=now)
+        db.add(state)
+    elif state.review_count != review_count or state.rating != rating:
+        state.changed_at = now
+
+    state.review_count = review_count
+    state.rating = rating
+    state.checked_at = now
+    db.commit()
+    return state
+
+
+def create_scrape_run(
+    db: Session, run_id: str, kind: str, notion_ids: list[str]
+) -> ScrapeRun:
+    """Создать прогон с очередью ресторанов; прежние незавершенные — abandoned"""
+    db.query(ScrapeRun).filter(
+        ScrapeRun.kind == kind, ScrapeRun.status == "running"
+    ).update({"status": "abandoned"}, synchronize_session=False)
+
+    run = ScrapeRun(
+        run_id=run_id,
+        kind=kind,
+        status="running",
+        total=len(notion_ids),
+        started_at=datetime.now(UTC),
+    )
+    run.items = [
+        ScrapeRunItem(notion_id=notion_id, position=position, status="pending")
+        for position, notion_id in enumerate(notion_ids)
+    ]
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def get_unfinished_scrape_run(db: Session, kind: str) -> ScrapeRun | None:
+    return (
+        db.query(ScrapeRun)
+        .filter(ScrapeRun.kind == kind, ScrapeRun.status == "running")
+        .order_by(ScrapeRun.started_at.desc())
+        .first()
+    )
+
+
+def get_pending_run_items(db: Session, run_pk: int) -> list[str]:
+    rows = (
+        db.query(ScrapeRunItem.notion_id)
+        .filter(
+            ScrapeRunItem.run_pk == run_pk,
+            # deferred — отложены по бюджету времени и не дошли до повторного прохода
+            ScrapeRunItem.status.in_(("pending", "deferred")),
+        )
+        .order_by(ScrapeRunItem.position)
+        .all()
+    )
+    return [row[0] for row in rows]
+
+
+def mark_run_item(db: Session, run_pk: int, notion_id: str, status: str) -> None:
+    db.query(ScrapeRunItem).filter(
+        ScrapeRunItem.run_pk == run_pk, ScrapeRunItem.notion_id == notion_id
+    ).update(
+        {"status": status, "finished_at": datetime.now(UTC)},
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def finish_scrape_run(db: Session, run_pk: int) -> None:
+    db.query(ScrapeRun).filter(ScrapeRun.id == run_pk).update(
+        {"status": "finished", "finished_at": datetime.now(UTC)},
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def save_scrape_metric(
+    db: Session,
+    restaurant_id: int,
+    run_id: str | None,
+    status: str,
+    fetch_path: str | None,
+    phases: dict[str, float],
+    waits: dict[str, float],
+    counts: dict[str, int],
+) -> ScrapeMetric:
+    metric = ScrapeMetric(
+        run_id=run_id,
+        restaurant_id=restaurant_id,
+        status=status,
+        fetch_path=fetch_path,
+        phases=phases,
+        waits=waits,
+        counts=counts,
+        created_at=datetime.now(UTC),
+    )
+    db.add(metric)
+    db.commit()
+    return metric
+
+
+def enqueue_scrape_items(db: Session, items: list[tuple[str, float]]) -> int:
+    """Добавить рестораны (notion_id, приоритет) в очередь, пропуская уже активные
+
+    Уникальный индекс по активным заданиям (queued, leased) и ON CONFLICT DO
+    NOTHING не дают двум одновременным постановкам добавить ресторан дважды.
+    """
+    priorities = dict(items)
+    if not priorities:
+        return 0
+
+    now = datetime.now(UTC)
+    statement = (
+        insert(ScrapeQueueItem)
+        .values(
+            [
+                {
+                    "notion_id": notion_id,
+                    "priority": priority,
+                    "status": "queued",
+                    "attempts": 0,
+                    "enqueued_at": now,
+                }
+                for notion_id, priority in priorities.items()
+            ]
+        )
+        .on_conflict_do_nothing(
+            index_elements=[ScrapeQueueItem.notion_id],
+            # Литерал, а не параметры: Postgres сопоставляет условие с индексом
+            index_where=text("status IN ('queued', 'leased')"),
+        )
+        .returning(ScrapeQueueItem.id)
+    )
+    added = len(db.execute(statement).all())
+    db.commit()
+    return added
+
+
+def claim_scrape_item(
+    db: Session, worker_id: str, lease_seconds: float, max_attempts: int
+) -> ScrapeQueueItem | None:
+    """Взять следующее задание: свободное или с истекшей арендой
+
+    Блокировка строки с SKIP LOCKED не дает двум воркерам взять одно задание.
+    """
+    now = datetime.now(UTC)
+    item = (
+        db.query(ScrapeQueueItem)
+        .filter(
+            ScrapeQueueItem.attempts < max_attempts,
+            or_(
+                ScrapeQueueItem.status == "queued",
+                and_(
+                    ScrapeQueueItem.status == "leased",
+                    ScrapeQueueItem.lease_expires_at < now,
+                ),
+            ),
+        )
+        .order_by(ScrapeQueueItem.priority.desc(), ScrapeQueueItem.id)
+        .with_for_update(skip_locked=True)
+        .limit(1)
+        .first()
+    )
+    if not item:
+        db.rollback()
+        return None
+
+    if item.status == "leased":
+        logger.warning(
+            f"Аренда задания {item.id} истекла у {item.leased_by}, забираем"
+        )
+    item.status = "leased"
+    item.leased_by = worker_id
+    item.attempts += 1
+    item.heartbeat_at = now
+    item.lease_expires_at = now + timedelta(seconds=lease_seconds)
+    db.commit()
+    return item
+
+
+def extend_scrape_lease(
+    db: Session, item_id: int, worker_id: str, lease_seconds: float
+) -> bool:
+    """Продлить аренду; False — задание уже забрал другой воркер"""
+    now = datetime.now(UTC)
+    updated = (
+        db.query(ScrapeQueueItem)
+        .filter(
+            ScrapeQueueItem.id == item_id,
+            ScrapeQueueItem.leased_by == worker_id,
+            ScrapeQueueItem.status == "leased",
+        )
+        .update(
+            {
+                "heartbeat_at": now,
+                "lease_expires_at": now + timedelta(seconds=lease_seconds),
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return updated > 0
+
+
+def complete_scrape_item(
+    db: Session,
+    item_id: int,
+    worker_id: str,
+    status: str,
+    error: str | None = None,
+) -> None:
+    """Завершить аренду: done, failed или queued (вернуть на повтор)"""
+    db.query(ScrapeQueueItem).filter(
+        ScrapeQueueItem.id == item_id, ScrapeQueueItem.leased_by == worker_id
+    ).update(
+        {
+            "status": status,
+            "finished_at": datetime.now(UTC) if status != "queued" else None,
+            "lease_expires_at": None,
+            "last_error": error,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+
+
+def fail_exhausted_scrape_items(db: Session, max_attempts: int) -> int:
+    """Пометить failed задания с истекшей арендой и исчерпанными попытками"""
+    updated = (
+        db.query(ScrapeQueueItem)
+        .filter(
+            ScrapeQueueItem.status == "leased",
+            ScrapeQueueItem.lease_expires_at < datetime.now(UTC),
+            ScrapeQueueItem.attempts >= max_attempts,
+        )
+        .update(
+            {"status": "failed", "last_error": "Аренда истекла, попытки исчерпаны"},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return updated
@@ -2,12 +2,14 @@ import datetime
 
 from sqlalchemy import (
     ARRAY,
+    JSON,
     Boolean,
     CheckConstraint,
     Column,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -66,6 +68,24 @@ class Restaurant(Base):
     reviews = relationship(
         "Review", back_populates="restaurant", cascade="all, delete-orphan"
     )
+    scrape_state = relationship(
+        "RestaurantScrapeState",
+        back_populates="restaurant",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
+    scroll_stats = relationship(
+        "RestaurantScrollStats",
+        back_populates="restaurant",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
+    header_state = relationship(
+        "RestaurantHeaderState",
+        back_populates="restaurant",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
 
     def __repr__(self):
         return f"<Restaurant(id={self.id}, name='{self.name}', city='{self.city}')>"
@@ -106,6 +126,207 @@ class Review(Base):
         )
 
 
+class RestaurantScrapeState(Base):
+    """История парсинга отзывов ресторана (для приоритизации прогонов)"""
+
+    __tablename__ = "restaurant_scrape_state"
+
+    restaurant_id = Column(
+        Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), primary_key=True
+    )
+    last_attempt_at = Column(DateTime(timezone=True))
+    last_success_at = Column(DateTime(timezone=True))
+    consecutive_failures = Column(Integer, nullable=False, default=0)
+    total_failures = Column(Integer, nullable=False, default=0)
+
+    restaurant = relationship("Restaurant", back_populates="scrape_state")
+
+    def __repr__(self):
+        return (
+            f"<RestaurantScrapeState(restaurant_id={self.restaurant_id}, "
+            f"consecutive_failures={self.consecutive_failures})>"
+        )
+
+
+class RestaurantScrollStats(Base):
+    """Сколько карточек отзывов подгружает одна прокрутка страницы ресторана
+
+    По cards_per_scroll следующий прогон сразу выбирает бюджет прокруток
+    под max_reviews.
+    """
+
+    __tablename__ = "restaurant_scroll_stats"
+
+    restaurant_id = Column(
+        Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), primary_key=True
+    )
+    cards_per_scroll = Column(Float, nullable=False)
+    last_scrolls = Column(Integer, nullable=False, default=0)
+    last_cards_loaded = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True))
+
+    restaurant = relationship("Restaurant", back_populates="scroll_stats")
+
+    def __repr__(self):
+        return (
+            f"<RestaurantScrollStats(restaurant_id={self.restaurant_id}, "
+            f"cards_per_scroll={self.cards_per_scroll:.1f})>"
+        )
+
+
+class RestaurantHeaderState(Base):
+    """Рейтинг и число отзывов из шапки места на момент последнего парсинга
+
+    Если при следующей загрузке страницы они не изменились, сортировка
+    и прокрутка отзывов пропускаются.
+    """
+
+    __tablename__ = "restaurant_header_state"
+
+    restaurant_id = Column(
+        Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), primary_key=True
+    )
+    review_count = Column(Integer)
+    rating = Column(Float)
+    checked_at = Column(DateTime(timezone=True))
+    changed_at = Column(DateTime(timezone=True))
+
+    restaurant = relationship("Restaurant", back_populates="header_state")
+
+    def __repr__(self):
+        return (
+            f"<RestaurantHeaderState(restaurant_id={self.restaurant_id}, "
+            f"review_count={self.review_count}, rating={self.rating})>"
+        )
+
+
+class ScrapeRun(Base):
+    """Прогон парсинга отзывов; незавершенный прогон можно продолжить"""
+
+    __tablename__ = "scrape_runs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(String, nullable=False)
+    kind = Column(String(20), nullable=False)
+    status = Column(String(20), nullable=False, default="running")
+    # running | finished | abandoned
+    total = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True))
+
+    items = relationship(
+        "ScrapeRunItem",
+        back_populates="run",
+        cascade="all, delete-orphan",
+        order_by="ScrapeRunItem.position",
+    )
+
+    def __repr__(self):
+        return f"<ScrapeRun(run_id='{self.run_id}', status='{self.status}')>"
+
+
+class ScrapeRunItem(Base):
+    __tablename__ = "scrape_run_items"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_pk = Column(
+        Integer, ForeignKey("scrape_runs.id", ondelete="CASCADE"), nullable=False
+    )
+    notion_id = Column(String, nullable=False)
+    position = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    # pending | success | warning | skipped | deferred | error
+    finished_at = Column(DateTime(timezone=True))
+
+    run = relationship("ScrapeRun", back_populates="items")
+
+    __table_args__ = (
+        UniqueConstraint("run_pk", "notion_id", name="unique_item_per_run"),
+    )
+
+    def __repr__(self):
+        return (
+            f"<ScrapeRunItem(run_pk={self.run_pk}, notion_id='{self.notion_id}', "
+            f"status='{self.status}')>"
+        )
+
+
+class ScrapeMetric(Base):
+    """Метрики парсинга одного ресторана: длительность фаз и счетчики"""
+
+    __tablename__ = "scrape_metrics"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    run_id = Column(String)
+    restaurant_id = Column(
+        Integer, ForeignKey("restaurants.id", ondelete="CASCADE"), nullable=False
+    )
+    status = Column(String(20))
+    fetch_path = Column(String(20))
+    phases = Column(JSON)  # фаза -> секунды
+    waits = Column(JSON)  # фаза -> секунды ожидания условий
+    counts = Column(JSON)  # прокрутки, карточки, байты страницы и сети
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<ScrapeMetric(run_id='{self.run_id}', "
+            f"restaurant_id={self.restaurant_id}, status='{self.status}')>"
+        )
+
+
+class ScrapeQueueItem(Base):
+    """Задание общей очереди парсинга для воркеров на разных узлах"""
+
+    __tablename__ = "scrape_queue"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    notion_id = Column(String, nullable=False)
+    priority = Column(Float, nullable=False, default=0)
+    status = Column(String(20), nullable=False, default="queued")
+    # queued | leased | done | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    leased_by = Column(String)
+    lease_expires_at = Column(DateTime(timezone=True))
+    heartbeat_at = Column(DateTime(timezone=True))
+    enqueued_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True))
+    last_error = Column(Text)
+
+    __table_args__ = (
+        # Ресторан в очереди или в работе не больше одного раза
+        Index(
+            "unique_active_scrape_item",
+            "notion_id",
+            unique=True,
+            postgresql_where=status.in_(("queued", "leased")),
+        ),
+    )
+
+    def __repr__(self):
+        return (
+            f"<ScrapeQueueItem(id={self.id}, notion_id='{self.notion_id}', "
+            f"status='{self.status}')>"
+        )
+
+
+class SuggestCacheEntry(Base):
+    """Результат поиска места через Yandex Suggest (reviews_url=None — не найдено)"""
+
+    __tablename__ = "suggest_cache"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    cache_key = Column(String, unique=True, nullable=False)
+    reviews_url = Column(String)
+    resolved_at = Column(DateTime(timezone=True), nullable=False)
+
+    def __repr__(self):
+        return (
+            f"<SuggestCacheEntry(cache_key='{self.cache_key}', "
+            f"found={self.reviews_url is not None})>"
+        )
+
+
 indexes = [
     "CREATE INDEX idx_reviews_restaurant_id ON reviews(restaurant_id);",
     "CREATE INDEX idx_restaurants_visited ON restaurants(visited);",
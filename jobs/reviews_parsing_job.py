@@ -7,17 +7,28 @@ from parsers.ya_maps_reviews_parser import fetch_reviews_for_all_restaurants
 class ReviewsParsingJob(BaseJob):
     """Джоб парсинга отзывов"""
 
-    def __init__(self, batch_size: int = 10, max_reviews: int = 100):
+    def __init__(
+        self,
+        batch_size: int = 10,
+        max_reviews: int = 100,
+        workers: int = 1,
+        incremental: bool = False,
+    ):
         super().__init__("reviews_parsing")
         self.batch_size = batch_size
         self.max_reviews = max_reviews
+        self.workers = workers
+        self.incremental = incremental
 
     def execute(self) -> dict[str, Any]:
         """Выполнить парсинг отзывов"""
         self.logger.info(f"Начинаем парсинг отзывов (пачки по {self.batch_size})...")
 
         result = fetch_reviews_for_all_restaurants(
-            max_reviews=self.max_reviews, scroll_attempts=5
+            max_reviews=self.max_reviews,
+            scroll_attempts=5,
+            workers=self.workers,
+            incremental=self.incremental,
         )
 
         self.logger.info(f"Парсинг завершен: {result}")
@@ -10,8 +10,13 @@ import click
 from core.job_manager import get_job_manager
 from database.database import init_db as db_init_db
 from logger import logger
+from parsers.browser_tabs import BROWSER_TABS
 from parsers.notion_data import sync_notion_data
-from parsers.ya_maps_reviews_parser import fetch_reviews_for_all_restaurants
+from parsers.resource_blocking import BLOCKING_PROFILES, SCRAPER_BLOCKING_PROFILE
+from parsers.ya_maps_reviews_parser import (
+    SAVE_SNAPSHOTS,
+    fetch_reviews_for_all_restaurants,
+)
 
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
@@ -84,10 +89,26 @@ def run_init_db() -> None:
         logger.error(f"Ошибка инициализации БД: {e}")
 
 
-def run_reviews_parsing(limit_restaurants: int | None = 50) -> None:
+def run_reviews_parsing(
+    limit_restaurants: int | None = 50,
+    workers: int = 1,
+    incremental: bool = False,
+    save_snapshots: bool = SAVE_SNAPSHOTS,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+    resume: bool = False,
+    tabs: int = BROWSER_TABS,
+) -> None:
     """Парсинг отзывов с Яндекс.Карт"""
     try:
-        result = fetch_reviews_for_all_restaurants(limit_restaurants=limit_restaurants)
+        result = fetch_reviews_for_all_restaurants(
+            limit_restaurants=limit_restaurants,
+            workers=workers,
+            incremental=incremental,
+            save_snapshots=save_snapshots,
+            blocking_profile=blocking_profile,
+            resume=resume,
+            tabs=tabs,
+        )
 
         if result.get("success"):
             logger.success("Парсинг завершен")
@@ -98,6 +119,161 @@ def run_reviews_parsing(limit_restaurants: int | None = 50) -> None:
         logger.error(f"Ошибка: {e}")
 
 
+def run_reviews_queue_worker(
+    enqueue: bool = False,
+    limit_restaurants: int | None = None,
+    incremental: bool = False,
+    worker_id: str | None = None,
+    exit_when_empty: bool = False,
+    save_snapshots: bool = SAVE_SNAPSHOTS,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+) -> None:
+    """Воркер общей очереди парсинга отзывов"""
+    try:
+        from parsers.ya_maps_reviews_parser import (
+            enqueue_restaurants_for_scraping,
+        )
+        from parsers.ya_maps_reviews_parser import (
+            run_reviews_queue_worker as run_worker,
+        )
+
+        if enqueue:
+            enqueue_restaurants_for_scraping(limit_restaurants=limit_restaurants)
+
+        result = run_worker(
+            incremental=incremental,
+            save_snapshots=save_snapshots,
+            blocking_profile=blocking_profile,
+            worker_id=worker_id,
+            exit_when_empty=exit_when_empty,
+        )
+
+        if result.get("success"):
+            logger.success("Воркер очереди завершил работу")
+        else:
+            logger.error(f"Ошибка: {result.get('error', 'Неизвестная ошибка')}")
+
+    except Exception as e:
+        logger.error(f"Ошибка: {e}")
+
+
+def run_reparse(
+    notion_id: str | None = None, run_id: str | None = None, workers: int = 4
+) -> None:
+    """Повторный разбор сохраненных снимков страниц без браузера"""
+    try:
+        from parsers.reviews_reparse import reparse_snapshots
+
+        result = reparse_snapshots(notion_id=notion_id, run_id=run_id, workers=workers)
+
+        if result.get("success"):
+            logger.success("Повторный разбор завершен")
+        else:
+            logger.error(f"Ошибка: {result.get('error', 'Неизвестная ошибка')}")
+
+    except Exception as e:
+        logger.error(f"Ошибка: {e}")
+
+
+def run_scraper_benchmark(
+    fixtures_dir: str | None = None,
+    max_reviews: int | None = None,
+    repeat: int = 1,
+    database_url: str | None = None,
+    browser: bool = True,
+    export_snapshots: bool = False,
+    output: str | None = None,
+    baseline: str | None = None,
+    tolerance: float | None = None,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+) -> bool:
+    """Бенчмарк парсера на записанных страницах; False — ошибка или регрессия"""
+    try:
+        from scripts.bench_scraper import (
+            BENCH_FIXTURES_DIR,
+            BENCH_TOLERANCE,
+            DEFAULT_MAX_REVIEWS,
+            export_snapshot_fixtures,
+            log_results,
+            run_benchmark,
+            save_and_compare,
+        )
+
+        fixtures_dir = fixtures_dir or BENCH_FIXTURES_DIR
+        if export_snapshots:
+            export_snapshot_fixtures(fixtures_dir)
+
+        result = run_benchmark(
+            fixtures_dir,
+            max_reviews or DEFAULT_MAX_REVIEWS,
+            repeat,
+            database_url,
+            blocking_profile=blocking_profile,
+            browser=browser,
+        )
+        if not result.get("success"):
+            logger.error(f"Ошибка: {result.get('error', 'Неизвестная ошибка')}")
+            return False
+
+        log_results(result)
+        regressions = save_and_compare(
+            result, output, baseline, tolerance if tolerance is not None else BENCH_TOLERANCE
+        )
+        return not regressions
+
+    except Exception as e:
+        logger.error(f"Ошибка: {e}")
+        return False
+
+
+def run_tabs_benchmark(
+    concurrency: int = 4,
+    fixtures_dir: str | None = None,
+    max_reviews: int | None = None,
+    repeat: int = 1,
+    output: str | None = None,
+    baseline: str | None = None,
+    tolerance: float | None = None,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+) -> bool:
+    """Вкладки одного браузера против браузера на ресторан"""
+    try:
+        from scripts.bench_scraper import (
+            BENCH_FIXTURES_DIR,
+            BENCH_TOLERANCE,
+            CONCURRENCY_METRICS,
+            DEFAULT_MAX_REVIEWS,
+            log_concurrency_results,
+            run_concurrency_benchmark,
+            save_and_compare,
+        )
+
+        result = run_concurrency_benchmark(
+            fixtures_dir or BENCH_FIXTURES_DIR,
+            concurrency,
+            max_reviews or DEFAULT_MAX_REVIEWS,
+            repeat,
+            blocking_profile,
+        )
+        if not result.get("success"):
+            logger.error(f"Ошибка: {result.get('error', 'Неизвестная ошибка')}")
+            return False
+
+        log_concurrency_results(result)
+        regressions = save_and_compare(
+            result,
+            output,
+            baseline,
+            tolerance if tolerance is not None else BENCH_TOLERANCE,
+            CONCURRENCY_METRICS,
+        )
+        return not regressions
+
+    except Exception as e:
+        logger.error(f"Ошибка: {e}")
+        return False
+
+
 def run_nlp_processing() -> None:
     """NLP обработка отзывов"""
     try:
@@ -129,8 +305,12 @@ def run_failed_restaurants_check(limit_restaurants: int | None = 20) -> None:
         logger.error(f"Ошибка: {e}")
 
 
-def run_initial_full_cycle() -> None:
-    """Запускает полный первоначальный цикл для всех ресторанов"""
+def run_initial_full_cycle(resume: bool = False) -> None:
+    """Запускает полный первоначальный цикл для всех ресторанов
+
+    Args:
+        resume: продолжить прерванный парсинг отзывов вместо нового прогона
+    """
     logger.info("Запуск полного первоначального цикла...")
     logger.info("Обрабатываются ВСЕ рестораны без ограничений")
 
@@ -145,7 +325,7 @@ def run_initial_full_cycle() -> None:
         logger.info("\n" + "=" * 60)
         logger.info("ЭТАП 2/4: Парсинг отзывов для всех ресторанов")
         logger.info("=" * 60)
-        run_reviews_parsing(limit_restaurants=None)  # Без лимита
+        run_reviews_parsing(limit_restaurants=None, resume=resume)  # Без лимита
 
         # Этап 3: NLP обработка
         logger.info("\n" + "=" * 60)
@@ -254,10 +434,141 @@ def cli(ctx):
 
 @cli.command()
 @click.option("--limit", "-l", type=int, help="Ограничить количество обрабатываемых ресторанов")
-def reviews(limit):
+@click.option("--workers", "-w", type=click.IntRange(min=1), default=1, help="Количество параллельных браузеров")
+@click.option("--tabs", "-t", type=click.IntRange(min=1), default=BROWSER_TABS, help="Сколько ресторанов каждый браузер парсит одновременно во вкладках")
+@click.option("--incremental", is_flag=True, help="Собирать только новые отзывы, останавливаясь на уже сохраненных")
+@click.option("--snapshots", is_flag=True, help="Сохранять HTML страниц для повторного разбора")
+@click.option(
+    "--block-resources",
+    type=click.Choice(list(BLOCKING_PROFILES)),
+    default=SCRAPER_BLOCKING_PROFILE,
+    show_default=True,
+    help="Профиль блокировки картинок, тайлов и трекеров в браузере",
+)
+@click.option("--resume", is_flag=True, help="Продолжить последний незавершенный прогон")
+def reviews(limit, workers, tabs, incremental, snapshots, block_resources, resume):
     """Парсить отзывы из Яндекс.Карт"""
     click.echo(click.style("🍽️  Парсинг отзывов из Яндекс.Карт", fg="blue", bold=True))
-    run_reviews_parsing(limit_restaurants=limit)
+    run_reviews_parsing(
+        limit_restaurants=limit,
+        workers=workers,
+        tabs=tabs,
+        incremental=incremental,
+        save_snapshots=snapshots or SAVE_SNAPSHOTS,
+        blocking_profile=block_resources,
+        resume=resume,
+    )
+
+
+@cli.command()
+@click.option("--enqueue", is_flag=True, help="Перед запуском поставить рестораны в очередь")
+@click.option("--limit", "-l", type=int, help="Ограничить количество ставящихся в очередь ресторанов")
+@click.option("--incremental", is_flag=True, help="Собирать только новые отзывы, останавливаясь на уже сохраненных")
+@click.option("--snapshots", is_flag=True, help="Сохранять HTML страниц для повторного разбора")
+@click.option(
+    "--block-resources",
+    type=click.Choice(list(BLOCKING_PROFILES)),
+    default=SCRAPER_BLOCKING_PROFILE,
+    show_default=True,
+    help="Профиль блокировки картинок, тайлов и трекеров в браузере",
+)
+@click.option("--worker-id", help="Идентификатор воркера (по умолчанию хост:pid)")
+@click.option("--exit-when-empty", is_flag=True, help="Завершиться, когда очередь опустеет")
+def reviews_worker(enqueue, limit, incremental, snapshots, block_resources, worker_id, exit_when_empty):
+    """Воркер общей очереди парсинга (можно запускать на нескольких узлах)"""
+    click.echo(click.style("🧵 Воркер очереди парсинга отзывов", fg="blue", bold=True))
+    run_reviews_queue_worker(
+        enqueue=enqueue,
+        limit_restaurants=limit,
+        incremental=incremental,
+        save_snapshots=snapshots or SAVE_SNAPSHOTS,
+        blocking_profile=block_resources,
+        worker_id=worker_id,
+        exit_when_empty=exit_when_empty,
+    )
+
+
+@cli.command()
+@click.option("--notion-id", help="Разобрать снимки только одного ресторана")
+@click.option("--run-id", help="Разобрать снимки конкретного прогона (по умолчанию последние)")
+@click.option("--workers", "-w", type=click.IntRange(min=1), default=4, help="Количество процессов разбора")
+def reparse(notion_id, run_id, workers):
+    """Повторно извлечь отзывы из сохраненных снимков страниц"""
+    click.echo(click.style("♻️  Повторный разбор снимков страниц", fg="blue", bold=True))
+    run_reparse(notion_id=notion_id, run_id=run_id, workers=workers)
+
+
+@cli.group()
+def bench():
+    """Бенчмарки производительности парсинга"""
+
+
+@bench.command("scraper")
+@click.option("--fixtures", help="Каталог записанных страниц <business_id>/page.html (по умолчанию BENCH_FIXTURES_DIR)")
+@click.option("--max-reviews", type=int, help="Максимум отзывов на страницу")
+@click.option("--repeat", type=click.IntRange(min=1), default=1, help="Сколько раз пройти по всем фикстурам")
+@click.option("--database-url", help="Отдельная БД для замера записи отзывов (рабочую не указывать)")
+@click.option("--no-browser", is_flag=True, help="Только разбор и запись, без headless Chromium")
+@click.option("--export-snapshots", is_flag=True, help="Перед замером разложить снимки страниц в фикстуры")
+@click.option("--output", "-o", help="Сохранить результаты в JSON")
+@click.option("--baseline", help="JSON прошлого замера: при регрессии код выхода 1")
+@click.option("--tolerance", type=float, help="Допустимое падение метрик относительно базового замера (доля)")
+@click.option(
+    "--block-resources",
+    type=click.Choice(list(BLOCKING_PROFILES)),
+    default=SCRAPER_BLOCKING_PROFILE,
+    show_default=True,
+    help="Профиль блокировки картинок, тайлов и трекеров в браузере",
+)
+def bench_scraper(fixtures, max_reviews, repeat, database_url, no_browser, export_snapshots, output, baseline, tolerance, block_resources):
+    """Пропускная способность парсера на записанных страницах"""
+    click.echo(click.style("⏱️  Бенчмарк парсера отзывов", fg="blue", bold=True))
+    ok = run_scraper_benchmark(
+        fixtures_dir=fixtures,
+        max_reviews=max_reviews,
+        repeat=repeat,
+        database_url=database_url,
+        browser=not no_browser,
+        export_snapshots=export_snapshots,
+        output=output,
+        baseline=baseline,
+        tolerance=tolerance,
+        blocking_profile=block_resources,
+    )
+    if not ok:
+        sys.exit(1)
+
+
+@bench.command("tabs")
+@click.option("--concurrency", "-c", type=click.IntRange(min=1), default=4, help="Ресторанов одновременно: вкладок или браузеров")
+@click.option("--fixtures", help="Каталог записанных страниц <business_id>/page.html (по умолчанию BENCH_FIXTURES_DIR)")
+@click.option("--max-reviews", type=int, help="Максимум отзывов на страницу")
+@click.option("--repeat", type=click.IntRange(min=1), default=1, help="Сколько раз пройти по всем фикстурам")
+@click.option("--output", "-o", help="Сохранить результаты в JSON")
+@click.option("--baseline", help="JSON прошлого замера: при регрессии код выхода 1")
+@click.option("--tolerance", type=float, help="Допустимое падение метрик относительно базового замера (доля)")
+@click.option(
+    "--block-resources",
+    type=click.Choice(list(BLOCKING_PROFILES)),
+    default=SCRAPER_BLOCKING_PROFILE,
+    show_default=True,
+    help="Профиль блокировки картинок, тайлов и трекеров в браузере",
+)
+def bench_tabs(concurrency, fixtures, max_reviews, repeat, output, baseline, tolerance, block_resources):
+    """Ресторанов/мин на ГБ памяти: вкладки одного браузера против браузера на ресторан"""
+    click.echo(click.style("🗂️  Бенчмарк режима вкладок", fg="blue", bold=True))
+    ok = run_tabs_benchmark(
+        concurrency=concurrency,
+        fixtures_dir=fixtures,
+        max_reviews=max_reviews,
+        repeat=repeat,
+        output=output,
+        baseline=baseline,
+        tolerance=tolerance,
+        blocking_profile=block_resources,
+    )
+    if not ok:
+        sys.exit(1)
 
 
 @cli.command()
@@ -304,10 +615,11 @@ def full():
 
 
 @cli.command()
-def initial():
+@click.option("--resume", is_flag=True, help="Продолжить прерванный парсинг отзывов")
+def initial(resume):
     """Полный первоначальный прогон для всех ресторанов + планировщик"""
     click.echo(click.style("🎯 Полный первоначальный прогон для всех ресторанов + планировщик", fg="bright_yellow", bold=True))
-    run_initial_full_cycle()
+    run_initial_full_cycle(resume=resume)
 
 
 if __name__ == "__main__":
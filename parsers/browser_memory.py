@@ -0,0 +1,91 @@
+import os
+import threading
+
+from selenium import webdriver
+
+from logger import logger
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+# Порог памяти дерева процессов браузера, после которого драйвер пересоздается
+DRIVER_MEMORY_LIMIT_MB = float(os.getenv("DRIVER_MEMORY_LIMIT_MB", "1500"))
+MEMORY_SAMPLE_INTERVAL = float(os.getenv("MEMORY_SAMPLE_INTERVAL", "1"))
+
+
+def browser_memory_mb(driver: webdriver.Chrome) -> float | None:
+    """RSS chromedriver и всех дочерних процессов Chrome, МБ
+
+    None, если psutil не установлен или процесс недоступен.
+    """
+    if not PSUTIL_AVAILABLE:
+        return None
+
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root, *root.children(recursive=True)]
+    except (AttributeError, psutil.Error):
+        return None
+
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            continue
+    return total / (1024 * 1024)
+
+
+class MemoryWatchdog:
+    """Фоновый замер памяти браузера во время парсинга одного ресторана
+
+    Хранит пиковое значение (peak_mb), чтобы в логах и метриках было видно,
+    сколько памяти требует страница, даже если к концу она освободилась.
+    """
+
+    def __init__(
+        self, driver: webdriver.Chrome, interval: float = MEMORY_SAMPLE_INTERVAL
+    ):
+        self.driver = driver
+        self.interval = interval
+        self.peak_mb: float | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self) -> None:
+        if not PSUTIL_AVAILABLE:
+            logger.debug("psutil не установлен, память браузера не отслеживается")
+            return
+        self.sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> float | None:
+        """Остановить замеры и вернуть пик памяти, МБ"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2)
+            self._thread = None
+            self.sample()
+        return self.peak_mb
+
+    def sample(self) -> float | None:
+        memory_mb = browser_memory_mb(self.driver)
+        if memory_mb is not None and (self.peak_mb is None or memory_mb > self.peak_mb):
+            self.peak_mb = memory_mb
+        return memory_mb
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
@@ -0,0 +1,308 @@
+from collections.abc import Callable
+import json
+import os
+import threading
+import time
+from typing import Any
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.remote.command import Command
+
+from logger import logger
+from parsers.browser_memory import DRIVER_MEMORY_LIMIT_MB, browser_memory_mb
+from parsers.driver_pool import DRIVER_POOL_MAX_PAGES
+
+# Сколько ресторанов одновременно парсится во вкладках одного Chrome
+BROWSER_TABS = int(os.getenv("BROWSER_TABS", "1"))
+# Таймаут загрузки страницы во вкладке, если вызывающий код не задал свой
+TAB_PAGE_LOAD_TIMEOUT = 30.0
+TAB_POLL_INTERVAL = 0.1
+
+# Фоновые вкладки не должны притормаживаться: таймеры, отрисовка
+# и подгрузка отзывов в них идут так же, как в активной
+TAB_BROWSER_OPTIONS = (
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+)
+
+PAGE_LOADED_JS = (
+    'return document.readyState === "complete" && location.href !== "about:blank";'
+)
+
+
+def configure_tab_options(options: webdriver.ChromeOptions) -> None:
+    """Настройки Chrome для режима вкладок"""
+    for option in TAB_BROWSER_OPTIONS:
+        options.add_argument(option)
+    # driver.get не ждет загрузки: ожидание идет опросом, не занимая браузер
+    options.page_load_strategy = "none"
+
+
+def _target_id(handle: str) -> str:
+    """Window handle chromedriver -> id цели DevTools (поле webview в логе)"""
+    return handle.removeprefix("CDwindow-").upper()
+
+
+class _SharedBrowser:
+    """Один Chrome на несколько потоков, у каждого потока своя вкладка
+
+    Все команды WebDriver, в том числе команды элементов и CDP, проходят через
+    driver.execute. Здесь он подменяется: команда выполняется под общей
+    блокировкой после переключения на вкладку текущего потока. Между командами
+    блокировка свободна, поэтому пока одна вкладка ждет (WebDriverWait, опрос
+    загрузки, паузы), команды выполняют другие.
+    """
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        # Первая вкладка не закрывается, иначе завершится сессия
+        self.home = driver.current_window_handle
+        self._execute = driver.execute
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._current = self.home
+        # Лог производительности общий на сессию — раскладываем по вкладкам
+        self._logs: dict[str, list[dict[str, Any]]] = {}
+
+        driver.execute = self._execute_in_tab
+        driver.get = self._get
+        driver.set_page_load_timeout = self._set_page_load_timeout
+
+    @property
+    def handle(self) -> str | None:
+        return getattr(self._local, "handle", None)
+
+    def open_tab(self) -> str:
+        with self._lock:
+            response = self._execute(Command.NEW_WINDOW, {"type": "tab"})
+            handle = response["value"]["handle"]
+            self._logs[_target_id(handle)] = []
+        self._local.handle = handle
+        self._local.page_load_timeout = TAB_PAGE_LOAD_TIMEOUT
+
+        try:
+            # Страница считает себя в фокусе, даже когда вкладка не активна
+            self.driver.execute_cdp_cmd(
+                "Emulation.setFocusEmulationEnabled", {"enabled": True}
+            )
+        except Exception as e:
+            logger.debug(f"Эмуляция фокуса недоступна: {e}")
+        return handle
+
+    def close_tab(self) -> None:
+        handle = self.handle
+        self._local.handle = None
+        if handle is None:
+            return
+
+        with self._lock:
+            self._logs.pop(_target_id(handle), None)
+            self._switch(handle)
+            try:
+                self._execute(Command.CLOSE)
+            finally:
+                self._switch(self.home)
+
+    def ping(self) -> None:
+        """Проверить, что сам браузер отвечает (исключение — сессия потеряна)"""
+        with self._lock:
+            self._execute(Command.W3C_GET_WINDOW_HANDLES)
+
+    def _switch(self, handle: str) -> None:
+        if handle != self._current:
+            self._execute(Command.SWITCH_TO_WINDOW, {"handle": handle})
+            self._current = handle
+
+    def _execute_in_tab(
+        self, driver_command: str, params: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        handle = self.handle
+        with self._lock:
+            if handle is None or driver_command == Command.QUIT:
+                return self._execute(driver_command, params)
+            self._switch(handle)
+            if (
+                driver_command == Command.GET_LOG
+                and (params or {}).get("type") == "performance"
+            ):
+                return {"value": self._read_performance_log(handle)}
+            return self._execute(driver_command, params)
+
+    def _read_performance_log(self, handle: str) -> list[dict[str, Any]]:
+        response = self._execute(Command.GET_LOG, {"type": "performance"})
+        for entry in response["value"]:
+            try:
+                webview = json.loads(entry["message"]).get("webview") or ""
+            except (KeyError, ValueError):
+                continue
+            buffer = self._logs.get(webview.upper())
+            if buffer is not None:
+                buffer.append(entry)
+
+        target_id = _target_id(handle)
+        entries = self._logs.get(target_id, [])
+        self._logs[target_id] = []
+        return entries
+
+    def _get(self, url: str) -> None:
+        """Начать загрузку и дождаться ее опросом, не удерживая браузер"""
+        self._execute_in_tab(Command.GET, {"url": url})
+        timeout = getattr(self._local, "page_load_timeout", TAB_PAGE_LOAD_TIMEOUT)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if self.driver.execute_script(PAGE_LOADED_JS):
+                    return
+            except Exception as e:
+                # Документ может смениться прямо во время проверки
+                logger.debug(f"Проверка загрузки вкладки: {e}")
+            if time.monotonic() >= deadline:
+                raise TimeoutException(f"Страница не загрузилась за {timeout:.0f}с")
+            time.sleep(TAB_POLL_INTERVAL)
+
+    def _set_page_load_timeout(self, time_to_wait: float) -> None:
+        # Таймаут сессии общий для вкладок, поэтому храним его для потока
+        self._local.page_load_timeout = time_to_wait
+
+    def quit(self) -> None:
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"Ошибка при закрытии драйвера: {e}")
+
+
+class TabPool:
+    """Вкладки одного Chrome с интерфейсом DriverPool
+
+    acquire() открывает вкладку для текущего потока и возвращает общий драйвер,
+    команды которого с этого потока идут в эту вкладку; release() закрывает ее.
+    Сбой страницы браузер не перезапускает, если он отвечает: вкладка
+    закрывается, и следующей странице открывается новая. После max_pages
+    страниц, превышения memory_limit_mb или ошибки самого браузера новые
+    вкладки не выдаются, пока не вернутся текущие, и браузер пересоздается.
+    """
+
+    def __init__(
+        self,
+        driver_factory: Callable[[], webdriver.Chrome],
+        size: int = BROWSER_TABS,
+        max_pages: int | None = None,
+        memory_limit_mb: float | None = DRIVER_MEMORY_LIMIT_MB,
+        on_new_tab: Callable[[webdriver.Chrome], Any] | None = None,
+    ):
+        self.driver_factory = driver_factory
+        self.size = max(1, size)
+        # Страниц на браузер: как у DriverPool, но на все вкладки сразу
+        self.max_pages = max(1, max_pages or DRIVER_POOL_MAX_PAGES * self.size)
+        self.memory_limit_mb = memory_limit_mb
+        self.on_new_tab = on_new_tab
+
+        self._browser: _SharedBrowser | None = None
+        self._in_use = 0
+        self._pages = 0
+        self._recycle = False
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def acquire(self) -> webdriver.Chrome:
+        """Открыть вкладку для текущего потока (при необходимости запустив Chrome)"""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Пул вкладок закрыт")
+                if not self._recycle and self._in_use < self.size:
+                    break
+                self._condition.wait()
+
+            if self._browser is None:
+                self._browser = _SharedBrowser(self.driver_factory())
+                logger.debug(f"Запущен браузер на {self.size} вкладок")
+            self._in_use += 1
+            browser = self._browser
+
+        try:
+            browser.open_tab()
+            if self.on_new_tab:
+                self.on_new_tab(browser.driver)
+        except Exception:
+            self._return_tab(browser, reason="не удалось открыть вкладку")
+            raise
+        return browser.driver
+
+    def release(
+        self,
+        driver: webdriver.Chrome,
+        broken: bool = False,
+        memory_mb: float | None = None,
+    ) -> None:
+        """Закрыть вкладку текущего потока
+
+        Следующий acquire() откроет вместо нее новую вкладку.
+
+        Args:
+            driver: драйвер, выданный acquire()
+            broken: страница завершилась сбоем; вкладка закрывается, а если
+                не отвечает и сам браузер, он пересоздается
+            memory_mb: пик памяти всего браузера за страницу; если не передан,
+                память замеряется при возврате
+        """
+        browser = self._browser
+        if browser is None or browser.driver is not driver:
+            return
+
+        reason = None
+        try:
+            browser.close_tab()
+            if broken:
+                browser.ping()
+        except Exception as e:
+            logger.warning(f"Не удалось закрыть вкладку: {e}")
+            reason = "ошибка браузера"
+
+        if reason is None and self.memory_limit_mb:
+            if memory_mb is None:
+                memory_mb = browser_memory_mb(driver)
+            if memory_mb is not None and memory_mb > self.memory_limit_mb:
+                reason = f"память {memory_mb:.0f} МБ > {self.memory_limit_mb:.0f} МБ"
+
+        self._return_tab(browser, reason, page_done=True)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            if self._in_use == 0:
+                self._quit_browser()
+            self._condition.notify_all()
+
+    def _return_tab(
+        self, browser: _SharedBrowser, reason: str | None, page_done: bool = False
+    ) -> None:
+        with self._condition:
+            self._in_use -= 1
+            if page_done:
+                self._pages += 1
+                if reason is None and self._pages >= self.max_pages:
+                    reason = f"{self._pages} страниц"
+            if reason and not self._recycle and browser is self._browser:
+                logger.debug(f"Браузер вкладок будет пересоздан ({reason})")
+                self._recycle = True
+
+            if (self._recycle or self._closed) and self._in_use == 0:
+                self._quit_browser()
+            self._condition.notify_all()
+
+    def _quit_browser(self) -> None:
+        """Вызывается под self._condition, когда открытых вкладок нет"""
+        if self._browser is not None:
+            self._browser.quit()
+        self._browser = None
+        self._pages = 0
+        self._recycle = False
@@ -0,0 +1,57 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import os
+import time
+
+# Бюджет времени на один ресторан: все фазы и повторные попытки, секунды
+RESTAURANT_TIME_BUDGET = float(os.getenv("RESTAURANT_TIME_BUDGET", "180"))
+# Бюджет для ресторанов, отложенных до повторного прохода в конце прогона
+DEFERRED_TIME_BUDGET = float(os.getenv("DEFERRED_TIME_BUDGET", "300"))
+
+_deadline: ContextVar[float | None] = ContextVar("scrape_deadline", default=None)
+
+
+class DeadlineExceededError(Exception):
+    """Бюджет времени на ресторан исчерпан"""
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[None]:
+    """Ограничить время парсинга ресторана; None или <= 0 — без ограничения
+
+    Ожидания внутри области урезаются до оставшегося времени (cap_timeout),
+    а циклы прокрутки и повторные попытки прерываются через check_deadline.
+    """
+    deadline = time.monotonic() + seconds if seconds and seconds > 0 else None
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> float | None:
+    """Сколько секунд осталось; None — ограничения нет"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def cap_timeout(timeout: float) -> float:
+    left = remaining()
+    if left is None:
+        return timeout
+    return max(0.0, min(timeout, left))
+
+
+def deadline_passed() -> bool:
+    """Бюджет времени задан и уже исчерпан"""
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def check_deadline() -> None:
+    if deadline_passed():
+        raise DeadlineExceededError("Бюджет времени на ресторан исчерпан")
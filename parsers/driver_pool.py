@@ -0,0 +1,147 @@
+from collections.abc import Callable
+import os
+import threading
+
+from selenium import webdriver
+
+from logger import logger
+from parsers.browser_memory import DRIVER_MEMORY_LIMIT_MB, browser_memory_mb
+
+DRIVER_POOL_MAX_PAGES = int(os.getenv("DRIVER_POOL_MAX_PAGES", "25"))
+
+
+class DriverPool:
+    """Пул прогретых экземпляров Chrome для парсера отзывов
+
+    Драйверы переиспользуются между ресторанами: перед выдачей состояние
+    браузера сбрасывается (cookies, лишние вкладки), а после max_pages
+    страниц, ошибки или превышения memory_limit_mb экземпляр пересоздается.
+    """
+
+    def __init__(
+        self,
+        driver_factory: Callable[[], webdriver.Chrome],
+        size: int = 1,
+        max_pages: int = DRIVER_POOL_MAX_PAGES,
+        memory_limit_mb: float | None = DRIVER_MEMORY_LIMIT_MB,
+    ):
+        self.driver_factory = driver_factory
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self.memory_limit_mb = memory_limit_mb
+
+        self._idle: list[webdriver.Chrome] = []
+        self._pages: dict[int, int] = {}
+        self._live = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def acquire(self) -> webdriver.Chrome:
+        """Взять драйвер из пула (при необходимости создается новый)"""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Пул драйверов закрыт")
+                if self._idle:
+                    return self._idle.pop()
+                if self._live < self.size:
+                    self._live += 1
+                    break
+                self._condition.wait()
+
+        try:
+            driver = self.driver_factory()
+        except Exception:
+            with self._condition:
+                self._live -= 1
+                self._condition.notify()
+            raise
+
+        self._pages[id(driver)] = 0
+        logger.debug(f"Создан новый драйвер в пуле ({self._live}/{self.size})")
+        return driver
+
+    def release(
+        self,
+        driver: webdriver.Chrome,
+        broken: bool = False,
+        memory_mb: float | None = None,
+    ) -> None:
+        """Вернуть драйвер в пул или пересоздать его
+
+        Args:
+            driver: драйвер, выданный acquire()
+            broken: страница завершилась сбоем; драйвер не возвращается
+                в пул, вместо него при следующем acquire() запускается новый
+            memory_mb: пик памяти браузера за страницу; если не передан,
+                память замеряется при возврате
+        """
+        pages = self._pages.get(id(driver), 0) + 1
+        self._pages[id(driver)] = pages
+
+        recycle = broken or pages >= self.max_pages or self._closed
+        reason = "ошибка" if broken else f"{pages} страниц"
+        if not recycle and self.memory_limit_mb:
+            if memory_mb is None:
+                memory_mb = browser_memory_mb(driver)
+            if memory_mb is not None and memory_mb > self.memory_limit_mb:
+                recycle = True
+                reason = f"память {memory_mb:.0f} МБ > {self.memory_limit_mb:.0f} МБ"
+
+        if not recycle:
+            try:
+                self._reset_driver(driver)
+            except Exception as e:
+                logger.warning(f"Не удалось сбросить состояние драйвера: {e}")
+                recycle = True
+
+        if recycle:
+            logger.debug(f"Драйвер выведен из пула ({reason})")
+            self._quit_driver(driver)
+            with self._condition:
+                self._live -= 1
+                self._condition.notify()
+            return
+
+        with self._condition:
+            self._idle.append(driver)
+            self._condition.notify()
+
+    def close(self) -> None:
+        """Закрыть все простаивающие драйверы"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._live -= len(idle)
+            self._condition.notify_all()
+
+        for driver in idle:
+            self._quit_driver(driver)
+
+    def _reset_driver(self, driver: webdriver.Chrome) -> None:
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        try:
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+        except Exception as e:
+            logger.debug(f"CDP очистка cookies недоступна: {e}")
+            driver.delete_all_cookies()
+
+        driver.get("about:blank")
+
+    def _quit_driver(self, driver: webdriver.Chrome) -> None:
+        self._pages.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Ошибка при закрытии драйвера: {e}")
@@ -0,0 +1,238 @@
+from collections.abc import Callable
+import os
+import re
+from typing import Any
+from urllib.parse import urlsplit, urlunsplit
+
+import httpx
+
+from logger import logger
+from parsers.rate_limiter import rate_limiter
+from parsers.review_html import (
+    build_review_from_json,
+    parse_place_header,
+)
+
+# Хост, на который уходят запросы; для проверки на записанных ответах
+# указывается адрес локального сервера (scripts/stub_maps_server.py)
+YANDEX_MAPS_BASE_URL = os.getenv("YANDEX_MAPS_BASE_URL", "https://yandex.ru")
+REVIEWS_HTTP_FETCH = os.getenv("REVIEWS_HTTP_FETCH", "1") == "1"
+HTTP_FETCH_TIMEOUT = float(os.getenv("HTTP_FETCH_TIMEOUT", "15"))
+HTTP_REVIEWS_PAGE_SIZE = 50
+FETCH_REVIEWS_PATH = "/maps/api/business/fetchReviews"
+
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "ru-RU,ru;q=0.9",
+}
+
+_BUSINESS_ID_PATTERNS = (
+    re.compile(r"oid=(\d+)"),
+    re.compile(r"/org/[^/]+/(\d+)"),
+)
+_HTML_BUSINESS_ID = re.compile(r'"businessId"\s*:\s*"(\d+)"')
+_HTML_CSRF_TOKEN = re.compile(r'"csrfToken"\s*:\s*"([^"]+)"')
+
+
+class HttpReviewsFetcher:
+    """Получение отзывов без браузера
+
+    Из HTML страницы места берутся businessId, csrfToken и шапка, а сами
+    отзывы — постранично из JSON-эндпоинта fetchReviews с сортировкой по
+    новизне. Карточки в исходном HTML идут по релевантности, поэтому без
+    ответа API возвращается None и отзывы собирает браузер. Соединения
+    переиспользуются одним httpx.Client на весь прогон.
+    """
+
+    def __init__(
+        self,
+        base_url: str = YANDEX_MAPS_BASE_URL,
+        client: httpx.Client | None = None,
+        page_size: int = HTTP_REVIEWS_PAGE_SIZE,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.page_size = page_size
+        self._owns_client = client is None
+        self.client = client or httpx.Client(
+            headers=HTTP_HEADERS,
+            timeout=HTTP_FETCH_TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=10),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self) -> None:
+        if self._owns_client:
+            self.client.close()
+
+    def fetch(
+        self,
+        url: str,
+        max_reviews: int = -1,
+        known_review_ids: set[str] | None = None,
+        stop_after: int = 3,
+        snapshot: Callable[[str], Any] | None = None,
+        header_check: Callable[[dict[str, Any]], bool] | None = None,
+    ) -> list[dict[str, Any]] | None:
+        """Получить отзывы места от новых к старым; None — нужен браузер
+
+        Args:
+            url: ссылка на отзывы места в Яндекс.Картах
+            max_reviews: сколько отзывов собрать; <= 0 — все
+            known_review_ids: yandex_review_id сохраненных отзывов; JSON-страницы
+                идут от новых к старым, поэтому обход прекращается после
+                stop_after известных отзывов подряд
+            stop_after: сколько известных отзывов подряд означают "дальше старое"
+            snapshot: вызывается с HTML страницы места, если отзывы получены
+            header_check: получает рейтинг и число отзывов из шапки места;
+                True — отзывы не изменились, fetch возвращает [] без обхода
+        """
+        page_url = self._rebase(url)
+        try:
+            with rate_limiter.slot(page_url) as slot:
+                response = self.client.get(page_url)
+                if _is_throttled(response):
+                    slot.throttled()
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.debug(f"HTTP-загрузка страницы не удалась: {e}")
+            return None
+
+        if "showcaptcha" in str(response.url):
+            logger.debug("HTTP-загрузка остановлена капчей")
+            return None
+
+        html = response.text
+        if header_check and header_check(parse_place_header(html)):
+            return []
+
+        business_id = self._business_id(url, html)
+        if not business_id:
+            logger.debug("В странице нет businessId, нужен браузер")
+            return None
+
+        reviews = self._fetch_api_reviews(
+            business_id,
+            self._csrf_token(html),
+            max_reviews,
+            known_review_ids,
+            stop_after,
+        )
+        if reviews and snapshot:
+            snapshot(html)
+        return reviews
+
+    def _fetch_api_reviews(
+        self,
+        business_id: str,
+        csrf_token: str | None,
+        max_reviews: int,
+        known_review_ids: set[str] | None,
+        stop_after: int,
+    ) -> list[dict[str, Any]] | None:
+        """Отзывы по новизне; None, если какая-то нужная страница не получена"""
+        reviews: list[dict[str, Any]] = []
+        known_streak = 0
+        page = 1
+        total_pages = 1
+
+        while page <= total_pages:
+            data = self._request_reviews_page(business_id, page, csrf_token)
+            if data is None:
+                logger.debug(f"Страница {page} fetchReviews не получена, нужен браузер")
+                return None
+            csrf_token = data.get("csrfToken", csrf_token)
+
+            payload = data.get("data") or {}
+            items = payload.get("reviews") or []
+            if not items:
+                break
+
+            for item in items:
+                review_data = build_review_from_json(item)
+                if not review_data:
+                    continue
+                reviews.append(review_data)
+
+                if known_review_ids is not None:
+                    if review_data["yandex_review_id"] in known_review_ids:
+                        known_streak += 1
+                    else:
+                        known_streak = 0
+                    if known_streak >= stop_after:
+                        return reviews
+
+                if 0 < max_reviews <= len(reviews):
+                    return reviews
+
+            total_pages = int(payload.get("params", {}).get("totalPages") or page)
+            page += 1
+
+        return reviews
+
+    def _request_reviews_page(
+        self, business_id: str, page: int, csrf_token: str | None
+    ) -> dict[str, Any] | None:
+        params = {
+            "businessId": business_id,
+            "page": page,
+            "pageSize": self.page_size,
+            "ranking": "by_time",
+        }
+
+        # Без токена эндпоинт отвечает только новым csrfToken — повторяем запрос
+        for _ in range(2):
+            if csrf_token:
+                params["csrfToken"] = csrf_token
+            api_url = f"{self.base_url}{FETCH_REVIEWS_PATH}"
+            try:
+                with rate_limiter.slot(api_url) as slot:
+                    response = self.client.get(api_url, params=params)
+                    if _is_throttled(response):
+                        slot.throttled()
+                data = response.json()
+            except (httpx.HTTPError, ValueError) as e:
+                logger.debug(f"Ошибка запроса fetchReviews: {e}")
+                return None
+
+            if "data" in data:
+                return data
+            if data.get("csrfToken") and data["csrfToken"] != csrf_token:
+                csrf_token = data["csrfToken"]
+                continue
+            return None
+
+        return None
+
+    def _rebase(self, url: str) -> str:
+        base = urlsplit(self.base_url)
+        parts = urlsplit(url)
+        return urlunsplit((base.scheme, base.netloc, parts.path, parts.query, ""))
+
+    @staticmethod
+    def _business_id(url: str, html: str) -> str | None:
+        for pattern in _BUSINESS_ID_PATTERNS:
+            match = pattern.search(url)
+            if match:
+                return match.group(1)
+        match = _HTML_BUSINESS_ID.search(html)
+        return match.group(1) if match else None
+
+    @staticmethod
+    def _csrf_token(html: str) -> str | None:
+        match = _HTML_CSRF_TOKEN.search(html)
+        return match.group(1) if match else None
+
+
+def _is_throttled(response: httpx.Response) -> bool:
+    """429 или редирект на капчу"""
+    return response.status_code == 429 or "showcaptcha" in str(response.url)
+
@@ -0,0 +1,106 @@
+import base64
+import json
+from typing import Any
+
+from selenium import webdriver
+
+from logger import logger
+from parsers.http_reviews_fetcher import FETCH_REVIEWS_PATH
+from parsers.resource_blocking import network_stats, read_network_log
+from parsers.review_html import build_review_from_json
+
+
+class NetworkReviewCapture:
+    """Отзывы из ответов fetchReviews, которые страница запрашивает при прокрутке
+
+    Ответы находятся в логе производительности Chrome (он включен для подсчета
+    трафика) и забираются через Network.getResponseBody, поэтому поля берутся
+    из JSON — без селекторов карточек и разбора HTML. get_log очищает лог,
+    так что заодно копится статистика сети для network_stats().
+    """
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.available = True
+        # Разобранных ответов fetchReviews с отзывами
+        self.responses = 0
+        self._network = {
+            "bytes_downloaded": 0,
+            "requests_finished": 0,
+            "requests_blocked": 0,
+        }
+        # requestId ответов fetchReviews, тело которых еще не загружено
+        self._pending: set[str] = set()
+
+    def skip(self) -> None:
+        """Пропустить уже пришедшие ответы (до переключения сортировки)"""
+        self._read()
+        self._pending.clear()
+
+    def poll(self) -> list[dict[str, Any]]:
+        """Отзывы из ответов, завершившихся с прошлого вызова, в порядке прихода"""
+        reviews = []
+        for request_id in self._read():
+            items = self._response_reviews(request_id)
+            if items is None:
+                continue
+            self.responses += 1
+            reviews.extend(r for r in map(build_review_from_json, items) if r)
+        return reviews
+
+    def network_stats(self, rest: dict[str, int] | None = None) -> dict[str, int]:
+        """Статистика сети за все чтения лога плюс rest (остаток лога)"""
+        totals = dict(self._network)
+        for key, value in (rest or {}).items():
+            totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def _read(self) -> list[str]:
+        """Прочитать лог; возвращает requestId завершенных ответов fetchReviews"""
+        if not self.available:
+            return []
+        messages = read_network_log(self.driver)
+        if messages is None:
+            self.available = False
+            return []
+
+        for key, value in network_stats(messages).items():
+            self._network[key] += value
+
+        finished = []
+        for message in messages:
+            method = message.get("method")
+            params = message.get("params") or {}
+            request_id = params.get("requestId")
+            if method == "Network.responseReceived":
+                response = params.get("response") or {}
+                if (
+                    FETCH_REVIEWS_PATH in response.get("url", "")
+                    and response.get("status") == 200
+                ):
+                    self._pending.add(request_id)
+            elif method == "Network.loadingFinished" and request_id in self._pending:
+                self._pending.discard(request_id)
+                finished.append(request_id)
+            elif method == "Network.loadingFailed":
+                self._pending.discard(request_id)
+        return finished
+
+    def _response_reviews(self, request_id: str) -> list[dict[str, Any]] | None:
+        try:
+            result = self.driver.execute_cdp_cmd(
+                "Network.getResponseBody", {"requestId": request_id}
+            )
+            body = result.get("body", "")
+            if result.get("base64Encoded"):
+                body = base64.b64decode(body).decode("utf-8")
+            data = json.loads(body)
+        except Exception as e:
+            logger.debug(f"Не удалось получить ответ fetchReviews: {e}")
+            return None
+
+        # Ответ только с новым csrfToken отзывов не содержит
+        payload = data.get("data") if isinstance(data, dict) else None
+        if not isinstance(payload, dict):
+            return None
+        return payload.get("reviews") or []
@@ -9,6 +9,7 @@ from notion_client import Client
 
 from database.crud import (
     delete_restaurants_not_in_notion,
+    delete_suggest_cache_entry,
     get_or_create_restaurant,
     get_restaurant_by_notion_id,
     get_restaurants_summary,
@@ -17,6 +18,7 @@ from database.crud import (
 from database.database import SessionLocal, init_db
 from database.models import Restaurant
 from logger import get_logger
+from parsers.suggest_cache import suggest_cache_key
 from scripts.services import get_coord_by_address
 
 logger = get_logger(__name__)
@@ -195,6 +197,11 @@ class NotionDataProcessor:
                 setattr(restaurant, field_name, new_value)
                 changed = True
 
+        old_cache_key = suggest_cache_key(
+            restaurant.name, restaurant.latitude, restaurant.longitude
+        )
+        old_name, old_address = restaurant.name, restaurant.address
+
         assign_if_changed("name", restaurant_data["name"])
         assign_if_changed("place_type", restaurant_data["place_type"])
         assign_if_changed("city", restaurant_data["city"])
@@ -207,6 +214,10 @@ class NotionDataProcessor:
         assign_if_changed("address", restaurant_data["address"])
         assign_if_changed("tags", restaurant_data["tags"])
 
+        # Результат поиска в Yandex Suggest для прежних данных больше не актуален
+        if restaurant.name != old_name or restaurant.address != old_address:
+            delete_suggest_cache_entry(self.db, old_cache_key)
+
         if restaurant_data["visited"]:
             assign_if_changed("visited", True)
             assign_if_changed("my_service_rating", restaurant_data["my_service_rating"])
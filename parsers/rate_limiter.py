@@ -0,0 +1,209 @@
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+from logger import logger
+from parsers.deadline import check_deadline
+
+# Запросов в секунду на хост: страницы Карт (браузер и HTTP-путь) и API
+RATE_LIMIT_MAPS_RPS = float(os.getenv("RATE_LIMIT_MAPS_RPS", "1"))
+RATE_LIMIT_API_RPS = float(os.getenv("RATE_LIMIT_API_RPS", "10"))
+# Верхняя граница одновременных запросов к хосту; AIMD держит лимит ниже нее
+RATE_LIMIT_MAPS_CONCURRENCY = int(os.getenv("RATE_LIMIT_MAPS_CONCURRENCY", "4"))
+RATE_LIMIT_API_CONCURRENCY = int(os.getenv("RATE_LIMIT_API_CONCURRENCY", "8"))
+# Пауза для хоста после капчи, 429 или страницы ошибки, секунды
+RATE_LIMIT_BACKOFF = float(os.getenv("RATE_LIMIT_BACKOFF", "30"))
+# Во сколько раз снижаются скорость и параллельность при признаках блокировки
+RATE_LIMIT_DECREASE = 0.5
+# Ниже этой доли от настроенной скорости лимит не опускается
+RATE_LIMIT_MIN_FRACTION = 0.1
+RATE_LIMIT_POLL_INTERVAL = 0.05
+
+# Хост -> (запросов в секунду, максимум одновременных); другие хосты
+# (например, локальный stub-сервер) не ограничиваются
+HOST_LIMITS: dict[str, tuple[float, int]] = {
+    "yandex.ru": (RATE_LIMIT_MAPS_RPS, RATE_LIMIT_MAPS_CONCURRENCY),
+    "suggest-maps.yandex.ru": (RATE_LIMIT_API_RPS, RATE_LIMIT_API_CONCURRENCY),
+    "geocode-maps.yandex.ru": (RATE_LIMIT_API_RPS, RATE_LIMIT_API_CONCURRENCY),
+}
+
+
+class RateLimitSlot:
+    """Разрешение на один запрос; вызывающий код сообщает о признаках блокировки"""
+
+    def __init__(self):
+        self.outcome = "ok"
+        self.waited = 0.0
+
+    def throttled(self) -> None:
+        """Капча, 429 или страница ошибки — хосту нужно снизить нагрузку"""
+        self.outcome = "throttled"
+
+
+class HostRateLimiter:
+    """Token bucket и AIMD-лимит одновременных запросов для одного хоста
+
+    Каждый успешный ответ понемногу повышает скорость и параллельность
+    (аддитивно), признак блокировки вдвое снижает их и ставит хост на паузу
+    RATE_LIMIT_BACKOFF секунд. Объект общий для потоков и корутин процесса.
+    """
+
+    def __init__(self, host: str, rate: float, max_concurrency: int):
+        self.host = host
+        self.max_rate = rate
+        self.min_rate = rate * RATE_LIMIT_MIN_FRACTION
+        self.rate = rate
+        self.burst = max(1.0, rate)
+        self.max_concurrency = max(1, max_concurrency)
+        # Стартуем осторожно и наращиваем параллельность, пока ответы здоровые
+        self.concurrency = 1.0
+        self.tokens = self.burst
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self) -> Iterator[RateLimitSlot]:
+        slot = RateLimitSlot()
+        slot.waited = self.acquire()
+        try:
+            yield slot
+        except BaseException:
+            slot.outcome = "error"
+            raise
+        finally:
+            self.release(slot.outcome)
+
+    @asynccontextmanager
+    async def slot_async(self) -> AsyncIterator[RateLimitSlot]:
+        slot = RateLimitSlot()
+        slot.waited = await self.acquire_async()
+        try:
+            yield slot
+        except BaseException:
+            slot.outcome = "error"
+            raise
+        finally:
+            self.release(slot.outcome)
+
+    def acquire(self) -> float:
+        """Дождаться разрешения; возвращает время ожидания в секундах"""
+        started = time.monotonic()
+        while (wait := self._reserve()) > 0:
+            check_deadline()
+            time.sleep(min(wait, 1.0))
+        return time.monotonic() - started
+
+    async def acquire_async(self) -> float:
+        started = time.monotonic()
+        while (wait := self._reserve()) > 0:
+            check_deadline()
+            await asyncio.sleep(min(wait, 1.0))
+        return time.monotonic() - started
+
+    def release(self, outcome: str = "ok") -> None:
+        """Освободить место и поправить лимиты по исходу запроса
+
+        ok — аддитивный рост, throttled — мультипликативное снижение и пауза,
+        error (сбой сети, исключение) — лимиты не меняются.
+        """
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            if outcome == "ok":
+                self.concurrency = min(
+                    self.max_concurrency, self.concurrency + 1 / self.concurrency
+                )
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+            elif outcome == "throttled":
+                self.concurrency = max(1.0, self.concurrency * RATE_LIMIT_DECREASE)
+                self.rate = max(self.min_rate, self.rate * RATE_LIMIT_DECREASE)
+                self.paused_until = time.monotonic() + RATE_LIMIT_BACKOFF
+                logger.warning(
+                    f"{self.host}: признаки ограничения, пауза {RATE_LIMIT_BACKOFF:.0f}с, "
+                    f"лимит {self.rate:.2f} запр/с, параллельно {int(self.concurrency)}"
+                )
+
+    def _reserve(self) -> float:
+        """Занять токен и место; иначе вернуть, сколько подождать"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.in_flight >= int(self.concurrency):
+                return RATE_LIMIT_POLL_INTERVAL
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+
+            self.tokens -= 1
+            self.in_flight += 1
+            return 0.0
+
+
+class RateLimiter:
+    """Лимитеры по хостам (HOST_LIMITS); для прочих хостов ограничений нет"""
+
+    def __init__(self, limits: dict[str, tuple[float, int]] = HOST_LIMITS):
+        self.limits = limits
+        self._hosts: dict[str, HostRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url: str) -> HostRateLimiter | None:
+        host = urlsplit(url).hostname or ""
+        if host.startswith("www."):
+            host = host[4:]
+        if host not in self.limits:
+            return None
+
+        with self._lock:
+            if host not in self._hosts:
+                rate, max_concurrency = self.limits[host]
+                self._hosts[host] = HostRateLimiter(host, rate, max_concurrency)
+            return self._hosts[host]
+
+    def share(self, processes: int) -> None:
+        """Поделить лимиты хостов между processes процессами-воркерами
+
+        Состояние лимитеров у каждого процесса свое, поэтому без деления
+        --workers N умножает скорость и параллельность запросов к хосту на N.
+        Параллельность не опускается ниже одного запроса на процесс.
+        """
+        if processes <= 1:
+            return
+        with self._lock:
+            self.limits = {
+                host: (rate / processes, max(1, max_concurrency // processes))
+                for host, (rate, max_concurrency) in self.limits.items()
+            }
+            self._hosts.clear()
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[RateLimitSlot]:
+        limiter = self.for_url(url)
+        if limiter is None:
+            yield RateLimitSlot()
+            return
+        with limiter.slot() as slot:
+            yield slot
+
+    @asynccontextmanager
+    async def slot_async(self, url: str) -> AsyncIterator[RateLimitSlot]:
+        limiter = self.for_url(url)
+        if limiter is None:
+            yield RateLimitSlot()
+            return
+        async with limiter.slot_async() as slot:
+            yield slot
+
+
+# Общий для процесса: браузер, HTTP-путь, Suggest и Геокодер
+rate_limiter = RateLimiter()
@@ -0,0 +1,166 @@
+import json
+import os
+from typing import Any
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+from logger import logger
+
+# none — ничего не блокируем, light — трекеры, медиа и шрифты,
+# full — дополнительно изображения и тайлы карты
+SCRAPER_BLOCKING_PROFILE = os.getenv("SCRAPER_BLOCKING_PROFILE", "full")
+
+_TRACKER_PATTERNS = [
+    "*mc.yandex.ru*",
+    "*an.yandex.ru*",
+    "*yandex.ru/clck/*",
+    "*yandex.ru/ads/*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*top-fwz1.mail.ru*",
+]
+_MEDIA_PATTERNS = ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*"]
+_FONT_PATTERNS = ["*.woff*", "*.ttf*", "*.otf*"]
+_IMAGE_PATTERNS = [
+    "*.png*",
+    "*.jpg*",
+    "*.jpeg*",
+    "*.gif*",
+    "*.webp*",
+    "*.avif*",
+    "*avatars.mds.yandex.net*",
+]
+_TILE_PATTERNS = [
+    "*tiles.maps.yandex.net*",
+    "*core-jams-rdr*",
+    "*core-stv-renderer*",
+    "*api-maps.yandex.ru/services/tiles*",
+]
+
+BLOCKING_PROFILES: dict[str, list[str]] = {
+    "none": [],
+    "light": _TRACKER_PATTERNS + _MEDIA_PATTERNS + _FONT_PATTERNS,
+    "full": _TRACKER_PATTERNS
+    + _MEDIA_PATTERNS
+    + _FONT_PATTERNS
+    + _IMAGE_PATTERNS
+    + _TILE_PATTERNS,
+}
+
+
+def configure_blocking_options(
+    options: webdriver.ChromeOptions, profile: str, network_log: bool = False
+) -> None:
+    """Настройки Chrome для профиля: лог сети и запрет загрузки картинок
+
+    Args:
+        options: настройки создаваемого Chrome
+        profile: профиль блокировки из BLOCKING_PROFILES
+        network_log: включить лог сети и без блокировки (нужен режиму
+            извлечения отзывов из ответов сети)
+    """
+    _check_profile(profile)
+    # Лог производительности нужен для подсчета скачанных байт; без
+    # блокировки он не включается, чтобы не копить события DevTools
+    if profile != "none" or network_log:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if profile == "full":
+        options.add_experimental_option(
+            "prefs", {"profile.managed_default_content_settings.images": 2}
+        )
+
+
+def apply_blocking_profile(driver: webdriver.Chrome, profile: str) -> None:
+    """Заблокировать ресурсы профиля через DevTools (Network.setBlockedURLs)"""
+    patterns = BLOCKING_PROFILES[_check_profile(profile)]
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        if patterns:
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    except Exception as e:
+        logger.warning(f"Не удалось включить блокировку ресурсов: {e}")
+
+
+def drain_network_log(driver: webdriver.Chrome) -> None:
+    """Сбросить накопленный лог сети перед загрузкой новой страницы"""
+    try:
+        driver.get_log("performance")
+    except WebDriverException as e:
+        logger.debug(f"Лог сети недоступен: {e}")
+
+
+def read_network_log(driver: webdriver.Chrome) -> list[dict[str, Any]] | None:
+    """События DevTools из лога сети с последнего чтения; None — лог недоступен"""
+    try:
+        entries = driver.get_log("performance")
+    except Exception as e:
+        logger.debug(f"Лог сети недоступен: {e}")
+        return None
+
+    messages = []
+    for entry in entries:
+        try:
+            messages.append(json.loads(entry["message"])["message"])
+        except (KeyError, ValueError):
+            continue
+    return messages
+
+
+def network_stats(messages: list[dict[str, Any]]) -> dict[str, int]:
+    """Скачанные байты и число завершенных и заблокированных запросов"""
+    bytes_downloaded = 0
+    requests_finished = 0
+    requests_blocked = 0
+    for message in messages:
+        method = message.get("method")
+        if method == "Network.loadingFinished":
+            requests_finished += 1
+            bytes_downloaded += int(message["params"].get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and message["params"].get(
+            "blockedReason"
+        ):
+            requests_blocked += 1
+
+    return {
+        "bytes_downloaded": bytes_downloaded,
+        "requests_finished": requests_finished,
+        "requests_blocked": requests_blocked,
+    }
+
+
+def collect_network_stats(driver: webdriver.Chrome) -> dict[str, int]:
+    """Скачанные байты и число заблокированных запросов с последнего сброса лога"""
+    messages = read_network_log(driver)
+    if messages is None:
+        return {}
+    return network_stats(messages)
+
+
+def _check_profile(profile: str) -> str:
+    if profile not in BLOCKING_PROFILES:
+        raise ValueError(
+            f"Неизвестный профиль блокировки: {profile} "
+            f"(доступны: {', '.join(BLOCKING_PROFILES)})"
+        )
+    return profile
+
+
+def format_bytes(value: float) -> str:
+    if value < 1024:
+        return f"{value:.0f} Б"
+    for unit in ("КБ", "МБ"):
+        value /= 1024
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+    return f"{value / 1024:.1f} ГБ"
+
+
+def summarize_network(stats: dict[str, Any]) -> str:
+    """Строка для лога: байты, время загрузки, заблокированные запросы"""
+    return (
+        f"{format_bytes(stats.get('bytes_downloaded', 0))}, "
+        f"загрузка {stats.get('page_load_seconds', 0):.1f}с, "
+        f"заблокировано запросов: {stats.get('requests_blocked', 0)}"
+    )
@@ -0,0 +1,461 @@
+import os
+import re
+from typing import Any
+
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+from logger import logger
+
+try:
+    import lxml  # noqa: F401
+
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser, LexborNode
+
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# auto | selectolax | lxml | html.parser
+REVIEWS_HTML_BACKEND = os.getenv("REVIEWS_HTML_BACKEND", "auto")
+
+REVIEW_CARD_CLASS = "business-reviews-card-view__review"
+FULL_STAR_CLASS = "business-rating-badge-view__star _full"
+AVATAR_URL_RE = re.compile(r'url\("([^"]+)"\)')
+# Как в bs4: содержимое этих тегов не считается текстом
+NON_TEXT_TAGS = frozenset({"script", "style", "template"})
+# Шапка места: агрегированный рейтинг и число отзывов (schema.org); у карточек
+# отзывов свой ratingValue, поэтому ищем только внутри aggregateRating
+HEADER_AGGREGATE_ITEMPROP = "aggregateRating"
+HEADER_RATING_ITEMPROP = "ratingValue"
+HEADER_REVIEW_COUNT_ITEMPROP = "reviewCount"
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+
+
+def build_review_data(
+    author: str | None,
+    user_id: str | None,
+    rating: int,
+    text: str | None,
+    date_iso: str | None,
+) -> dict[str, Any]:
+    """Собрать словарь отзыва из сырых полей (общий для всех способов извлечения)"""
+    author = author if author is not None else "Аноним"
+    text = text if text is not None else "Нет текста"
+    date_iso = date_iso if date_iso is not None else "Дата не указана"
+
+    if user_id:
+        yandex_review_id = (
+            user_id if len(user_id) > 7 else f"{user_id}_{date_iso[:10]}"
+        )
+    else:
+        yandex_review_id = f"{author}_{date_iso[:10]}"
+
+    return {
+        "author": author,
+        "yandex_review_id": yandex_review_id,
+        "rating": rating,
+        "text": text,
+        "date_iso": date_iso,
+    }
+
+
+def build_review_from_json(item: dict[str, Any]) -> dict[str, Any] | None:
+    """Отзыв из ответа fetchReviews в том же виде, что и из HTML-карточки
+
+    yandex_review_id строится так же, как в HTML- и JS-извлечении (publicId
+    автора совпадает с id из ссылки на профиль), а не из reviewId ответа:
+    иначе один отзыв, полученный разными путями, сохранился бы дважды.
+    """
+    try:
+        author = item.get("author") or {}
+        return build_review_data(
+            author=author.get("name"),
+            user_id=author.get("publicId"),
+            rating=int(item.get("rating") or 0),
+            text=item.get("text"),
+            date_iso=item.get("updatedTime"),
+        )
+    except Exception as e:
+        logger.error(f"Ошибка при разборе отзыва из JSON: {e}")
+        return None
+
+
+def extract_review_data(review_element: BeautifulSoup) -> dict[str, Any] | None:
+    try:
+        return build_review_data(
+            author=_extract_author_name(review_element),
+            user_id=_extract_user_id(review_element),
+            rating=_extract_rating(review_element),
+            text=_extract_review_text(review_element),
+            date_iso=_extract_review_date(review_element),
+        )
+
+    except Exception as e:
+        logger.error(f"Ошибка при извлечении данных отзыва: {e}")
+        return None
+
+
+def _extract_author_name(review_element: BeautifulSoup) -> str:
+    selectors = [
+        'span[itemprop="name"]',
+        "div.business-review-view__author-name",
+        "span.business-review-view__author",
+    ]
+    for selector in selectors:
+        elem = review_element.select_one(selector)
+        if elem:
+            return elem.get_text(strip=True)
+    return "Аноним"
+
+
+def _extract_user_id(review_element: BeautifulSoup) -> str | None:
+    # Из ссылки на профиль
+    author_container = review_element.find(
+        "div", class_="business-review-view__author-container"
+    )
+    if author_container:
+        for link in author_container.find_all("a", href=True):
+            if "/maps/user/" in link["href"]:
+                return link["href"].split("/maps/user/")[-1].split("/")[0]
+
+    # Из аватара
+    avatar_div = review_element.find("div", class_="user-icon-view__icon")
+    if avatar_div and "style" in avatar_div.attrs:
+        return _user_id_from_avatar_style(avatar_div["style"])
+    return None
+
+
+def _user_id_from_avatar_style(style: str) -> str | None:
+    if "background-image" in style:
+        url_match = AVATAR_URL_RE.search(style)
+        if url_match and "get-yapic" in url_match.group(1):
+            parts = url_match.group(1).split("/")
+            if len(parts) >= 5:
+                return parts[4]
+    return None
+
+
+def _user_id_from_profile_href(href: str) -> str | None:
+    if "/maps/user/" in href:
+        return href.split("/maps/user/")[-1].split("/")[0]
+    return None
+
+
+def _rating_from_aria_label(label: str) -> int | None:
+    try:
+        return int(label.split()[1])
+    except (IndexError, ValueError):
+        return None
+
+
+def _extract_rating(review_element: BeautifulSoup) -> int:
+    rating_div = review_element.find("div", class_="business-rating-badge-view__stars")
+    if rating_div and "aria-label" in rating_div.attrs:
+        rating = _rating_from_aria_label(rating_div["aria-label"])
+        if rating is not None:
+            return rating
+
+    stars = review_element.find_all("span", class_=FULL_STAR_CLASS)
+    return len(stars)
+
+
+def _extract_review_text(review_element: BeautifulSoup) -> str:
+    selectors = ["span.spoiler-view__text-container", "div.business-review-view__body"]
+    for selector in selectors:
+        elem = review_element.select_one(selector)
+        if elem:
+            return elem.get_text(strip=True)
+    return "Нет текста"
+
+
+def _extract_review_date(review_element: BeautifulSoup) -> str:
+    date_elem = review_element.find("span", class_="business-review-view__date")
+    if date_elem:
+        meta_date = date_elem.find("meta", itemprop="datePublished")
+        if meta_date and "content" in meta_date.attrs:
+            return meta_date["content"]
+        return date_elem.get_text(strip=True)
+    return "Дата не указана"
+
+
+def _extract_review_data_single_pass(card: Tag) -> dict[str, Any] | None:
+    """То же, что extract_review_data, но поля ищутся за один обход карточки"""
+    try:
+        authors: list[Tag | None] = [None, None, None]
+        texts: list[Tag | None] = [None, None]
+        container = avatar = stars = date_span = None
+        profile_href = date_meta = None
+        full_stars = 0
+
+        for node in card.descendants:
+            if not isinstance(node, Tag):
+                continue
+
+            name = node.name
+            classes = node.get("class") or ()
+
+            if name == "span":
+                if authors[0] is None and node.get("itemprop") == "name":
+                    authors[0] = node
+                if authors[2] is None and "business-review-view__author" in classes:
+                    authors[2] = node
+                if texts[0] is None and "spoiler-view__text-container" in classes:
+                    texts[0] = node
+                if date_span is None and "business-review-view__date" in classes:
+                    date_span = node
+                if " ".join(classes) == FULL_STAR_CLASS:
+                    full_stars += 1
+            elif name == "div":
+                if authors[1] is None and "business-review-view__author-name" in classes:
+                    authors[1] = node
+                if container is None and "business-review-view__author-container" in classes:
+                    container = node
+                if avatar is None and "user-icon-view__icon" in classes:
+                    avatar = node
+                if stars is None and "business-rating-badge-view__stars" in classes:
+                    stars = node
+                if texts[1] is None and "business-review-view__body" in classes:
+                    texts[1] = node
+            elif name == "a":
+                href = node.get("href")
+                if (
+                    profile_href is None
+                    and href is not None
+                    and "/maps/user/" in href
+                    and container is not None
+                    and any(parent is container for parent in node.parents)
+                ):
+                    profile_href = href
+            elif name == "meta":
+                if (
+                    date_meta is None
+                    and date_span is not None
+                    and node.get("itemprop") == "datePublished"
+                    and any(parent is date_span for parent in node.parents)
+                ):
+                    date_meta = node
+
+        user_id = _user_id_from_profile_href(profile_href) if profile_href else None
+        if user_id is None and avatar is not None and "style" in avatar.attrs:
+            user_id = _user_id_from_avatar_style(avatar["style"])
+
+        rating = None
+        if stars is not None and "aria-label" in stars.attrs:
+            rating = _rating_from_aria_label(stars["aria-label"])
+
+        date_iso = None
+        if date_meta is not None and "content" in date_meta.attrs:
+            date_iso = date_meta["content"]
+        elif date_span is not None:
+            date_iso = date_span.get_text(strip=True)
+
+        author = next((a for a in authors if a is not None), None)
+        text = next((t for t in texts if t is not None), None)
+        return build_review_data(
+            author=author.get_text(strip=True) if author is not None else None,
+            user_id=user_id,
+            rating=rating if rating is not None else full_stars,
+            text=text.get_text(strip=True) if text is not None else None,
+            date_iso=date_iso,
+        )
+
+    except Exception as e:
+        logger.error(f"Ошибка при извлечении данных отзыва: {e}")
+        return None
+
+
+def _lexbor_text(node: "LexborNode") -> str:
+    parts = []
+    for child in node.traverse(include_text=True):
+        if child.tag == "-text" and child.parent.tag not in NON_TEXT_TAGS:
+            value = child.text(deep=False).strip()
+            if value:
+                parts.append(value)
+    return "".join(parts)
+
+
+def _extract_review_data_lexbor(card: "LexborNode") -> dict[str, Any] | None:
+    """Однопроходное извлечение для дерева selectolax (lexbor)"""
+    try:
+        authors: list[LexborNode | None] = [None, None, None]
+        texts: list[LexborNode | None] = [None, None]
+        container = avatar = stars = date_span = None
+        profile_href = date_meta = None
+        full_stars = 0
+
+        nodes = card.traverse()
+        next(nodes)  # сама карточка
+        for node in nodes:
+            name = node.tag
+            attrs = node.attributes
+            class_attr = attrs.get("class") or ""
+            classes = class_attr.split()
+
+            if name == "span":
+                if authors[0] is None and attrs.get("itemprop") == "name":
+                    authors[0] = node
+                if authors[2] is None and "business-review-view__author" in classes:
+                    authors[2] = node
+                if texts[0] is None and "spoiler-view__text-container" in classes:
+                    texts[0] = node
+                if date_span is None and "business-review-view__date" in classes:
+                    date_span = node
+                if " ".join(classes) == FULL_STAR_CLASS:
+                    full_stars += 1
+            elif name == "div":
+                if authors[1] is None and "business-review-view__author-name" in classes:
+                    authors[1] = node
+                if container is None and "business-review-view__author-container" in classes:
+                    container = node
+                if avatar is None and "user-icon-view__icon" in classes:
+                    avatar = node
+                if stars is None and "business-rating-badge-view__stars" in classes:
+                    stars = node
+                if texts[1] is None and "business-review-view__body" in classes:
+                    texts[1] = node
+            elif name == "a":
+                href = attrs.get("href")
+                if (
+                    profile_href is None
+                    and href is not None
+                    and "/maps/user/" in href
+                    and container is not None
+                    and _lexbor_is_inside(node, container)
+                ):
+                    profile_href = href
+            elif name == "meta":
+                if (
+                    date_meta is None
+                    and date_span is not None
+                    and attrs.get("itemprop") == "datePublished"
+                    and _lexbor_is_inside(node, date_span)
+                ):
+                    date_meta = node
+
+        user_id = _user_id_from_profile_href(profile_href) if profile_href else None
+        if user_id is None and avatar is not None and "style" in avatar.attributes:
+            user_id = _user_id_from_avatar_style(avatar.attributes["style"] or "")
+
+        rating = None
+        if stars is not None and "aria-label" in stars.attributes:
+            rating = _rating_from_aria_label(stars.attributes["aria-label"] or "")
+
+        date_iso = None
+        if date_meta is not None and "content" in date_meta.attributes:
+            date_iso = date_meta.attributes["content"] or ""
+        elif date_span is not None:
+            date_iso = _lexbor_text(date_span)
+
+        author = next((a for a in authors if a is not None), None)
+        text = next((t for t in texts if t is not None), None)
+        return build_review_data(
+            author=_lexbor_text(author) if author is not None else None,
+            user_id=user_id,
+            rating=rating if rating is not None else full_stars,
+            text=_lexbor_text(text) if text is not None else None,
+            date_iso=date_iso,
+        )
+
+    except Exception as e:
+        logger.error(f"Ошибка при извлечении данных отзыва: {e}")
+        return None
+
+
+def _lexbor_is_inside(node: "LexborNode", ancestor: "LexborNode") -> bool:
+    parent = node.parent
+    while parent is not None:
+        if parent.mem_id == ancestor.mem_id:
+            return True
+        parent = parent.parent
+    return False
+
+
+def resolve_backend(backend: str = REVIEWS_HTML_BACKEND) -> str:
+    """Выбрать доступный бэкенд разбора HTML"""
+    if backend == "auto":
+        if SELECTOLAX_AVAILABLE:
+            return "selectolax"
+        if LXML_AVAILABLE:
+            return "lxml"
+        return "html.parser"
+
+    if backend == "selectolax" and not SELECTOLAX_AVAILABLE:
+        logger.warning("selectolax не установлен, используется html.parser")
+        return "html.parser"
+    if backend == "lxml" and not LXML_AVAILABLE:
+        logger.warning("lxml не установлен, используется html.parser")
+        return "html.parser"
+    return backend
+
+
+def parse_review_cards(
+    html: str, backend: str = REVIEWS_HTML_BACKEND
+) -> list[dict[str, Any] | None]:
+    """Разобрать карточки отзывов из HTML страницы (по элементу на карточку)
+
+    Args:
+        html: HTML страницы места или ее фрагмента с карточками отзывов
+        backend: html.parser — исходный разбор bs4; lxml — bs4 + lxml со
+            strainer'ом по карточкам и однопроходным извлечением; selectolax —
+            lexbor с однопроходным извлечением; auto — самый быстрый доступный.
+    """
+    backend = resolve_backend(backend)
+
+    if backend == "selectolax":
+        tree = LexborHTMLParser(html)
+        return [
+            _extract_review_data_lexbor(card)
+            for card in tree.css(f"div.{REVIEW_CARD_CLASS}")
+        ]
+
+    if backend == "lxml":
+        # Строим дерево только для карточек отзывов, остальная страница пропускается
+        strainer = SoupStrainer("div", class_=REVIEW_CARD_CLASS)
+        soup = BeautifulSoup(html, "lxml", parse_only=strainer)
+        return [
+            _extract_review_data_single_pass(card)
+            for card in soup.find_all("div", class_=REVIEW_CARD_CLASS)
+        ]
+
+    soup = BeautifulSoup(html, "html.parser")
+    return [
+        extract_review_data(card)
+        for card in soup.find_all("div", class_=REVIEW_CARD_CLASS)
+    ]
+
+
+def build_place_header(
+    rating_raw: str | None, review_count_raw: str | None
+) -> dict[str, Any]:
+    """Рейтинг и число отзывов из сырых строк шапки ("4,6", "1 234 отзыва")"""
+    rating = None
+    if rating_raw:
+        match = _NUMBER_RE.search(rating_raw)
+        if match:
+            rating = float(match.group().replace(",", "."))
+
+    review_count = None
+    if review_count_raw:
+        digits = re.sub(r"\D", "", review_count_raw)
+        if digits:
+            review_count = int(digits)
+
+    return {"rating": rating, "review_count": review_count}
+
+
+def parse_place_header(html: str) -> dict[str, Any]:
+    """Рейтинг и число отзывов места из aggregateRating страницы"""
+    strainer = SoupStrainer(attrs={"itemprop": HEADER_AGGREGATE_ITEMPROP})
+    soup = BeautifulSoup(html, "html.parser", parse_only=strainer)
+    values = {}
+    for itemprop in (HEADER_RATING_ITEMPROP, HEADER_REVIEW_COUNT_ITEMPROP):
+        meta = soup.find("meta", attrs={"itemprop": itemprop})
+        values[itemprop] = meta.get("content") if meta else None
+    return build_place_header(
+        values[HEADER_RATING_ITEMPROP], values[HEADER_REVIEW_COUNT_ITEMPROP]
+    )
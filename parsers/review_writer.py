@@ -0,0 +1,61 @@
+import os
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from database.crud import save_reviews_batch
+from logger import logger
+
+# Сколько отзывов накапливать перед записью в БД во время прокрутки
+REVIEWS_SAVE_BATCH = int(os.getenv("REVIEWS_SAVE_BATCH", "20"))
+
+
+class ReviewBatchWriter:
+    """Запись отзывов в БД небольшими пакетами по мере парсинга
+
+    Отзывы, собранные до сбоя, уже сохранены, а повторная попытка
+    пропускает их по seen_ids и продолжает с того же места.
+    """
+
+    def __init__(
+        self, db: Session, restaurant_id: int, batch_size: int = REVIEWS_SAVE_BATCH
+    ):
+        self.db = db
+        self.restaurant_id = restaurant_id
+        self.batch_size = max(1, batch_size)
+        self.seen_ids: set[str] = set()
+        self.totals = {"reviews_found": 0, "reviews_new": 0, "batches": 0}
+        self._buffer: list[dict[str, Any]] = []
+
+    def __contains__(self, yandex_review_id: str) -> bool:
+        return yandex_review_id in self.seen_ids
+
+    def add(self, reviews: list[dict[str, Any]]) -> None:
+        """Добавить отзывы; уже переданные ранее пропускаются"""
+        for review_data in reviews:
+            review_id = review_data["yandex_review_id"]
+            if review_id in self.seen_ids:
+                continue
+            self.seen_ids.add(review_id)
+            self._buffer.append(review_data)
+
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+
+        batch, self._buffer = self._buffer, []
+        try:
+            result = save_reviews_batch(self.db, self.restaurant_id, batch)
+        except Exception:
+            self.db.rollback()
+            # Отзывы пакета можно будет передать снова при повторной попытке
+            self.seen_ids.difference_update(r["yandex_review_id"] for r in batch)
+            logger.exception("Не удалось сохранить пакет отзывов")
+            raise
+
+        self.totals["reviews_found"] += result["reviews_found"]
+        self.totals["reviews_new"] += result["reviews_new"]
+        self.totals["batches"] += 1
@@ -0,0 +1,87 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any
+
+from database.crud import get_restaurant_by_notion_id, save_reviews_batch
+from database.database import SessionLocal, init_db
+from logger import logger
+from parsers.review_html import parse_review_cards
+from parsers.snapshot_store import SNAPSHOT_DIR, SnapshotStore
+
+
+def _parse_snapshot(
+    root: str, notion_id: str, digest: str
+) -> tuple[str, list[dict[str, Any]]]:
+    """Разобрать один снимок (выполняется в процессе-воркере)"""
+    html = SnapshotStore(root).load(digest)
+    reviews = [review for review in parse_review_cards(html) if review]
+    return notion_id, reviews
+
+
+def reparse_snapshots(
+    notion_id: str | None = None,
+    run_id: str | None = None,
+    workers: int = 4,
+    root: str = SNAPSHOT_DIR,
+) -> dict[str, Any]:
+    """Повторно извлечь отзывы из сохраненных снимков страниц, без браузера
+
+    Снимки разбираются параллельно в процессах, результаты записываются
+    в БД в основном процессе с обновлением уже сохраненных отзывов.
+    """
+    init_db()
+    store = SnapshotStore(root)
+    snapshots = list(store.iter_snapshots(notion_id=notion_id, run_id=run_id))
+
+    if not snapshots:
+        logger.warning("Снимки страниц не найдены")
+        return {"success": False, "error": "Снимки страниц не найдены"}
+
+    logger.info(f"Повторный разбор {len(snapshots)} снимков ({workers} процессов)")
+
+    db = SessionLocal()
+    summary = {
+        "success": True,
+        "snapshots": len(snapshots),
+        "restaurants_missing": 0,
+        "errors": 0,
+        "reviews_found": 0,
+        "reviews_new": 0,
+        "reviews_updated": 0,
+    }
+
+    try:
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [
+                executor.submit(_parse_snapshot, root, current_id, ref["digest"])
+                for current_id, ref in snapshots
+            ]
+
+            for future in as_completed(futures):
+                try:
+                    current_id, reviews = future.result()
+                except Exception as e:
+                    summary["errors"] += 1
+                    logger.error(f"Ошибка разбора снимка: {e}")
+                    continue
+
+                restaurant = get_restaurant_by_notion_id(db, current_id)
+                if not restaurant:
+                    summary["restaurants_missing"] += 1
+                    logger.warning(f"Ресторан {current_id} не найден в БД")
+                    continue
+
+                save_result = save_reviews_batch(
+                    db, restaurant.id, reviews, update_existing=True
+                )
+                summary["reviews_found"] += save_result["reviews_found"]
+                summary["reviews_new"] += save_result["reviews_new"]
+                summary["reviews_updated"] += save_result["reviews_updated"]
+
+        logger.success(
+            f"Повторный разбор завершен: найдено {summary['reviews_found']}, "
+            f"новых {summary['reviews_new']}, обновлено {summary['reviews_updated']}"
+        )
+        return summary
+
+    finally:
+        db.close()
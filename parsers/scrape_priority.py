@@ -0,0 +1,73 @@
+from datetime import UTC, datetime, timedelta
+import os
+
+from sqlalchemy.orm import Session
+
+from database.crud import get_recent_review_counts, get_scrape_states
+from database.models import Restaurant
+from logger import logger
+
+# Окно, по которому оценивается поток новых отзывов
+PRIORITY_RATE_WINDOW_DAYS = int(os.getenv("PRIORITY_RATE_WINDOW_DAYS", "90"))
+# Нижняя граница потока, чтобы тихие места тоже со временем доходили до очереди
+PRIORITY_MIN_DAILY_RATE = float(os.getenv("PRIORITY_MIN_DAILY_RATE", "0.02"))
+PRIORITY_MAX_STALE_DAYS = float(os.getenv("PRIORITY_MAX_STALE_DAYS", "60"))
+# Множитель за каждую неудачу подряд
+PRIORITY_FAILURE_PENALTY = float(os.getenv("PRIORITY_FAILURE_PENALTY", "0.5"))
+NEVER_SCRAPED_SCORE = 1e6
+
+
+def priority_score(
+    daily_rate: float,
+    days_since_success: float | None,
+    consecutive_failures: int = 0,
+) -> float:
+    """Ожидаемое число новых отзывов с последнего успешного парсинга
+
+    Места, которые еще ни разу не парсились, идут первыми; каждая неудача
+    подряд снижает приоритет.
+    """
+    if days_since_success is None:
+        score = NEVER_SCRAPED_SCORE
+    else:
+        rate = max(daily_rate, PRIORITY_MIN_DAILY_RATE)
+        score = rate * min(days_since_success, PRIORITY_MAX_STALE_DAYS)
+    return score * PRIORITY_FAILURE_PENALTY**consecutive_failures
+
+
+def order_by_priority(db: Session, restaurants: list[Restaurant]) -> list[Restaurant]:
+    """Отсортировать рестораны по убыванию приоритета парсинга"""
+    if not restaurants:
+        return []
+
+    now = datetime.now(UTC)
+    ids = [r.id for r in restaurants]
+    states = get_scrape_states(db, ids)
+    recent_counts = get_recent_review_counts(
+        db, ids, now - timedelta(days=PRIORITY_RATE_WINDOW_DAYS)
+    )
+
+    scores = {}
+    for restaurant in restaurants:
+        state = states.get(restaurant.id)
+        last_success = state.last_success_at if state else None
+        if last_success is None and restaurant.yandex_url_status == "ok":
+            # Рестораны, парсившиеся до появления истории
+            last_success = restaurant.yandex_url_last_checked
+
+        days_since_success = None
+        if last_success is not None:
+            if last_success.tzinfo is None:
+                last_success = last_success.replace(tzinfo=UTC)
+            days_since_success = (now - last_success).total_seconds() / 86400
+
+        scores[restaurant.id] = priority_score(
+            recent_counts.get(restaurant.id, 0) / PRIORITY_RATE_WINDOW_DAYS,
+            days_since_success,
+            state.consecutive_failures if state else 0,
+        )
+
+    ordered = sorted(restaurants, key=lambda r: scores[r.id], reverse=True)
+    top = ", ".join(f"{r.name} ({scores[r.id]:.2f})" for r in ordered[:5])
+    logger.debug(f"Приоритет парсинга, первые: {top}")
+    return ordered
@@ -0,0 +1,62 @@
+import os
+import socket
+import threading
+
+from database.crud import extend_scrape_lease
+from database.database import SessionLocal
+from logger import logger
+
+# Аренда задания; воркер продлевает ее, пока парсит ресторан
+QUEUE_LEASE_SECONDS = float(os.getenv("QUEUE_LEASE_SECONDS", "300"))
+QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+QUEUE_POLL_INTERVAL = float(os.getenv("QUEUE_POLL_INTERVAL", "30"))
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class LeaseHeartbeat:
+    """Фоновое продление аренды задания очереди
+
+    Продлевает аренду каждые lease_seconds / 3 в отдельной сессии БД. Если
+    воркер упал, продления прекращаются, аренда истекает и задание забирает
+    другой узел.
+    """
+
+    def __init__(
+        self,
+        item_id: int,
+        worker_id: str,
+        lease_seconds: float = QUEUE_LEASE_SECONDS,
+    ):
+        self.item_id = item_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        interval = max(1.0, self.lease_seconds / 3)
+        while not self._stop.wait(interval):
+            db = SessionLocal()
+            try:
+                if not extend_scrape_lease(
+                    db, self.item_id, self.worker_id, self.lease_seconds
+                ):
+                    self.lost = True
+                    logger.warning(f"Аренда задания {self.item_id} потеряна")
+                    return
+            except Exception as e:
+                logger.warning(f"Не удалось продлить аренду задания: {e}")
+            finally:
+                db.close()
@@ -0,0 +1,106 @@
+from collections.abc import Iterator
+from datetime import UTC, datetime
+import hashlib
+import json
+import os
+from pathlib import Path
+import tempfile
+from typing import Any
+
+import zstandard
+
+from logger import logger
+
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_ZSTD_LEVEL = int(os.getenv("SNAPSHOT_ZSTD_LEVEL", "10"))
+
+
+class SnapshotStore:
+    """Хранилище HTML-снимков страниц отзывов
+
+    Снимки сжимаются zstd и адресуются по sha256 содержимого
+    (objects/ab/<sha256>.html.zst), поэтому одинаковые страницы хранятся
+    один раз. Для каждого ресторана ведется журнал refs/<notion_id>.jsonl:
+    какой снимок получен в каком прогоне.
+    """
+
+    def __init__(self, root: str | Path = SNAPSHOT_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.refs_dir = self.root / "refs"
+
+    def save(
+        self, notion_id: str, run_id: str, html: str, url: str | None = None
+    ) -> str:
+        """Сохранить снимок страницы и вернуть его sha256"""
+        data = html.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            compressed = zstandard.ZstdCompressor(level=SNAPSHOT_ZSTD_LEVEL).compress(
+                data
+            )
+            # Уникальный временный файл: ту же страницу могут одновременно
+            # сохранять несколько потоков и процессов
+            fd, tmp_name = tempfile.mkstemp(
+                dir=path.parent, prefix=f"{path.name}.", suffix=".tmp"
+            )
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(compressed)
+                os.replace(tmp_name, path)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+
+        ref = {
+            "run_id": run_id,
+            "digest": digest,
+            "url": url,
+            "saved_at": datetime.now(UTC).isoformat(),
+        }
+        self.refs_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._refs_path(notion_id), "a", encoding="utf-8") as f:
+            f.write(json.dumps(ref, ensure_ascii=False) + "\n")
+
+        logger.debug(f"Снимок страницы сохранен: {digest[:12]} ({len(data)} байт)")
+        return digest
+
+    def load(self, digest: str) -> str:
+        """Прочитать снимок по sha256"""
+        compressed = self._object_path(digest).read_bytes()
+        return zstandard.ZstdDecompressor().decompress(compressed).decode("utf-8")
+
+    def refs(self, notion_id: str) -> list[dict[str, Any]]:
+        """Журнал снимков ресторана (от старых к новым)"""
+        path = self._refs_path(notion_id)
+        if not path.exists():
+            return []
+        with open(path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def iter_snapshots(
+        self, notion_id: str | None = None, run_id: str | None = None
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """Последний снимок каждого ресторана (или снимок конкретного прогона)"""
+        if notion_id:
+            notion_ids = [notion_id]
+        elif self.refs_dir.exists():
+            notion_ids = sorted(path.stem for path in self.refs_dir.glob("*.jsonl"))
+        else:
+            notion_ids = []
+
+        for current_id in notion_ids:
+            refs = self.refs(current_id)
+            if run_id:
+                refs = [ref for ref in refs if ref["run_id"] == run_id]
+            if refs:
+                yield current_id, refs[-1]
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.html.zst"
+
+    def _refs_path(self, notion_id: str) -> Path:
+        return self.refs_dir / f"{notion_id}.jsonl"
@@ -0,0 +1,90 @@
+from datetime import UTC, datetime, timedelta
+import os
+import re
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from database.crud import get_suggest_cache_entry, upsert_suggest_cache_entry
+
+SUGGEST_CACHE_HIT_TTL_DAYS = int(os.getenv("SUGGEST_CACHE_HIT_TTL_DAYS", "30"))
+SUGGEST_CACHE_MISS_TTL_DAYS = int(os.getenv("SUGGEST_CACHE_MISS_TTL_DAYS", "7"))
+# Округление координат в ключе: 3 знака — около 100 м
+COORDINATE_PRECISION = 3
+
+_QUOTES = re.compile(r"[\"'«»“”„`]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_place_name(name: str) -> str:
+    name = _QUOTES.sub("", name.lower().replace("ё", "е"))
+    return _SPACES.sub(" ", name).strip()
+
+
+def suggest_cache_key(
+    name: str, latitude: float | None, longitude: float | None
+) -> str:
+    """Ключ кэша: нормализованное название и округленные координаты"""
+    if latitude is None or longitude is None:
+        coordinates = "-"
+    else:
+        coordinates = (
+            f"{round(latitude, COORDINATE_PRECISION)},"
+            f"{round(longitude, COORDINATE_PRECISION)}"
+        )
+    return f"{normalize_place_name(name)}|{coordinates}"
+
+
+class SuggestCache:
+    """Кэш поиска ссылок через Yandex Suggest в таблице suggest_cache
+
+    Найденные ссылки и "место не найдено" хранятся с разными сроками жизни,
+    чтобы повторные прогоны не обращались к API без необходимости.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        hit_ttl: timedelta = timedelta(days=SUGGEST_CACHE_HIT_TTL_DAYS),
+        miss_ttl: timedelta = timedelta(days=SUGGEST_CACHE_MISS_TTL_DAYS),
+    ):
+        self.db = db
+        self.hit_ttl = hit_ttl
+        self.miss_ttl = miss_ttl
+        self.counters = {"hits": 0, "negative_hits": 0, "misses": 0, "stored": 0}
+
+    def lookup(
+        self, name: str, coordinates: dict[str, Any]
+    ) -> tuple[bool, str | None]:
+        """(есть ли актуальная запись, ссылка или None для "не найдено")"""
+        entry = get_suggest_cache_entry(self.db, self._key(name, coordinates))
+        if entry:
+            ttl = self.hit_ttl if entry.reviews_url else self.miss_ttl
+            resolved_at = entry.resolved_at
+            if resolved_at.tzinfo is None:
+                resolved_at = resolved_at.replace(tzinfo=UTC)
+            if datetime.now(UTC) - resolved_at < ttl:
+                counter = "hits" if entry.reviews_url else "negative_hits"
+                self.counters[counter] += 1
+                return True, entry.reviews_url
+
+        self.counters["misses"] += 1
+        return False, None
+
+    def store(
+        self,
+        name: str,
+        coordinates: dict[str, Any],
+        reviews_url: str | None,
+        commit: bool = True,
+    ) -> None:
+        upsert_suggest_cache_entry(
+            self.db, self._key(name, coordinates), reviews_url, commit=commit
+        )
+        self.counters["stored"] += 1
+
+    @staticmethod
+    def _key(name: str, coordinates: dict[str, Any]) -> str:
+        return suggest_cache_key(
+            name, coordinates.get("latitude"), coordinates.get("longitude")
+        )
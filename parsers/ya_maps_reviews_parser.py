@@ -1,27 +1,94 @@
 import asyncio
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from datetime import UTC, datetime
+from functools import partial
+import math
+import multiprocessing
 import os
-import re
+import queue
+import threading
 import time
 from typing import Any
 
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
 import httpx
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as expected_conditions
 from selenium.webdriver.support.ui import WebDriverWait
 
 from database.crud import (
+    claim_scrape_item,
+    complete_scrape_item,
+    create_scrape_run,
+    enqueue_scrape_items,
+    fail_exhausted_scrape_items,
+    finish_scrape_run,
+    get_header_state,
+    get_known_review_ids,
+    get_pending_run_items,
     get_restaurant_by_notion_id,
     get_reviews_stats,
-    save_reviews_batch,
+    get_scroll_stats,
+    get_unfinished_scrape_run,
+    mark_run_item,
+    record_scrape_attempt,
+    save_header_state,
+    save_scrape_metric,
     update_restaurant_link_status,
     update_restaurant_rating,
+    update_scroll_stats,
 )
 from database.database import SessionLocal, init_db
-from database.models import Restaurant
+from database.models import Restaurant, RestaurantHeaderState
 from logger import logger
+from parsers.browser_memory import MemoryWatchdog
+from parsers.browser_tabs import BROWSER_TABS, TabPool, configure_tab_options
+from parsers.deadline import (
+    DEFERRED_TIME_BUDGET,
+    RESTAURANT_TIME_BUDGET,
+    DeadlineExceededError,
+    cap_timeout,
+    check_deadline,
+    deadline_passed,
+    deadline_scope,
+)
+from parsers.driver_pool import DriverPool
+from parsers.http_reviews_fetcher import REVIEWS_HTTP_FETCH, HttpReviewsFetcher
+from parsers.network_reviews import NetworkReviewCapture
+from parsers.rate_limiter import RateLimitSlot, rate_limiter
+from parsers.resource_blocking import (
+    BLOCKING_PROFILES,
+    SCRAPER_BLOCKING_PROFILE,
+    apply_blocking_profile,
+    collect_network_stats,
+    configure_blocking_options,
+    drain_network_log,
+    summarize_network,
+)
+from parsers.review_html import (
+    HEADER_AGGREGATE_ITEMPROP,
+    HEADER_RATING_ITEMPROP,
+    HEADER_REVIEW_COUNT_ITEMPROP,
+    REVIEW_CARD_CLASS,
+    build_place_header,
+    build_review_data,
+    extract_review_data,  # noqa: F401 — публичный API парсера
+    parse_review_cards,
+)
+from parsers.review_writer import ReviewBatchWriter
+from parsers.scrape_priority import order_by_priority
+from parsers.scrape_queue import (
+    QUEUE_LEASE_SECONDS,
+    QUEUE_MAX_ATTEMPTS,
+    QUEUE_POLL_INTERVAL,
+    LeaseHeartbeat,
+    default_worker_id,
+)
+from parsers.snapshot_store import SnapshotStore
+from parsers.suggest_cache import SuggestCache
 
 load_dotenv("config/.env")
 
@@ -43,15 +110,58 @@ DEFAULT_MAX_REVIEWS = 100
 PAGE_LOAD_TIMEOUT = int(os.getenv("PAGE_LOAD_TIMEOUT", "30"))
 ELEMENT_WAIT_TIMEOUT = int(os.getenv("ELEMENT_WAIT_TIMEOUT", "20"))
 SCROLL_DELAY = int(os.getenv("SCROLL_DELAY", "2"))
+# Верхние границы ожиданий (раньше — фиксированные паузы)
+PAGE_READY_TIMEOUT = float(os.getenv("PAGE_READY_TIMEOUT", "3"))
+SORT_APPLY_TIMEOUT = float(os.getenv("SORT_APPLY_TIMEOUT", "3"))
+WAIT_POLL_INTERVAL = 0.1
+# Прокрутка идет до max_reviews карточек; это лишь страховочный предел
+SCROLL_MAX_ATTEMPTS = int(os.getenv("SCROLL_MAX_ATTEMPTS", "60"))
+# Сколько прокруток подряд без новых карточек означают конец списка
+SCROLL_STALL_LIMIT = int(os.getenv("SCROLL_STALL_LIMIT", "2"))
+# Для длинных списков: оставлять в DOM не больше N обработанных карточек,
+# остальные заменять пустыми заглушками той же высоты. 0 — не трогать DOM.
+REVIEWS_DOM_KEEP_CARDS = int(os.getenv("REVIEWS_DOM_KEEP_CARDS", "0"))
+# js — извлечение полей скриптом в браузере, html — разбор page_source через bs4,
+# network — JSON ответов fetchReviews из лога сети Chrome (карточки, пришедшие
+# в HTML до первого ответа, извлекаются скриптом)
+REVIEWS_EXTRACTION_MODE = os.getenv("REVIEWS_EXTRACTION_MODE", "js")
 MAX_RETRY_ATTEMPTS = int(os.getenv("MAX_RETRY_ATTEMPTS", "2"))
 RETRY_DELAY = int(os.getenv("RETRY_DELAY", "5"))
-
-
-def setup_driver() -> webdriver.Chrome:
+# Сохранять HTML страницы каждого ресторана для повторного разбора (main.py reparse)
+SAVE_SNAPSHOTS = os.getenv("SAVE_SNAPSHOTS", "0") == "1"
+# Пакетный поиск ссылок через Yandex Suggest
+SUGGEST_CONCURRENCY = int(os.getenv("SUGGEST_CONCURRENCY", "8"))
+SUGGEST_TIMEOUT = float(os.getenv("SUGGEST_TIMEOUT", "10"))
+# Тип прогона в scrape_runs, который продолжает --resume
+REVIEWS_RUN_KIND = "reviews"
+# Сверять рейтинг и число отзывов в шапке места с сохраненными и пропускать
+# сортировку и прокрутку, если они не изменились
+REVIEWS_HEADER_CHECK = os.getenv("REVIEWS_HEADER_CHECK", "1") == "1"
+# Инкрементальный режим: сколько известных отзывов подряд означают "дальше старое"
+INCREMENTAL_STOP_AFTER = int(os.getenv("INCREMENTAL_STOP_AFTER", "3"))
+
+REVIEW_CARD_SELECTOR = f"div.{REVIEW_CARD_CLASS}"
+# Заглушка на месте обработанной карточки (режим REVIEWS_DOM_KEEP_CARDS)
+PRUNED_CARD_CLASS = "reviews-parser-pruned-card"
+# Карточки и заглушки: позиции в списке для подсчета прогресса прокрутки
+REVIEW_SLOT_SELECTOR = f"{REVIEW_CARD_SELECTOR}, div.{PRUNED_CARD_CLASS}"
+
+
+def setup_driver(
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE, tabs: bool = False
+) -> webdriver.Chrome:
+    """Headless Chromium; tabs — браузер для TabPool (несколько вкладок сразу)"""
     options = webdriver.ChromeOptions()
 
     for option in BROWSER_OPTIONS.values():
         options.add_argument(option)
+    configure_blocking_options(
+        options,
+        blocking_profile,
+        network_log=REVIEWS_EXTRACTION_MODE == "network",
+    )
+    if tabs:
+        configure_tab_options(options)
 
     # Явно указываем бинарь Chromium внутри контейнера
     chrome_bin = os.getenv("CHROME_BIN", "/usr/bin/chromium")
@@ -62,153 +172,510 @@ def setup_driver() -> webdriver.Chrome:
     # для подбора совместимого драйвера
     driver = webdriver.Chrome(options=options)
     driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    apply_blocking_profile(driver, blocking_profile)
 
     return driver
 
 
-def extract_review_data(review_element: BeautifulSoup) -> dict[str, Any] | None:
+def _wait_for(
+    driver: webdriver.Chrome,
+    condition: Callable[[webdriver.Chrome], Any],
+    timeout: float,
+    stats: dict[str, Any] | None = None,
+    phase: str = "other",
+) -> bool:
+    """Ждать выполнения условия не дольше timeout
+
+    Фактическое время ожидания суммируется в stats["waits"][phase].
+    """
+    started = time.monotonic()
     try:
-        author = _extract_author_name(review_element)
-        user_id = _extract_user_id(review_element)
-        rating = _extract_rating(review_element)
-        text = _extract_review_text(review_element)
-        date_iso = _extract_review_date(review_element)
-
-        if user_id:
-            yandex_review_id = (
-                user_id if len(user_id) > 7 else f"{user_id}_{date_iso[:10]}"
+        WebDriverWait(
+            driver, cap_timeout(timeout), poll_frequency=WAIT_POLL_INTERVAL
+        ).until(
+            condition
+        )
+        return True
+    except TimeoutException:
+        return False
+    finally:
+        _add_wait(stats, phase, time.monotonic() - started)
+
+
+def _add_wait(stats: dict[str, Any] | None, phase: str, seconds: float) -> None:
+    if stats is not None and seconds > 0:
+        waits = stats.setdefault("waits", {})
+        waits[phase] = waits.get(phase, 0.0) + seconds
+
+
+@contextmanager
+def _timed_phase(stats: dict[str, Any] | None, phase: str) -> Iterator[None]:
+    """Замерить длительность фазы парсинга в stats["phases"][phase]"""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            phases = stats.setdefault("phases", {})
+            phases[phase] = round(
+                phases.get(phase, 0.0) + time.monotonic() - started, 3
             )
-        else:
-            yandex_review_id = f"{author}_{date_iso[:10]}"
 
-        return {
-            "author": author,
-            "yandex_review_id": yandex_review_id,
-            "rating": rating,
-            "text": text,
-            "date_iso": date_iso,
-        }
 
-    except Exception as e:
-        logger.error(f"Ошибка при извлечении данных отзыва: {e}")
-        return None
+def _add_count(stats: dict[str, Any] | None, name: str, value: int = 1) -> None:
+    if stats is not None:
+        counts = stats.setdefault("counts", {})
+        counts[name] = counts.get(name, 0) + value
 
 
-def _extract_author_name(review_element: BeautifulSoup) -> str:
-    selectors = [
-        'span[itemprop="name"]',
-        "div.business-review-view__author-name",
-        "span.business-review-view__author",
-    ]
-    for selector in selectors:
-        elem = review_element.select_one(selector)
-        if elem:
-            return elem.get_text(strip=True)
-    return "Аноним"
+def _page_ready(driver: webdriver.Chrome) -> bool:
+    return driver.execute_script(
+        "return document.readyState === 'complete' && ("
+        "document.querySelector(arguments[0]) !== null || "
+        "document.querySelector('.rating-ranking-view') !== null);",
+        REVIEW_CARD_SELECTOR,
+    )
 
 
-def _extract_user_id(review_element: BeautifulSoup) -> str | None:
-    # Из ссылки на профиль
-    author_container = review_element.find(
-        "div", class_="business-review-view__author-container"
+# Прокручивается сам контейнер списка отзывов (ближайший прокручиваемый
+# предок последней карточки), а не document.body: у панели места своя прокрутка.
+# Возвращает [число карточек вместе с заглушками, scrollHeight контейнера
+# до прокрутки].
+SCROLL_REVIEWS_JS = r"""
+const cards = document.querySelectorAll(arguments[0]);
+let box = null;
+for (let el = cards.length ? cards[cards.length - 1].parentElement : null; el; el = el.parentElement) {
+  const overflow = getComputedStyle(el).overflowY;
+  if ((overflow === "auto" || overflow === "scroll") && el.scrollHeight > el.clientHeight) {
+    box = el;
+    break;
+  }
+}
+box = box || document.scrollingElement || document.documentElement;
+const height = box.scrollHeight;
+if (arguments[1]) box.scrollTop = height;
+return [cards.length, height];
+"""
+
+
+def _reviews_scroll_state(
+    driver: webdriver.Chrome, scroll: bool = False
+) -> tuple[int, int]:
+    """(число карточек, высота контейнера отзывов); scroll — прокрутить в конец"""
+    card_count, height = driver.execute_script(
+        SCROLL_REVIEWS_JS, REVIEW_SLOT_SELECTOR, scroll
     )
-    if author_container:
-        for link in author_container.find_all("a", href=True):
-            if "/maps/user/" in link["href"]:
-                return link["href"].split("/maps/user/")[-1].split("/")[0]
-
-    # Из аватара
-    avatar_div = review_element.find("div", class_="user-icon-view__icon")
-    if avatar_div and "style" in avatar_div.attrs:
-        style = avatar_div["style"]
-        if "background-image" in style:
-            url_match = re.search(r'url\("([^"]+)"\)', style)
-            if url_match and "get-yapic" in url_match.group(1):
-                parts = url_match.group(1).split("/")
-                if len(parts) >= 5:
-                    return parts[4]
-    return None
-
-
-def _extract_rating(review_element: BeautifulSoup) -> int:
-    rating_div = review_element.find("div", class_="business-rating-badge-view__stars")
-    if rating_div and "aria-label" in rating_div.attrs:
-        try:
-            return int(rating_div["aria-label"].split()[1])
-        except (IndexError, ValueError):
-            pass
+    return int(card_count), int(height)
+
+
+# Заменяет первые N карточек пустыми блоками с той же высотой и отступами,
+# чтобы позиция прокрутки не сдвигалась, а поддеревья карточек освобождались.
+PRUNE_CARDS_JS = r"""
+const cards = Array.from(document.querySelectorAll(arguments[0])).slice(0, arguments[1]);
+for (const card of cards) {
+  const style = getComputedStyle(card);
+  const placeholder = document.createElement("div");
+  placeholder.className = arguments[2];
+  placeholder.style.height = card.getBoundingClientRect().height + "px";
+  placeholder.style.margin = style.margin;
+  card.replaceWith(placeholder);
+}
+return cards.length;
+"""
+
 
-    stars = review_element.find_all(
-        "span", class_="business-rating-badge-view__star _full"
+def _prune_review_cards(driver: webdriver.Chrome, count: int) -> int:
+    """Заменить первые count карточек заглушками; возвращает число замененных"""
+    return int(
+        driver.execute_script(
+            PRUNE_CARDS_JS, REVIEW_CARD_SELECTOR, count, PRUNED_CARD_CLASS
+        )
     )
-    return len(stars)
 
 
-def _extract_review_text(review_element: BeautifulSoup) -> str:
-    selectors = ["span.spoiler-view__text-container", "div.business-review-view__body"]
-    for selector in selectors:
-        elem = review_element.select_one(selector)
-        if elem:
-            return elem.get_text(strip=True)
-    return "Нет текста"
+def _has_pruned_cards(driver: webdriver.Chrome) -> bool:
+    return driver.execute_script(
+        "return document.querySelector(arguments[0]) !== null;",
+        f"div.{PRUNED_CARD_CLASS}",
+    )
 
 
-def _extract_review_date(review_element: BeautifulSoup) -> str:
-    date_elem = review_element.find("span", class_="business-review-view__date")
-    if date_elem:
-        meta_date = date_elem.find("meta", itemprop="datePublished")
-        if meta_date and "content" in meta_date.attrs:
-            return meta_date["content"]
-        return date_elem.get_text(strip=True)
-    return "Дата не указана"
+# Рейтинг и число отзывов из шапки: meta aggregateRating, иначе видимый текст
+# бейджа рейтинга и счетчика на вкладке отзывов
+READ_HEADER_JS = r"""
+const aggregate = document.querySelector('[itemprop="' + arguments[0] + '"]');
+function meta(name) {
+  const el = aggregate && aggregate.querySelector('meta[itemprop="' + name + '"]');
+  return el ? el.getAttribute("content") : null;
+}
+function text(selector) {
+  const el = document.querySelector(selector);
+  return el ? el.textContent : null;
+}
+return [
+  meta(arguments[1]) || text(".business-summary-rating-badge-view__rating"),
+  meta(arguments[2]) || text(".tabs-select-view__title._name_reviews .tabs-select-view__counter"),
+];
+"""
+
+
+def _read_place_header(driver: webdriver.Chrome) -> dict[str, Any]:
+    try:
+        rating_raw, review_count_raw = driver.execute_script(
+            READ_HEADER_JS,
+            HEADER_AGGREGATE_ITEMPROP,
+            HEADER_RATING_ITEMPROP,
+            HEADER_REVIEW_COUNT_ITEMPROP,
+        )
+    except Exception as e:
+        logger.debug(f"Не удалось прочитать шапку места: {e}")
+        return build_place_header(None, None)
+    return build_place_header(rating_raw, review_count_raw)
+
+
+def _page_grew(
+    card_count: int, height: int
+) -> Callable[[webdriver.Chrome], bool]:
+    """Условие: появились новые карточки или изменилась высота списка отзывов"""
+
+    def condition(driver: webdriver.Chrome) -> bool:
+        new_count, new_height = _reviews_scroll_state(driver)
+        return new_count > card_count or new_height != height
+
+    return condition
+
+
+def _scroll_budget(
+    max_reviews: int, scroll_attempts: int, cards_per_scroll: float | None = None
+) -> int:
+    """Предел прокруток для одной страницы
+
+    Прокрутка останавливается раньше, когда набрано max_reviews карточек или
+    список перестал расти. По сохраненному cards_per_scroll бюджет сразу
+    рассчитывается под max_reviews; без статистики и при max_reviews <= 0
+    действует только SCROLL_MAX_ATTEMPTS.
+    """
+    if max_reviews <= 0 or not cards_per_scroll:
+        return max(scroll_attempts, SCROLL_MAX_ATTEMPTS)
+    needed = math.ceil(max_reviews / cards_per_scroll) + SCROLL_STALL_LIMIT
+    return min(max(scroll_attempts, needed), max(scroll_attempts, SCROLL_MAX_ATTEMPTS))
+
+
+# Повторяет extract_review_data в браузере: те же селекторы, тот же порядок
+# fallback'ов и та же нормализация текста, что у bs4 get_text(strip=True).
+# Возвращает по массиву [author, user_id, rating, text, date_iso] на карточку.
+EXTRACT_REVIEWS_JS = r"""
+const WS = "[\t\n\v\f\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+";
+const TRIM = new RegExp("^" + WS + "|" + WS + "$", "g");
+const SKIP = new Set(["SCRIPT", "STYLE", "TEMPLATE"]);
+
+function text(root) {
+  const parts = [];
+  const walker = document.createTreeWalker(root, NodeFilter.SHOW_TEXT);
+  for (let node = walker.nextNode(); node; node = walker.nextNode()) {
+    let skip = false;
+    for (let p = node.parentNode; p && p !== root.parentNode; p = p.parentNode) {
+      if (SKIP.has(p.nodeName)) { skip = true; break; }
+    }
+    if (skip) continue;
+    const value = node.nodeValue.replace(TRIM, "");
+    if (value) parts.push(value);
+  }
+  return parts.join("");
+}
+
+function firstText(card, selectors) {
+  for (const selector of selectors) {
+    const el = card.querySelector(selector);
+    if (el) return text(el);
+  }
+  return null;
+}
+
+function userId(card) {
+  const container = card.querySelector("div.business-review-view__author-container");
+  if (container) {
+    for (const link of container.querySelectorAll("a[href]")) {
+      const href = link.getAttribute("href");
+      if (href.includes("/maps/user/")) {
+        return href.split("/maps/user/").pop().split("/")[0];
+      }
+    }
+  }
+  const avatar = card.querySelector("div.user-icon-view__icon");
+  if (avatar && avatar.hasAttribute("style")) {
+    const style = avatar.getAttribute("style");
+    if (style.includes("background-image")) {
+      const match = style.match(/url\("([^"]+)"\)/);
+      if (match && match[1].includes("get-yapic")) {
+        const parts = match[1].split("/");
+        if (parts.length >= 5) return parts[4];
+      }
+    }
+  }
+  return null;
+}
+
+function rating(card) {
+  const stars = card.querySelector("div.business-rating-badge-view__stars");
+  if (stars && stars.hasAttribute("aria-label")) {
+    const word = stars.getAttribute("aria-label").replace(TRIM, "").split(new RegExp(WS))[1];
+    if (word !== undefined && /^[+-]?\d+$/.test(word)) return parseInt(word, 10);
+  }
+  let full = 0;
+  for (const span of card.getElementsByTagName("span")) {
+    const cls = (span.getAttribute("class") || "").replace(TRIM, "").split(new RegExp(WS)).join(" ");
+    if (cls === "business-rating-badge-view__star _full") full++;
+  }
+  return full;
+}
+
+function date(card) {
+  const el = card.querySelector("span.business-review-view__date");
+  if (!el) return null;
+  const meta = el.querySelector('meta[itemprop="datePublished"]');
+  if (meta && meta.hasAttribute("content")) return meta.getAttribute("content");
+  return text(el);
+}
+
+return Array.from(document.querySelectorAll(arguments[0])).slice(arguments[1]).map(card => [
+  firstText(card, ['span[itemprop="name"]', "div.business-review-view__author-name", "span.business-review-view__author"]),
+  userId(card),
+  rating(card),
+  firstText(card, ["span.spoiler-view__text-container", "div.business-review-view__body"]),
+  date(card),
+]);
+"""
+
+
+def _extract_reviews_js(
+    driver: webdriver.Chrome, start: int = 0
+) -> list[dict[str, Any] | None]:
+    """Извлечь отзывы одним скриптом в браузере, без передачи page_source"""
+    rows = driver.execute_script(EXTRACT_REVIEWS_JS, REVIEW_CARD_SELECTOR, start)
+
+    reviews = []
+    for row in rows:
+        try:
+            reviews.append(build_review_data(*row))
+        except Exception as e:
+            logger.error(f"Ошибка при извлечении данных отзыва: {e}")
+            reviews.append(None)
+    return reviews
 
 
 def parse_yandex_reviews(
-    url: str, max_reviews: int = -1, scroll_attempts: int = DEFAULT_SCROLL_ATTEMPTS
+    url: str,
+    max_reviews: int = -1,
+    scroll_attempts: int = DEFAULT_SCROLL_ATTEMPTS,
+    pool: DriverPool | None = None,
+    known_review_ids: set[str] | None = None,
+    stats: dict[str, Any] | None = None,
+    snapshot: Callable[[str], Any] | None = None,
+    cards_per_scroll: float | None = None,
+    writer: ReviewBatchWriter | None = None,
+    header_check: Callable[[dict[str, Any]], bool] | None = None,
 ) -> list[dict[str, Any]]:
+    """Парсинг отзывов со страницы места в Яндекс.Картах
+
+    Args:
+        url: ссылка на вкладку отзывов места
+        max_reviews: сколько отзывов собрать; <= 0 — все
+        scroll_attempts: минимальный предел прокруток списка отзывов
+            (см. _scroll_budget)
+        pool: пул браузеров; без него на каждую попытку запускается свой браузер
+        known_review_ids: yandex_review_id уже сохраненных отзывов. Если передан,
+            карточки проверяются по мере прокрутки и сбор останавливается на
+            серии известных отзывов (инкрементальный режим).
+        stats: словарь для метрик парсинга (длительность и ожидания по фазам,
+            счетчики прокруток и карточек, время загрузки, скачанные байты)
+        snapshot: вызывается с итоговым HTML страницы после успешного сбора
+        cards_per_scroll: сохраненное среднее число карточек на прокрутку;
+            по нему рассчитывается бюджет прокруток под max_reviews
+        writer: если передан, новые карточки извлекаются после каждой прокрутки
+            и сразу пакетами пишутся в БД. Повторная попытка продолжает с уже
+            собранных отзывов, а при окончательном сбое возвращаются они же.
+            Страница при этом загружается заново и список прокручивается
+            с начала: собранные карточки не извлекаются, но прокручиваются снова.
+        header_check: получает рейтинг и число отзывов из шапки сразу после
+            загрузки; True — отзывы не изменились, сортировка и прокрутка
+            пропускаются и возвращается []
+    """
+    # Отзывы, собранные всеми попытками, по yandex_review_id
+    collected: dict[str, dict[str, Any]] = {}
     for attempt in range(1, MAX_RETRY_ATTEMPTS + 1):
         driver = None
+        watchdog = None
+        failed = True
+        _add_count(stats, "attempts")
         try:
-            driver = setup_driver()
-            driver.get(url)
-            time.sleep(3)
+            check_deadline()
+            with _timed_phase(stats, "driver_start"):
+                driver = pool.acquire() if pool else setup_driver()
+            watchdog = MemoryWatchdog(driver)
+            watchdog.start()
+            drain_network_log(driver)
+            with rate_limiter.slot(url) as slot:
+                load_started = time.monotonic()
+                with _timed_phase(stats, "page_load"):
+                    driver.set_page_load_timeout(
+                        max(1.0, cap_timeout(PAGE_LOAD_TIMEOUT))
+                    )
+                    driver.get(url)
+                    _wait_for(
+                        driver, _page_ready, PAGE_READY_TIMEOUT, stats, "page_ready"
+                    )
+                if stats is not None:
+                    stats["page_load_seconds"] = round(
+                        time.monotonic() - load_started, 2
+                    )
+                page_loaded = _verify_page_loaded(driver, slot)
+            _add_wait(stats, "rate_limit", slot.waited)
 
-            if not _verify_page_loaded(driver):
+            if not page_loaded:
                 raise Exception("Страница не загрузилась")
 
-            _sort_reviews_by_newest(driver)
+            if header_check and header_check(_read_place_header(driver)):
+                failed = False
+                return []
 
-            if not _wait_for_reviews_loading(driver):
-                raise Exception("Отзывы не загрузились")
+            capture = None
+            if REVIEWS_EXTRACTION_MODE == "network":
+                capture = NetworkReviewCapture(driver)
+                # Нужны только ответы после переключения на "По новизне"
+                capture.skip()
+
+            check_deadline()
+            with _timed_phase(stats, "sort"):
+                sorted_by_newest = _sort_reviews_by_newest(driver, stats)
+
+            with _timed_phase(stats, "reviews_wait"):
+                if not _wait_for_reviews_loading(driver):
+                    raise Exception("Отзывы не загрузились")
+
+            with _timed_phase(stats, "scroll_extract"):
+                reviews = _collect_new_reviews(
+                    driver,
+                    scroll_attempts,
+                    max_reviews,
+                    known_review_ids,
+                    stop_on_known=sorted_by_newest,
+                    stats=stats,
+                    cards_per_scroll=cards_per_scroll,
+                    collected=collected,
+                    writer=writer,
+                    capture=capture,
+                )
 
-            _scroll_page_for_reviews(driver, scroll_attempts)
-            reviews = _parse_reviews_from_page(driver, max_reviews)
+            _add_count(stats, "cards", len(reviews))
+            if stats is not None:
+                network = collect_network_stats(driver)
+                if capture:
+                    network = capture.network_stats(network)
+                    _add_count(stats, "network_responses", capture.responses)
+                stats.update(network)
+                _add_count(stats, "page_source_bytes", _page_source_size(driver))
 
             if reviews:
+                failed = False
+                if snapshot and _has_pruned_cards(driver):
+                    logger.debug("Часть карточек удалена из DOM, снимок не сохраняется")
+                elif snapshot:
+                    _save_page_snapshot(driver, snapshot)
                 return reviews
             else:
                 if attempt < MAX_RETRY_ATTEMPTS:
-                    time.sleep(RETRY_DELAY)
+                    time.sleep(cap_timeout(RETRY_DELAY))
                     continue
                 return []
 
-        except Exception:
+        except Exception as e:
+            # Бюджет может истечь внутри driver.get, WebDriverWait или другой
+            # команды Selenium — тогда приходит TimeoutException/WebDriverException.
+            # Это тоже исчерпанный бюджет, а не сбой страницы.
+            if isinstance(e, DeadlineExceededError) or deadline_passed():
+                logger.warning(
+                    f"Бюджет времени исчерпан на попытке {attempt}, "
+                    f"собрано отзывов: {len(collected)}"
+                )
+                if stats is not None:
+                    stats["deadline_exceeded"] = True
+                    stats["partial"] = True
+                return list(collected.values())
+
             if attempt < MAX_RETRY_ATTEMPTS:
-                time.sleep(RETRY_DELAY)
+                if collected:
+                    logger.warning(
+                        f"Попытка {attempt} прервана ({e}), уже собрано "
+                        f"{len(collected)} отзывов — продолжаем с них"
+                    )
+                time.sleep(cap_timeout(RETRY_DELAY))
             else:
-                return []
+                if collected:
+                    logger.warning(
+                        f"Парсинг прерван ({e}), возвращаем "
+                        f"{len(collected)} собранных отзывов"
+                    )
+                    if stats is not None:
+                        stats["partial"] = True
+                return list(collected.values())
 
         finally:
-            if driver:
+            if writer:
+                _flush_writer(writer)
+            memory_peak_mb = watchdog.stop() if watchdog else None
+            if memory_peak_mb is not None and stats is not None:
+                stats["memory_peak_mb"] = round(
+                    max(stats.get("memory_peak_mb", 0.0), memory_peak_mb), 1
+                )
+
+            if driver and pool:
+                # Неудачная попытка или раздувшийся браузер — повод пересоздать
+                pool.release(driver, broken=failed, memory_mb=memory_peak_mb)
+            elif driver:
                 try:
                     driver.quit()
                 except Exception as e:
                     logger.warning(f"Ошибка при закрытии драйвера: {e}")
 
-    return []
+    return list(collected.values())
 
 
-def _sort_reviews_by_newest(driver: webdriver.Chrome) -> None:
+def _flush_writer(writer: ReviewBatchWriter) -> None:
+    """Дописать неполный пакет, в том числе после сбоя попытки"""
+    try:
+        writer.flush()
+    except Exception as e:
+        logger.warning(f"Не удалось сохранить отзывы: {e}")
+
+
+def _page_source_size(driver: webdriver.Chrome) -> int:
+    """Размер HTML страницы без передачи самого HTML из браузера"""
+    try:
+        return int(
+            driver.execute_script("return document.documentElement.outerHTML.length;")
+        )
+    except Exception:
+        return 0
+
+
+def _save_page_snapshot(
+    driver: webdriver.Chrome, snapshot: Callable[[str], Any]
+) -> None:
+    try:
+        snapshot(driver.page_source)
+    except Exception as e:
+        logger.warning(f"Не удалось сохранить снимок страницы: {e}")
+
+
+def _sort_reviews_by_newest(
+    driver: webdriver.Chrome, stats: dict[str, Any] | None = None
+) -> bool:
+    """Переключить сортировку отзывов на "По новизне"
+
+    Returns:
+        True, если пункт "По новизне" удалось выбрать
+    """
     try:
         sort_selectors = [
             ".business-reviews-card-view__ranking .rating-ranking-view",
@@ -219,7 +686,7 @@ def _sort_reviews_by_newest(driver: webdriver.Chrome) -> None:
         sort_btn = None
         for selector in sort_selectors:
             try:
-                sort_btn = WebDriverWait(driver, 5).until(
+                sort_btn = WebDriverWait(driver, cap_timeout(5)).until(
                     expected_conditions.element_to_be_clickable((By.CSS_SELECTOR, selector))
                 )
                 break
@@ -228,30 +695,30 @@ def _sort_reviews_by_newest(driver: webdriver.Chrome) -> None:
                 continue
 
         if not sort_btn:
-            return
+            return False
 
         driver.execute_script(
             "arguments[0].scrollIntoView({block: 'center'});", sort_btn
         )
-        time.sleep(1)
+        _wait_for(
+            driver, expected_conditions.element_to_be_clickable(sort_btn), 1, stats, "sort"
+        )
         try:
             sort_btn.click()
         except BaseException as e:
             logger.debug(f"Ошибка при клике: {e}")
             driver.execute_script("arguments[0].click();", sort_btn)
-        time.sleep(2)
 
         popup_selectors = [".rating-ranking-view__popup", ".popup", "[class*='popup']"]
         popup = None
         for selector in popup_selectors:
-            try:
-                popup = WebDriverWait(driver, 5).until(
-                    expected_conditions.visibility_of_element_located((By.CSS_SELECTOR, selector))
-                )
+            located = expected_conditions.visibility_of_element_located(
+                (By.CSS_SELECTOR, selector)
+            )
+            if _wait_for(driver, located, 5, stats, "sort"):
+                popup = driver.find_element(By.CSS_SELECTOR, selector)
                 break
-            except BaseException as e:
-                logger.debug(f"Селектор {selector} не сработал: {e}")
-                continue
+            logger.debug(f"Селектор {selector} не сработал")
 
         if popup:
             newest_selectors = [
@@ -260,6 +727,7 @@ def _sort_reviews_by_newest(driver: webdriver.Chrome) -> None:
                 "[data-value='newest']",
             ]
 
+            cards = driver.find_elements(By.CSS_SELECTOR, REVIEW_CARD_SELECTOR)
             for selector in newest_selectors:
                 try:
                     newest_item = popup.find_element(
@@ -267,8 +735,14 @@ def _sort_reviews_by_newest(driver: webdriver.Chrome) -> None:
                         selector,
                     )
                     driver.execute_script("arguments[0].click();", newest_item)
-                    time.sleep(3)
-                    break
+                    # Список перерисован: старая первая карточка отсоединена от DOM
+                    applied = (
+                        expected_conditions.staleness_of(cards[0])
+                        if cards
+                        else expected_conditions.invisibility_of_element(popup)
+                    )
+                    _wait_for(driver, applied, SORT_APPLY_TIMEOUT, stats, "sort")
+                    return True
                 except BaseException as e:
                     logger.debug(f"Селектор {selector} не сработал: {e}")
                     continue
@@ -276,15 +750,32 @@ def _sort_reviews_by_newest(driver: webdriver.Chrome) -> None:
     except Exception as e:
         logger.warning(f"Ошибка при сортировке отзывов: {e}")
 
+    return False
+
+
+def _verify_page_loaded(
+    driver: webdriver.Chrome, slot: RateLimitSlot | None = None
+) -> bool:
+    """Проверить, что загрузилась страница места
 
-def _verify_page_loaded(driver: webdriver.Chrome) -> bool:
+    Капча и страница ошибки сообщаются в slot, чтобы лимитер снизил нагрузку
+    на хост.
+    """
     try:
-        WebDriverWait(driver, 10).until(
+        WebDriverWait(driver, cap_timeout(10)).until(
             expected_conditions.presence_of_element_located((By.TAG_NAME, "body"))
         )
 
+        if "showcaptcha" in driver.current_url:
+            logger.error("Яндекс показал капчу")
+            if slot:
+                slot.throttled()
+            return False
+
         if "404" in driver.title or "Ошибка" in driver.title:
             logger.error("Загружена страница ошибки")
+            if slot and "Ошибка" in driver.title:
+                slot.throttled()
             return False
 
         return True
@@ -303,7 +794,7 @@ def _wait_for_reviews_loading(driver: webdriver.Chrome) -> bool:
 
         for selector in selectors:
             try:
-                WebDriverWait(driver, ELEMENT_WAIT_TIMEOUT).until(
+                WebDriverWait(driver, cap_timeout(ELEMENT_WAIT_TIMEOUT)).until(
                     expected_conditions.presence_of_element_located((By.CSS_SELECTOR, selector))
                 )
                 logger.info(f"✓ Отзывы загружены (селектор: {selector})")
@@ -320,38 +811,187 @@ def _wait_for_reviews_loading(driver: webdriver.Chrome) -> bool:
         return False
 
 
-def _scroll_page_for_reviews(driver: webdriver.Chrome, scroll_attempts: int) -> None:
-    last_height = driver.execute_script("return document.body.scrollHeight")
+def _scroll_reviews(
+    driver: webdriver.Chrome, card_count: int, stats: dict[str, Any] | None = None
+) -> int:
+    """Одна прокрутка контейнера отзывов; возвращает новое число карточек"""
+    _, height = _reviews_scroll_state(driver, scroll=True)
+    _add_count(stats, "scrolls")
+    _wait_for(driver, _page_grew(card_count, height), SCROLL_DELAY, stats, "scroll")
+    return _reviews_scroll_state(driver)[0]
 
-    for _ in range(scroll_attempts):
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(SCROLL_DELAY)
 
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
-            break
-        last_height = new_height
+def _extract_cards_from(
+    driver: webdriver.Chrome, start: int
+) -> list[dict[str, Any] | None]:
+    """Извлечь отзывы из карточек, начиная с позиции start (только новые узлы)"""
+    if REVIEWS_EXTRACTION_MODE in ("js", "network"):
+        try:
+            return _extract_reviews_js(driver, start)
+        except Exception as e:
+            logger.warning(f"JS-извлечение не удалось, разбираем HTML: {e}")
+
+    cards_html = driver.execute_script(
+        "return Array.from(document.querySelectorAll(arguments[0]))"
+        ".slice(arguments[1]).map(el => el.outerHTML);",
+        REVIEW_CARD_SELECTOR,
+        start,
+    )
+    # None сохраняет позицию карточки, чтобы не сбить счетчик
+    return parse_review_cards("".join(cards_html))
+
+
+def _next_review_cards(
+    driver: webdriver.Chrome,
+    processed: int,
+    capture: NetworkReviewCapture | None = None,
+) -> tuple[list[dict[str, Any] | None], int]:
+    """Новые отзывы и число обработанных карточек, оставшихся в DOM"""
+    if capture is not None:
+        cards = capture.poll()
+        if capture.responses:
+            # Данные пришли из API: все отрисованные карточки уже не нужны
+            return cards, _live_card_count(driver)
+        # Первая страница отзывов пришла в HTML (или лог сети недоступен)
+        return cards + _extract_cards_from(driver, processed), _live_card_count(driver)
+
+    cards = _extract_cards_from(driver, processed)
+    return cards, processed + len(cards)
+
+
+def _live_card_count(driver: webdriver.Chrome) -> int:
+    return int(
+        driver.execute_script(
+            "return document.querySelectorAll(arguments[0]).length;",
+            REVIEW_CARD_SELECTOR,
+        )
+    )
 
 
-def _parse_reviews_from_page(
-    driver: webdriver.Chrome, max_reviews: int
+def _collect_new_reviews(
+    driver: webdriver.Chrome,
+    scroll_attempts: int,
+    max_reviews: int,
+    known_review_ids: set[str] | None,
+    stop_on_known: bool = True,
+    stats: dict[str, Any] | None = None,
+    cards_per_scroll: float | None = None,
+    collected: dict[str, dict[str, Any]] | None = None,
+    writer: ReviewBatchWriter | None = None,
+    keep_cards: int = REVIEWS_DOM_KEEP_CARDS,
+    capture: NetworkReviewCapture | None = None,
 ) -> list[dict[str, Any]]:
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    review_elements = soup.find_all("div", class_="business-reviews-card-view__review")
+    """Прокрутка с извлечением только новых карточек после каждого шага
+
+    Возвращает новые отзывы и встреченную серию известных: непустой результат
+    по-прежнему означает, что страница с отзывами рабочая. known_review_ids=None
+    отключает остановку на известных отзывах.
+
+    Args:
+        driver: драйвер с загруженной вкладкой отзывов
+        scroll_attempts: минимальный предел прокруток (см. _scroll_budget)
+        max_reviews: сколько отзывов собрать; <= 0 — все
+        known_review_ids: yandex_review_id сохраненных отзывов
+        stop_on_known: остановиться после INCREMENTAL_STOP_AFTER известных
+            отзывов подряд; имеет смысл, только если список идет по новизне
+        stats: словарь для метрик (прокрутки, карточки, ожидания)
+        cards_per_scroll: сохраненное среднее число карточек на прокрутку
+            для расчета бюджета прокруток
+        collected: отзывы прошлых попыток; они не извлекаются повторно
+            и учитываются в max_reviews. Прокрутка все равно идет с начала
+            списка, поэтому бюджет прокруток не уменьшается на их число
+        writer: получает каждый новый отзыв для пакетной записи в БД
+        keep_cards: если > 0, обработанные карточки сверх последних keep_cards
+            заменяются заглушками, и DOM не растет с числом отзывов
+        capture: отзывы берутся из перехваченных ответов fetchReviews; из DOM
+            извлекаются только карточки, пришедшие до первого ответа
+    """
+    reviews = collected if collected is not None else {}
+    known_review_ids = known_review_ids or set()
+    # Обработанные карточки, еще оставшиеся в DOM (индекс первой новой)
+    processed = 0
+    known_streak = 0
+    stalls = 0
+    budget = _scroll_budget(max_reviews, scroll_attempts, cards_per_scroll)
+    card_count, _ = _reviews_scroll_state(driver)
+    initial_count = card_count
 
-    reviews = []
-    for element in review_elements[:max_reviews]:
-        review_data = extract_review_data(element)
-        if review_data:
-            reviews.append(review_data)
+    try:
+        for scroll in range(budget + 1):
+            cards, processed = _next_review_cards(driver, processed, capture)
+            if 0 < keep_cards < processed:
+                pruned = _prune_review_cards(driver, processed - keep_cards)
+                processed -= pruned
+                _add_count(stats, "pruned_cards", pruned)
+
+            for review_data in cards:
+                if not review_data or review_data["yandex_review_id"] in reviews:
+                    continue
+                reviews[review_data["yandex_review_id"]] = review_data
+                if writer:
+                    writer.add([review_data])
 
-    return reviews
+                if review_data["yandex_review_id"] in known_review_ids:
+                    known_streak += 1
+                else:
+                    known_streak = 0
+
+                if stop_on_known and known_streak >= INCREMENTAL_STOP_AFTER:
+                    new_count = sum(
+                        review_id not in known_review_ids for review_id in reviews
+                    )
+                    logger.info(
+                        f"Достигнуты известные отзывы после {scroll} прокруток, "
+                        f"новых: {new_count}"
+                    )
+                    return list(reviews.values())
+
+                if 0 < max_reviews <= len(reviews):
+                    return list(reviews.values())
+
+            # Список не растет — последний проход по карточкам уже сделан
+            if stalls >= SCROLL_STALL_LIMIT or scroll == budget:
+                break
+            check_deadline()
+
+            new_count = _scroll_reviews(driver, card_count, stats)
+            stalls = 0 if new_count > card_count else stalls + 1
+            card_count = new_count
+    finally:
+        _add_count(stats, "scroll_cards", card_count - initial_count)
 
+    return list(reviews.values())
 
-async def make_request(place: str, place_coordinates: dict[str, Any]) -> str | None:
+
+async def make_request(
+    place: str,
+    place_coordinates: dict[str, Any],
+    client: httpx.AsyncClient | None = None,
+) -> str | None:
+    """Найти место через Yandex Suggest и вернуть ссылку на вкладку отзывов
+
+    Args:
+        place: название места для поиска
+        place_coordinates: latitude и longitude места; без них поиск идет
+            без параметра ll
+        client: общий клиент для серии запросов; без него создается временный
+    """
+    reviews_url, _ = await lookup_reviews_url(place, place_coordinates, client)
+    return reviews_url
+
+
+async def lookup_reviews_url(
+    place: str,
+    place_coordinates: dict[str, Any],
+    client: httpx.AsyncClient | None = None,
+) -> tuple[str | None, bool]:
+    """Как make_request, но также сообщает, дал ли API ответ
+
+    Второй элемент False при ошибках запроса — такие результаты не кэшируются.
+    """
     if not YA_GEO_SUGEST_API_KEY:
         logger.warning("YA_GEO_SUGEST_API_KEY не установлен")
-        return None
+        return None, False
 
     url = "https://suggest-maps.yandex.ru/v1/suggest"
 
@@ -373,38 +1013,164 @@ async def make_request(place: str, place_coordinates: dict[str, Any]) -> str | N
             f"{place_coordinates['latitude']},{place_coordinates['longitude']}"
         )
 
-    async with httpx.AsyncClient() as client:
-        try:
-            logger.info(f"Поиск места: {place}")
+    if client is None:
+        async with httpx.AsyncClient() as own_client:
+            return await _suggest_reviews_url(own_client, url, params, place)
+    return await _suggest_reviews_url(client, url, params, place)
+
+
+async def _suggest_reviews_url(
+    client: httpx.AsyncClient, url: str, params: dict[str, Any], place: str
+) -> tuple[str | None, bool]:
+    try:
+        logger.info(f"Поиск места: {place}")
+        async with rate_limiter.slot_async(url) as slot:
             response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
-
-            if data.get("results"):
-                title = data["results"][0].get("title", "Название не указано")
-                logger.success(f"Место найдено: {title}")
-                place_info = data["results"][0]
-                yandex_uri = place_info.get("uri")
-                if not yandex_uri:
-                    logger.error("В ответе API отсутствует uri")
-                    return None
-                search_link = f"https://yandex.ru/maps/?mode=poi&poi[uri]={yandex_uri}&tab=reviews"
-                return search_link
-            else:
-                logger.warning(f"Место не найдено: {place}")
-                return None
+            if response.status_code == 429:
+                slot.throttled()
+        response.raise_for_status()
+        data = response.json()
+
+        if data.get("results"):
+            title = data["results"][0].get("title", "Название не указано")
+            logger.success(f"Место найдено: {title}")
+            place_info = data["results"][0]
+            yandex_uri = place_info.get("uri")
+            if not yandex_uri:
+                logger.error("В ответе API отсутствует uri")
+                return None, False
+            search_link = f"https://yandex.ru/maps/?mode=poi&poi[uri]={yandex_uri}&tab=reviews"
+            return search_link, True
+        else:
+            logger.warning(f"Место не найдено: {place}")
+            return None, True
 
+    except Exception as e:
+        logger.error(f"Ошибка при запросе к API: {e}")
+        return None, False
+
+
+async def _resolve_urls_concurrently(
+    places: list[tuple[str, str, dict[str, Any]]], concurrency: int
+) -> dict[str, tuple[str | None, bool]]:
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(
+        max_connections=concurrency, max_keepalive_connections=concurrency
+    )
+
+    async with httpx.AsyncClient(limits=limits, timeout=SUGGEST_TIMEOUT) as client:
+
+        async def resolve(
+            notion_id: str, name: str, coordinates: dict[str, Any]
+        ) -> tuple[str, tuple[str | None, bool]]:
+            async with semaphore:
+                return notion_id, await lookup_reviews_url(name, coordinates, client)
+
+        results = await asyncio.gather(*(resolve(*place) for place in places))
+
+    return dict(results)
+
+
+def resolve_reviews_urls(
+    db: SessionLocal,
+    restaurants: list[Restaurant],
+    concurrency: int = SUGGEST_CONCURRENCY,
+    cache: SuggestCache | None = None,
+) -> dict[str, str | None]:
+    """Найти ссылки на отзывы для всех ресторанов без проверенной ссылки
+
+    Рестораны со статусом unknown или без yandex_maps_url сначала ищутся
+    в кэше, остальные разрешаются параллельно через общий клиент. Найденные
+    ссылки и ответы API записываются в БД одной транзакцией.
+    Возвращает notion_id -> ссылка; None — API ответил, что место не найдено,
+    и повторно его искать не нужно. Рестораны, для которых запрос не удался,
+    в результат не попадают.
+    """
+    places = [
+        (
+            r.notion_id,
+            r.name,
+            {"latitude": r.latitude, "longitude": r.longitude},
+        )
+        for r in restaurants
+        if (r.yandex_url_status == "unknown" or not r.yandex_maps_url)
+        and (
+            (r.address and str(r.address).strip())
+            or (r.latitude is not None and r.longitude is not None)
+        )
+    ]
+    if not places:
+        return {}
+
+    resolved: dict[str, str | None] = {}
+    to_query = []
+    for place in places:
+        cached, url = cache.lookup(place[1], place[2]) if cache else (False, None)
+        if not cached:
+            to_query.append(place)
+        else:
+            resolved[place[0]] = url
+
+    found: dict[str, tuple[str | None, bool]] = {}
+    if to_query:
+        logger.info(
+            f"Поиск ссылок для {len(to_query)} ресторанов ({concurrency} потоков)"
+        )
+        try:
+            found = asyncio.run(
+                _resolve_urls_concurrently(to_query, max(1, concurrency))
+            )
         except Exception as e:
-            logger.error(f"Ошибка при запросе к API: {e}")
-            return None
+            logger.error(f"Ошибка пакетного поиска ссылок: {e}")
+
+    by_notion_id = {r.notion_id: r for r in restaurants}
+    try:
+        for notion_id, name, coordinates in to_query:
+            url, answered = found.get(notion_id, (None, False))
+            if cache and answered:
+                cache.store(name, coordinates, url, commit=False)
+            if answered:
+                resolved[notion_id] = url
+        for notion_id, url in resolved.items():
+            if url:
+                by_notion_id[notion_id].yandex_maps_url = url
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Не удалось сохранить найденные ссылки: {e}")
+        return {}
+
+    found_count = sum(1 for url in resolved.values() if url)
+    logger.info(
+        f"Найдено ссылок: {found_count} из {len(places)}, "
+        f"запросов к API: {len(to_query)}"
+    )
+    return resolved
 
 
 def parse_and_save_reviews(
     notion_id: str,
     max_reviews: int = DEFAULT_MAX_REVIEWS,
     scroll_attempts: int = DEFAULT_SCROLL_ATTEMPTS,
+    pool: DriverPool | None = None,
+    incremental: bool = False,
+    save_snapshots: bool = SAVE_SNAPSHOTS,
+    run_id: str | None = None,
+    http_fetcher: HttpReviewsFetcher | None = None,
+    resolved_urls: dict[str, str | None] | None = None,
+    time_budget: float | None = RESTAURANT_TIME_BUDGET,
 ) -> dict[str, Any]:
-    """Парсинг и сохранение отзывов для конкретного ресторана."""
+    """Парсинг и сохранение отзывов для конкретного ресторана.
+
+    Если передан http_fetcher, сначала пробуем получить отзывы без браузера;
+    parse_yandex_reviews используется только когда этот путь не сработал.
+    resolved_urls — результаты resolve_reviews_urls в этом прогоне; для мест,
+    которые он не нашел (None), Suggest повторно не запрашивается.
+    time_budget — секунды на ресторан с учетом всех фаз и повторов; при
+    превышении собранные отзывы сохраняются, а результат помечается
+    deadline_exceeded для повторного прохода.
+    """
+    started = time.monotonic()
     logger.info(f"Начинаем парсинг отзывов для notion_id: {notion_id}")
     init_db()
     db = SessionLocal()
@@ -444,20 +1210,119 @@ def parse_and_save_reviews(
                 "У места отсутствуют координаты. Поиск будет выполнен без параметра ll."
             )
 
+        suggest_cache = SuggestCache(db)
         if restaurant.yandex_maps_url and restaurant.yandex_url_status == "ok":
             reviews_url = restaurant.yandex_maps_url
         else:
-            reviews_url = _build_reviews_url(place_name, place_coordinates)
+            if resolved_urls and notion_id in resolved_urls:
+                reviews_url = resolved_urls[notion_id]
+            else:
+                reviews_url = _build_reviews_url(
+                    place_name, place_coordinates, suggest_cache
+                )
 
             if not reviews_url:
                 logger.warning("Место не найдено в Яндекс.Картах")
                 update_restaurant_link_status(db, restaurant.id, "not_found")
-                return {"success": False, "error": "Место не найдено в Яндекс.Картах", "skip": True}
+                return {
+                    "success": False,
+                    "error": "Место не найдено в Яндекс.Картах",
+                    "skip": True,
+                    "suggest_cache": suggest_cache.counters,
+                }
 
             restaurant.yandex_maps_url = reviews_url
             db.commit()
 
-        reviews = parse_yandex_reviews(reviews_url, max_reviews, scroll_attempts)
+        known_review_ids = (
+            get_known_review_ids(db, restaurant.id) if incremental else None
+        )
+        snapshot = None
+        if save_snapshots:
+            store = SnapshotStore()
+            snapshot_run_id = run_id or _new_run_id()
+
+            def snapshot(html: str) -> str:
+                return store.save(notion_id, snapshot_run_id, html, url=reviews_url)
+
+        writer = ReviewBatchWriter(db, restaurant.id)
+        scrape_stats: dict[str, Any] = {}
+        header_check = None
+        if REVIEWS_HEADER_CHECK:
+            header_check = partial(
+                _check_place_header, scrape_stats, get_header_state(db, restaurant.id)
+            )
+        reviews = None
+        fetch_path = "browser"
+        if time_budget:
+            # Поиск ссылки тоже входит в бюджет
+            time_budget = max(0.1, time_budget - (time.monotonic() - started))
+        with deadline_scope(time_budget):
+            if http_fetcher:
+                with _timed_phase(scrape_stats, "http_fetch"):
+                    reviews = _fetch_reviews_http(
+                        http_fetcher,
+                        reviews_url,
+                        max_reviews,
+                        known_review_ids,
+                        snapshot,
+                        header_check,
+                    )
+                if reviews or scrape_stats.get("unchanged"):
+                    fetch_path = "http"
+                    _add_count(scrape_stats, "cards", len(reviews))
+
+            if not reviews and not scrape_stats.get("unchanged"):
+                scroll_stats = get_scroll_stats(db, restaurant.id)
+                cards_per_scroll = scroll_stats.cards_per_scroll if scroll_stats else None
+                reviews = parse_yandex_reviews(
+                    reviews_url,
+                    max_reviews,
+                    scroll_attempts,
+                    pool=pool,
+                    known_review_ids=known_review_ids,
+                    stats=scrape_stats,
+                    snapshot=snapshot,
+                    cards_per_scroll=cards_per_scroll,
+                    writer=writer,
+                    header_check=header_check,
+                )
+                _update_scroll_stats(db, restaurant.id, scrape_stats)
+        logger.debug(f"Отзывы получены через {fetch_path}")
+        _log_scrape_waits(scrape_stats)
+        if "page_load_seconds" in scrape_stats:
+            logger.info(f"Сеть: {summarize_network(scrape_stats)}")
+        if "memory_peak_mb" in scrape_stats:
+            logger.info(f"Пик памяти браузера: {scrape_stats['memory_peak_mb']:.0f} МБ")
+
+        header = scrape_stats.get("header", {})
+        if scrape_stats.get("unchanged"):
+            logger.info("Рейтинг и число отзывов в шапке не изменились, пропускаем")
+            update_restaurant_link_status(db, restaurant.id, "ok")
+            _store_place_header(db, restaurant.id, header)
+            return {
+                "success": True,
+                "restaurant_id": restaurant.id,
+                "restaurant_name": place_name,
+                "reviews_found": 0,
+                "reviews_new": 0,
+                "unchanged": True,
+                "scrape_stats": scrape_stats,
+                "fetch_path": fetch_path,
+                "suggest_cache": suggest_cache.counters,
+            }
+
+        if not reviews and scrape_stats.get("deadline_exceeded"):
+            return {
+                "success": False,
+                "restaurant_id": restaurant.id,
+                "error": "Бюджет времени исчерпан до получения отзывов",
+                "deadline_exceeded": True,
+                "scrape_stats": scrape_stats,
+                "fetch_path": fetch_path,
+                "suggest_cache": suggest_cache.counters,
+            }
+
         if not reviews:
             logger.warning("Отзывы не найдены")
             update_restaurant_link_status(db, restaurant.id, "broken")
@@ -470,12 +1335,27 @@ def parse_and_save_reviews(
                 "total_reviews": 0,
                 "avg_rating": 0,
                 "warning": "Отзывы не найдены",
+                "scrape_stats": scrape_stats,
+                "fetch_path": fetch_path,
+                "suggest_cache": suggest_cache.counters,
             }
 
         update_restaurant_link_status(db, restaurant.id, "ok")
-        save_result = _save_reviews_to_database(db, restaurant.id, reviews)
-        _update_restaurant_statistics(db, restaurant.id, reviews)
+        with _timed_phase(scrape_stats, "save"):
+            # Отзывы браузерного пути уже записаны по ходу прокрутки
+            writer.add(reviews)
+            writer.flush()
+            save_result = writer.totals
+            _update_restaurant_statistics(db, restaurant.id, reviews, header)
+            # После прерванного парсинга шапка не должна стать базой для пропуска
+            if not scrape_stats.get("partial"):
+                _store_place_header(db, restaurant.id, header)
         final_stats = _get_final_statistics(db, restaurant.id, place_name, save_result)
+        final_stats["scrape_stats"] = scrape_stats
+        final_stats["fetch_path"] = fetch_path
+        final_stats["suggest_cache"] = suggest_cache.counters
+        if scrape_stats.get("deadline_exceeded"):
+            final_stats["deadline_exceeded"] = True
 
         return final_stats
 
@@ -493,31 +1373,130 @@ def parse_and_save_reviews(
         db.close()
 
 
+def _fetch_reviews_http(
+    http_fetcher: HttpReviewsFetcher,
+    reviews_url: str,
+    max_reviews: int,
+    known_review_ids: set[str] | None,
+    snapshot: Callable[[str], Any] | None,
+    header_check: Callable[[dict[str, Any]], bool] | None = None,
+) -> list[dict[str, Any]] | None:
+    try:
+        return http_fetcher.fetch(
+            reviews_url,
+            max_reviews,
+            known_review_ids=known_review_ids,
+            stop_after=INCREMENTAL_STOP_AFTER,
+            snapshot=snapshot,
+            header_check=header_check,
+        )
+    except Exception as e:
+        logger.warning(f"HTTP-получение отзывов не удалось, нужен браузер: {e}")
+        return None
+
+
+def _open_http_fetcher() -> AbstractContextManager[HttpReviewsFetcher | None]:
+    return HttpReviewsFetcher() if REVIEWS_HTTP_FETCH else nullcontext()
+
+
+def _new_run_id() -> str:
+    return datetime.now(UTC).strftime("%Y%m%dT%H%M%S")
+
+
 def _build_reviews_url(
-    place_name: str, place_coordinates: dict[str, Any]
+    place_name: str,
+    place_coordinates: dict[str, Any],
+    cache: SuggestCache | None = None,
 ) -> str | None:
+    if cache:
+        cached, reviews_url = cache.lookup(place_name, place_coordinates)
+        if cached:
+            logger.debug(f"Ссылка для {place_name} взята из кэша")
+            return reviews_url
+
     try:
         logger.debug(f"place_name: {place_name}")
-        return asyncio.run(make_request(place_name, place_coordinates))
+        reviews_url, answered = asyncio.run(
+            lookup_reviews_url(place_name, place_coordinates)
+        )
     except Exception as e:
         logger.error(f"Ошибка при построении ссылки: {e}")
         return None
 
+    if cache and answered:
+        try:
+            cache.store(place_name, place_coordinates, reviews_url)
+        except Exception as e:
+            cache.db.rollback()
+            logger.warning(f"Не удалось сохранить результат поиска в кэш: {e}")
+    return reviews_url
+
 
-def _save_reviews_to_database(
-    db: SessionLocal, restaurant_id: int, reviews: list[dict[str, Any]]
-) -> dict[str, Any]:
-    return save_reviews_batch(db, restaurant_id, reviews)
+def _update_scroll_stats(
+    db: SessionLocal, restaurant_id: int, scrape_stats: dict[str, Any]
+) -> None:
+    counts = scrape_stats.get("counts", {})
+    try:
+        update_scroll_stats(
+            db, restaurant_id, counts.get("scrolls", 0), counts.get("scroll_cards", 0)
+        )
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Не удалось сохранить статистику прокрутки: {e}")
 
 
 def _update_restaurant_statistics(
-    db: SessionLocal, restaurant_id: int, reviews: list[dict[str, Any]]
+    db: SessionLocal,
+    restaurant_id: int,
+    reviews: list[dict[str, Any]],
+    header: dict[str, Any] | None = None,
 ) -> None:
-    if reviews:
+    """Рейтинг места: из шапки, а если ее не удалось прочитать — среднее по отзывам"""
+    if header and header.get("rating") is not None:
+        update_restaurant_rating(db, restaurant_id, header["rating"])
+    elif reviews:
         avg_rating = sum(r["rating"] for r in reviews) / len(reviews)
         update_restaurant_rating(db, restaurant_id, avg_rating)
 
 
+def _check_place_header(
+    scrape_stats: dict[str, Any],
+    stored: RestaurantHeaderState | None,
+    header: dict[str, Any],
+) -> bool:
+    """Запомнить шапку места в scrape_stats; True — с прошлого парсинга не изменилась"""
+    scrape_stats["header"] = header
+    unchanged = (
+        stored is not None
+        and header["review_count"] is not None
+        and header["rating"] is not None
+        and stored.review_count == header["review_count"]
+        and stored.rating == header["rating"]
+    )
+    if unchanged:
+        scrape_stats["unchanged"] = True
+    return unchanged
+
+
+def _store_place_header(
+    db: SessionLocal, restaurant_id: int, header: dict[str, Any]
+) -> None:
+    if header.get("review_count") is None and header.get("rating") is None:
+        return
+    try:
+        save_header_state(db, restaurant_id, header["review_count"], header["rating"])
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Не удалось сохранить данные шапки места: {e}")
+
+
+def _log_scrape_waits(scrape_stats: dict[str, Any]) -> None:
+    waits = scrape_stats.get("waits", {})
+    if waits:
+        details = ", ".join(f"{phase}: {sec:.1f}с" for phase, sec in waits.items())
+        logger.debug(f"Ожидания по фазам: {details}")
+
+
 def _get_final_statistics(
     db: SessionLocal, restaurant_id: int, place_name: str, save_result: dict[str, Any]
 ) -> dict[str, Any]:
@@ -533,10 +1512,478 @@ def _get_final_statistics(
     }
 
 
+def _reviews_worker(
+    task_queue: Any,
+    result_queue: Any,
+    parse_options: dict[str, Any],
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+    tabs: int = 1,
+    workers: int = 1,
+) -> None:
+    """Процесс-воркер: свой браузер, рестораны из общей очереди
+
+    Лимиты запросов к хостам делятся на workers: у каждого процесса
+    свой rate_limiter, а суммарная нагрузка не должна расти с числом воркеров.
+    """
+    rate_limiter.share(workers)
+    if tabs > 1:
+        notion_ids = iter(task_queue.get, None)
+        for item in _iter_tab_results(notion_ids, parse_options, tabs, blocking_profile):
+            result_queue.put(item)
+        return
+
+    driver_factory = partial(setup_driver, blocking_profile)
+    with DriverPool(driver_factory) as pool, _open_http_fetcher() as http_fetcher:
+        while True:
+            notion_id = task_queue.get()
+            if notion_id is None:
+                break
+
+            try:
+                result = parse_and_save_reviews(
+                    notion_id=notion_id,
+                    pool=pool,
+                    http_fetcher=http_fetcher,
+                    **parse_options,
+                )
+            except Exception as e:
+                logger.error(f"Критическая ошибка: {e!s}")
+                result = {"success": False, "error": str(e)}
+
+            result_queue.put((notion_id, result))
+
+
+def _iter_parallel_results(
+    restaurants: list[tuple[str, str]],
+    parse_options: dict[str, Any],
+    workers: int,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+    tabs: int = 1,
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    context = multiprocessing.get_context("spawn")
+    task_queue = context.Queue()
+    result_queue = context.Queue()
+
+    for notion_id, _ in restaurants:
+        task_queue.put(notion_id)
+    for _ in range(workers):
+        task_queue.put(None)
+
+    processes = [
+        context.Process(
+            target=_reviews_worker,
+            args=(
+                task_queue,
+                result_queue,
+                parse_options,
+                blocking_profile,
+                tabs,
+                workers,
+            ),
+            daemon=True,
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    pending = dict(restaurants)
+    total = len(restaurants)
+
+    try:
+        while pending:
+            try:
+                notion_id, result = result_queue.get(timeout=5)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    break
+                continue
+
+            label = pending.pop(notion_id, notion_id)
+            logger.info(f"[{total - len(pending)}/{total}] {label}")
+            yield notion_id, result
+
+        # Рестораны, оставшиеся у упавших воркеров
+        for notion_id, label in pending.items():
+            logger.error(f"{label}: воркер завершился аварийно")
+            yield notion_id, {"success": False, "error": "Воркер завершился аварийно"}
+
+    finally:
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+
+def _iter_tab_results(
+    notion_ids: Iterable[str],
+    parse_options: dict[str, Any],
+    tabs: int,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Рестораны во вкладках одного Chrome: по потоку на вкладку
+
+    Потоки разбирают общий итератор notion_ids; результаты отдаются по мере
+    готовности, а не в порядке входа.
+    """
+    results: queue.Queue = queue.Queue()
+    source = iter(notion_ids)
+    source_lock = threading.Lock()
+
+    def next_notion_id() -> str | None:
+        with source_lock:
+            return next(source, None)
+
+    def tab_worker(pool: TabPool, http_fetcher: HttpReviewsFetcher | None) -> None:
+        try:
+            while (notion_id := next_notion_id()) is not None:
+                try:
+                    result = parse_and_save_reviews(
+                        notion_id=notion_id,
+                        pool=pool,
+                        http_fetcher=http_fetcher,
+                        **parse_options,
+                    )
+                except Exception as e:
+                    logger.error(f"Критическая ошибка: {e!s}")
+                    result = {"success": False, "error": str(e)}
+                results.put((notion_id, result))
+        finally:
+            results.put(None)
+
+    driver_factory = partial(setup_driver, blocking_profile, tabs=True)
+    tab_pool = TabPool(
+        driver_factory,
+        size=tabs,
+        on_new_tab=partial(apply_blocking_profile, profile=blocking_profile),
+    )
+    with tab_pool as pool, _open_http_fetcher() as http_fetcher:
+        threads = [
+            threading.Thread(target=tab_worker, args=(pool, http_fetcher), daemon=True)
+            for _ in range(tabs)
+        ]
+        for thread in threads:
+            thread.start()
+
+        running = len(threads)
+        while running:
+            item = results.get()
+            if item is None:
+                running -= 1
+                continue
+            yield item
+
+        for thread in threads:
+            thread.join()
+
+
+def _iter_restaurant_results(
+    restaurants: list[tuple[str, str]],
+    parse_options: dict[str, Any],
+    workers: int = 1,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+    tabs: int = BROWSER_TABS,
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Обойти рестораны (notion_id, подпись) и вернуть результаты парсинга
+
+    Args:
+        restaurants: пары (notion_id, подпись для лога) в порядке обхода
+        parse_options: аргументы parse_and_save_reviews, общие для всех ресторанов
+        workers: число процессов-воркеров; > 1 — рестораны разбираются
+            воркерами из общей очереди, результаты идут по мере готовности
+        blocking_profile: профиль блокировки ресурсов в браузерах прогона
+        tabs: сколько ресторанов параллельно во вкладках одного браузера
+            (у каждого воркера)
+    """
+    logger.info(f"Профиль блокировки ресурсов: {blocking_profile}")
+    if workers > 1:
+        logger.info(f"Параллельный режим: {workers} воркеров")
+        yield from _iter_parallel_results(
+            restaurants, parse_options, workers, blocking_profile, tabs
+        )
+        return
+
+    total = len(restaurants)
+    if tabs > 1:
+        logger.info(f"Режим вкладок: {tabs} вкладок в одном браузере")
+        labels = dict(restaurants)
+        notion_ids = (notion_id for notion_id, _ in restaurants)
+        for done, (notion_id, result) in enumerate(
+            _iter_tab_results(notion_ids, parse_options, tabs, blocking_profile), 1
+        ):
+            logger.info(f"[{done}/{total}] {labels.get(notion_id, notion_id)}")
+            yield notion_id, result
+        return
+
+    driver_factory = partial(setup_driver, blocking_profile)
+    with DriverPool(driver_factory) as pool, _open_http_fetcher() as http_fetcher:
+        for i, (notion_id, label) in enumerate(restaurants, 1):
+            logger.info(f"[{i}/{total}] {label}")
+
+            try:
+                result = parse_and_save_reviews(
+                    notion_id=notion_id,
+                    pool=pool,
+                    http_fetcher=http_fetcher,
+                    **parse_options,
+                )
+            except Exception as e:
+                logger.error(f"Критическая ошибка: {e!s}")
+                result = {"success": False, "error": str(e)}
+
+            yield notion_id, result
+
+
+def _iter_with_deferred_pass(
+    restaurants: list[tuple[str, str]],
+    parse_options: dict[str, Any],
+    workers: int = 1,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+    tabs: int = BROWSER_TABS,
+) -> Iterator[tuple[str, dict[str, Any]]]:
+    """Основной проход, затем повторный — для ресторанов, исчерпавших бюджет
+
+    Результат отложенного ресторана в основном проходе не выдается: для него
+    выдается только итог повторного прохода с бюджетом DEFERRED_TIME_BUDGET,
+    чтобы счетчики, история парсинга и элементы прогона учли его один раз.
+    Новые отзывы, сохраненные в основном проходе, добавляются к итогу.
+    """
+    deferred = {}
+    labels = dict(restaurants)
+    for notion_id, result in _iter_restaurant_results(
+        restaurants,
+        parse_options,
+        workers=workers,
+        blocking_profile=blocking_profile,
+        tabs=tabs,
+    ):
+        if _result_status(result) == "deferred":
+            logger.warning(
+                f"Бюджет времени исчерпан, ресторан {labels.get(notion_id, notion_id)} "
+                f"отложен до повторного прохода"
+            )
+            deferred[notion_id] = result
+            continue
+        yield notion_id, result
+
+    if not deferred:
+        return
+
+    logger.info(f"Повторный проход для {len(deferred)} отложенных ресторанов")
+    retry_options = {**parse_options, "time_budget": DEFERRED_TIME_BUDGET}
+    for notion_id, result in _iter_restaurant_results(
+        [(notion_id, labels.get(notion_id, notion_id)) for notion_id in deferred],
+        retry_options,
+        workers=min(workers, len(deferred)),
+        blocking_profile=blocking_profile,
+        tabs=min(tabs, len(deferred)),
+    ):
+        first_new = deferred[notion_id].get("reviews_new", 0)
+        if first_new:
+            result = {**result, "reviews_new": result.get("reviews_new", 0) + first_new}
+        yield notion_id, result
+
+
+def _new_run_counters() -> dict[str, Any]:
+    return {
+        "success": 0,
+        "unchanged": 0,
+        "warning": 0,
+        "skipped": 0,
+        "deferred": 0,
+        "error": 0,
+        "found_reviews": 0,
+        "new_reviews": 0,
+        "wait_seconds": {},
+        "fetch_paths": {},
+        "bytes_downloaded": 0,
+        "page_load_seconds": 0.0,
+        "pages_loaded": 0,
+        "suggest_cache": {},
+        "phase_samples": {},
+        "memory_peak_mb": 0.0,
+    }
+
+
+def _add_counts(target: dict[str, int], source: dict[str, int]) -> None:
+    for key, value in source.items():
+        target[key] = target.get(key, 0) + value
+
+
+def _tally_result(counters: dict[str, Any], result: dict[str, Any]) -> None:
+    """Учесть результат одного ресторана в счетчиках прогона"""
+    waits = result.get("scrape_stats", {}).get("waits", {})
+    for phase, seconds in waits.items():
+        total = counters["wait_seconds"].get(phase, 0.0) + seconds
+        counters["wait_seconds"][phase] = round(total, 2)
+
+    scrape_stats = result.get("scrape_stats", {})
+    counters["memory_peak_mb"] = max(
+        counters["memory_peak_mb"], scrape_stats.get("memory_peak_mb", 0.0)
+    )
+    for phase, seconds in scrape_stats.get("phases", {}).items():
+        counters["phase_samples"].setdefault(phase, []).append(seconds)
+
+    if "page_load_seconds" in scrape_stats:
+        counters["pages_loaded"] += 1
+        counters["page_load_seconds"] += scrape_stats["page_load_seconds"]
+        counters["bytes_downloaded"] += scrape_stats.get("bytes_downloaded", 0)
+
+    _add_counts(counters["suggest_cache"], result.get("suggest_cache", {}))
+
+    fetch_path = result.get("fetch_path")
+    if fetch_path:
+        counters["fetch_paths"][fetch_path] = (
+            counters["fetch_paths"].get(fetch_path, 0) + 1
+        )
+
+    status = _result_status(result)
+    counters[status] += 1
+    if result.get("unchanged"):
+        counters["unchanged"] += 1
+        logger.info("Без изменений")
+    elif status in ("success", "deferred"):
+        reviews_new = result.get("reviews_new", 0)
+        reviews_found = result.get("reviews_found", 0)
+        counters["new_reviews"] += reviews_new
+        counters["found_reviews"] += reviews_found
+        if status == "deferred":
+            logger.warning(
+                f"Бюджет времени исчерпан, ресторан отложен (найдено {reviews_found}, "
+                f"новых: {reviews_new})"
+            )
+        else:
+            logger.success(f"Найдено {reviews_found} отзывов, новых: {reviews_new}")
+    elif status == "warning":
+        logger.warning("Нет отзывов")
+    elif status == "skipped":
+        logger.warning("Пропущен")
+    else:
+        logger.error("Ошибка")
+
+
+def _result_status(result: dict[str, Any]) -> str:
+    """Итог парсинга ресторана для счетчиков и истории
+
+    Возможные значения: success, warning (нет отзывов), skipped,
+    deferred (исчерпан бюджет времени) и error.
+    """
+    if result.get("deadline_exceeded"):
+        return "deferred"
+    if result.get("success"):
+        return "warning" if result.get("warning") else "success"
+    return "skipped" if result.get("skip") else "error"
+
+
+def _record_scrape_attempt(
+    db: SessionLocal, restaurant_id: int, result: dict[str, Any]
+) -> None:
+    """Обновить историю парсинга (успех — отзывы найдены)"""
+    success = _result_status(result) == "success"
+    try:
+        record_scrape_attempt(db, restaurant_id, success)
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Не удалось обновить историю парсинга: {e}")
+
+
+def _store_scrape_metrics(
+    db: SessionLocal, restaurant_id: int, run_id: str, result: dict[str, Any]
+) -> None:
+    scrape_stats = result.get("scrape_stats", {})
+    counts = dict(scrape_stats.get("counts", {}))
+    for key in (
+        "bytes_downloaded",
+        "requests_finished",
+        "requests_blocked",
+        "memory_peak_mb",
+    ):
+        if key in scrape_stats:
+            counts[key] = scrape_stats[key]
+
+    try:
+        save_scrape_metric(
+            db,
+            restaurant_id,
+            run_id,
+            _result_status(result),
+            result.get("fetch_path"),
+            phases=scrape_stats.get("phases", {}),
+            waits=scrape_stats.get("waits", {}),
+            counts=counts,
+        )
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Не удалось сохранить метрики парсинга: {e}")
+
+
+def _checkpoint_run_item(
+    db: SessionLocal, run_pk: int, notion_id: str, result: dict[str, Any]
+) -> None:
+    """Отметить ресторан обработанным в прогоне (для --resume)"""
+    try:
+        mark_run_item(db, run_pk, notion_id, _result_status(result))
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Не удалось сохранить прогресс прогона: {e}")
+
+
+def _load_pending_restaurants(db: SessionLocal, run_pk: int) -> list[Restaurant]:
+    pending = get_pending_run_items(db, run_pk)
+    by_notion_id = {
+        r.notion_id: r
+        for r in db.query(Restaurant).filter(Restaurant.notion_id.in_(pending))
+    }
+    return [by_notion_id[n] for n in pending if n in by_notion_id]
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Перцентиль методом ближайшего ранга"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _phase_timings(counters: dict[str, Any]) -> dict[str, dict[str, float]]:
+    """p50/p95 длительности каждой фазы по ресторанам прогона"""
+    return {
+        phase: {
+            "p50": round(_percentile(samples, 50), 3),
+            "p95": round(_percentile(samples, 95), 3),
+            "count": len(samples),
+        }
+        for phase, samples in counters["phase_samples"].items()
+    }
+
+
+def _log_phase_timings(counters: dict[str, Any]) -> None:
+    timings = _phase_timings(counters)
+    if timings:
+        details = ", ".join(
+            f"{phase}: p50 {t['p50']:.1f}с / p95 {t['p95']:.1f}с"
+            for phase, t in timings.items()
+        )
+        logger.info(f"Фазы парсинга: {details}")
+
+
+def _network_summary(counters: dict[str, Any]) -> dict[str, Any]:
+    pages = counters["pages_loaded"]
+    return {
+        "memory_peak_mb": counters["memory_peak_mb"],
+        "bytes_downloaded": counters["bytes_downloaded"],
+        "avg_page_load_seconds": (
+            round(counters["page_load_seconds"] / pages, 2) if pages else 0.0
+        ),
+    }
+
+
 def fetch_reviews_for_failed_restaurants(
     max_reviews: int = DEFAULT_MAX_REVIEWS,
     scroll_attempts: int = DEFAULT_SCROLL_ATTEMPTS,
     limit_restaurants: int | None = None,
+    incremental: bool = False,
+    save_snapshots: bool = SAVE_SNAPSHOTS,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
 ) -> dict[str, Any]:
     """Парсинг отзывов для ресторанов с ошибками (периодическая проверка)."""
     init_db()
@@ -562,60 +2009,50 @@ def fetch_reviews_for_failed_restaurants(
         if limit_restaurants:
             logger.info(f"Ограничение: {limit_restaurants} ресторанов")
 
-        success_count = 0
-        error_count = 0
-        warning_count = 0
-        skipped_count = 0
-        total_new_reviews = 0
-        total_found_reviews = 0
-
-        for i, restaurant in enumerate(restaurants, 1):
-            logger.info(f"[{i}/{total}] {restaurant.name} ({restaurant.yandex_url_status})")
-
-            try:
-                result = parse_and_save_reviews(
-                    notion_id=restaurant.notion_id,
-                    max_reviews=max_reviews,
-                    scroll_attempts=scroll_attempts,
-                )
-
-                if result.get("success"):
-                    reviews_new = result.get("reviews_new", 0)
-                    reviews_found = result.get("reviews_found", 0)
-
-                    if result.get("warning"):
-                        warning_count += 1
-                        logger.warning("Нет отзывов")
-                    else:
-                        success_count += 1
-                        total_new_reviews += reviews_new
-                        total_found_reviews += reviews_found
-                        logger.success(f"Найдено {reviews_found} отзывов, новых: {reviews_new}")
-                else:
-                    if result.get("skip"):
-                        skipped_count += 1
-                        logger.warning("Пропущен")
-                    else:
-                        error_count += 1
-                        logger.error("Ошибка")
-
-            except Exception as e:
-                error_count += 1
-                logger.error(f"Критическая ошибка: {e!s}")
+        tasks = [
+            (r.notion_id, f"{r.name} ({r.yandex_url_status})") for r in restaurants
+        ]
+        suggest_cache = SuggestCache(db)
+        parse_options = {
+            "max_reviews": max_reviews,
+            "scroll_attempts": scroll_attempts,
+            "incremental": incremental,
+            "save_snapshots": save_snapshots,
+            "run_id": _new_run_id(),
+            "resolved_urls": resolve_reviews_urls(db, restaurants, cache=suggest_cache),
+        }
+        counters = _new_run_counters()
+        _add_counts(counters["suggest_cache"], suggest_cache.counters)
+        restaurant_ids = {r.notion_id: r.id for r in restaurants}
+        for notion_id, result in _iter_with_deferred_pass(
+            tasks, parse_options, blocking_profile=blocking_profile
+        ):
+            _tally_result(counters, result)
+            _record_scrape_attempt(db, restaurant_ids[notion_id], result)
+            _store_scrape_metrics(
+                db, restaurant_ids[notion_id], parse_options["run_id"], result
+            )
 
         logger.success("Повторная проверка завершена")
-        logger.info(f"Восстановлено: {success_count}, Без отзывов: {warning_count}, Пропущено: {skipped_count}, Ошибок: {error_count}")
-        logger.info(f"Отзывов найдено: {total_found_reviews}, новых: {total_new_reviews}")
+        logger.info(f"Восстановлено: {counters['success']}, Без отзывов: {counters['warning']}, Пропущено: {counters['skipped']}, Отложено: {counters['deferred']}, Ошибок: {counters['error']}")
+        logger.info(f"Отзывов найдено: {counters['found_reviews']}, новых: {counters['new_reviews']}")
+        _log_phase_timings(counters)
 
         return {
             "success": True,
             "total_processed": total,
-            "success_count": success_count,
-            "warning_count": warning_count,
-            "skipped_count": skipped_count,
-            "error_count": error_count,
-            "total_new_reviews": total_new_reviews,
-            "total_found_reviews": total_found_reviews,
+            "success_count": counters["success"],
+            "warning_count": counters["warning"],
+            "skipped_count": counters["skipped"],
+            "deferred_count": counters["deferred"],
+            "error_count": counters["error"],
+            "total_new_reviews": counters["new_reviews"],
+            "total_found_reviews": counters["found_reviews"],
+            "wait_seconds": counters["wait_seconds"],
+            "fetch_paths": counters["fetch_paths"],
+            **_network_summary(counters),
+            "suggest_cache": counters["suggest_cache"],
+            "phase_timings": _phase_timings(counters),
         }
 
     except Exception as e:
@@ -630,92 +2067,264 @@ def fetch_reviews_for_all_restaurants(
     max_reviews: int = DEFAULT_MAX_REVIEWS,
     scroll_attempts: int = DEFAULT_SCROLL_ATTEMPTS,
     limit_restaurants: int | None = None,
+    workers: int = 1,
+    incremental: bool = False,
+    save_snapshots: bool = SAVE_SNAPSHOTS,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+    resume: bool = False,
+    tabs: int = BROWSER_TABS,
 ) -> dict[str, Any]:
-    """Парсинг отзывов для ресторанов из БД."""
+    """Парсинг отзывов для ресторанов из БД.
+
+    Args:
+        max_reviews: сколько отзывов собирать на ресторан; <= 0 — все
+        scroll_attempts: минимальный предел прокруток списка отзывов
+            на странице (см. _scroll_budget)
+        limit_restaurants: обработать не больше стольких ресторанов;
+            None — все
+        workers: количество параллельных процессов, у каждого свой браузер
+        tabs: сколько ресторанов каждый браузер парсит одновременно во вкладках
+        incremental: собирать только новые отзывы, останавливаясь на известных
+        save_snapshots: сохранять HTML страниц в SnapshotStore
+        blocking_profile: профиль блокировки ресурсов (none, light, full)
+        resume: продолжить последний незавершенный прогон, пропуская
+            уже обработанные в нем рестораны
+    """
     init_db()
     db = SessionLocal()
 
     try:
-        # Исключаем рестораны с ошибками из регулярной обработки
-        # Обрабатываем только рестораны со статусом "ok" или "unknown"
-        query = db.query(Restaurant).filter(
-            Restaurant.yandex_url_status.in_(["ok", "unknown"])
-        ).order_by(Restaurant.last_updated.desc())
+        run = get_unfinished_scrape_run(db, REVIEWS_RUN_KIND) if resume else None
+        if run:
+            restaurants = _load_pending_restaurants(db, run.id)
+            logger.info(
+                f"Продолжение прогона {run.run_id}: осталось {len(restaurants)} "
+                f"из {run.total} ресторанов"
+            )
+            if not restaurants:
+                finish_scrape_run(db, run.id)
+                return {"success": True, "message": "Прогон уже завершен"}
+        else:
+            if resume:
+                logger.info("Незавершенных прогонов нет, начинаем новый")
 
-        if limit_restaurants:
-            query = query.limit(limit_restaurants)
+            # Исключаем рестораны с ошибками из регулярной обработки
+            # Обрабатываем только рестораны со статусом "ok" или "unknown"
+            query = db.query(Restaurant).filter(
+                Restaurant.yandex_url_status.in_(["ok", "unknown"])
+            )
 
-        restaurants = query.all()
-        total = len(restaurants)
+            # Сначала места, где ожидается больше всего новых отзывов
+            restaurants = order_by_priority(db, query.all())
+            if limit_restaurants:
+                restaurants = restaurants[:limit_restaurants]
 
-        if total == 0:
-            logger.warning("В БД нет ресторанов")
-            return {"success": False, "error": "В БД нет ресторанов"}
+            if not restaurants:
+                logger.warning("В БД нет ресторанов")
+                return {"success": False, "error": "В БД нет ресторанов"}
+
+            run = create_scrape_run(
+                db, _new_run_id(), REVIEWS_RUN_KIND, [r.notion_id for r in restaurants]
+            )
 
+        total = len(restaurants)
         logger.info(f"Обработка {total} ресторанов")
-        if limit_restaurants:
+        if limit_restaurants and not resume:
             logger.info(f"Ограничение: {limit_restaurants} ресторанов")
 
-        success_count = 0
-        error_count = 0
-        warning_count = 0
-        skipped_count = 0
-        total_new_reviews = 0
-        total_found_reviews = 0
-
-        for i, restaurant in enumerate(restaurants, 1):
-            logger.info(f"[{i}/{total}] {restaurant.name}")
-
-            try:
-                result = parse_and_save_reviews(
-                    notion_id=restaurant.notion_id,
-                    max_reviews=max_reviews,
-                    scroll_attempts=scroll_attempts,
-                )
-
-                if result.get("success"):
-                    reviews_new = result.get("reviews_new", 0)
-                    reviews_found = result.get("reviews_found", 0)
-
-                    if result.get("warning"):
-                        warning_count += 1
-                        logger.warning("Нет отзывов")
-                    else:
-                        success_count += 1
-                        total_new_reviews += reviews_new
-                        total_found_reviews += reviews_found
-                        logger.success(f"Найдено {reviews_found} отзывов, новых: {reviews_new}")
-                else:
-                    if result.get("skip"):
-                        skipped_count += 1
-                        logger.warning("Пропущен")
-                    else:
-                        error_count += 1
-                        logger.error("Ошибка")
-
-            except Exception as e:
-                error_count += 1
-                logger.error(f"Критическая ошибка: {e!s}")
+        tasks = [(r.notion_id, r.name) for r in restaurants]
+        suggest_cache = SuggestCache(db)
+        parse_options = {
+            "max_reviews": max_reviews,
+            "scroll_attempts": scroll_attempts,
+            "incremental": incremental,
+            "save_snapshots": save_snapshots,
+            "run_id": run.run_id,
+            "resolved_urls": resolve_reviews_urls(db, restaurants, cache=suggest_cache),
+        }
+        counters = _new_run_counters()
+        _add_counts(counters["suggest_cache"], suggest_cache.counters)
+        restaurant_ids = {r.notion_id: r.id for r in restaurants}
+        run_pk = run.id
+        for notion_id, result in _iter_with_deferred_pass(
+            tasks,
+            parse_options,
+            workers=workers,
+            blocking_profile=blocking_profile,
+            tabs=tabs,
+        ):
+            _tally_result(counters, result)
+            _record_scrape_attempt(db, restaurant_ids[notion_id], result)
+            _store_scrape_metrics(db, restaurant_ids[notion_id], run.run_id, result)
+            _checkpoint_run_item(db, run_pk, notion_id, result)
+
+        finish_scrape_run(db, run_pk)
 
         logger.success("Обработка завершена")
-        logger.info(f"Успешно: {success_count}, Без отзывов: {warning_count}, Пропущено: {skipped_count}, Ошибок: {error_count}")
-        logger.info(f"Отзывов найдено: {total_found_reviews}, новых: {total_new_reviews}")
+        logger.info(f"Успешно: {counters['success']}, Без отзывов: {counters['warning']}, Пропущено: {counters['skipped']}, Отложено: {counters['deferred']}, Ошибок: {counters['error']}")
+        logger.info(f"Отзывов найдено: {counters['found_reviews']}, новых: {counters['new_reviews']}")
+        _log_phase_timings(counters)
 
         return {
             "success": True,
             "total_restaurants": total,
-            "processed_successfully": success_count,
-            "no_reviews": warning_count,
-            "skipped": skipped_count,
-            "errors": error_count,
-            "total_reviews_found": total_found_reviews,
-            "total_new_reviews": total_new_reviews,
+            "processed_successfully": counters["success"],
+            "unchanged": counters["unchanged"],
+            "no_reviews": counters["warning"],
+            "skipped": counters["skipped"],
+            "deferred": counters["deferred"],
+            "errors": counters["error"],
+            "total_reviews_found": counters["found_reviews"],
+            "total_new_reviews": counters["new_reviews"],
+            "wait_seconds": counters["wait_seconds"],
+            "fetch_paths": counters["fetch_paths"],
+            **_network_summary(counters),
+            "suggest_cache": counters["suggest_cache"],
+            "phase_timings": _phase_timings(counters),
+            "run_id": run.run_id,
         }
 
     finally:
         db.close()
 
 
+def enqueue_restaurants_for_scraping(
+    limit_restaurants: int | None = None,
+) -> dict[str, Any]:
+    """Поставить рестораны в общую очередь парсинга (в порядке приоритета)"""
+    init_db()
+    db = SessionLocal()
+
+    try:
+        query = db.query(Restaurant).filter(
+            Restaurant.yandex_url_status.in_(["ok", "unknown"])
+        )
+        restaurants = order_by_priority(db, query.all())
+        if limit_restaurants:
+            restaurants = restaurants[:limit_restaurants]
+
+        # Ссылки ищутся один раз здесь, воркеры берут их из БД и кэша
+        resolve_reviews_urls(db, restaurants, cache=SuggestCache(db))
+
+        total = len(restaurants)
+        added = enqueue_scrape_items(
+            db, [(r.notion_id, float(total - i)) for i, r in enumerate(restaurants)]
+        )
+        logger.info(f"В очередь добавлено {added} из {total} ресторанов")
+        return {"success": True, "enqueued": added, "total": total}
+
+    finally:
+        db.close()
+
+
+def run_reviews_queue_worker(
+    max_reviews: int = DEFAULT_MAX_REVIEWS,
+    scroll_attempts: int = DEFAULT_SCROLL_ATTEMPTS,
+    incremental: bool = False,
+    save_snapshots: bool = SAVE_SNAPSHOTS,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+    worker_id: str | None = None,
+    exit_when_empty: bool = False,
+) -> dict[str, Any]:
+    """Воркер общей очереди: берет рестораны из scrape_queue, пока не остановят
+
+    Несколько воркеров на разных узлах не пересекаются: задание забирается
+    через SELECT ... FOR UPDATE SKIP LOCKED и удерживается арендой, которую
+    продлевает LeaseHeartbeat.
+    """
+    init_db()
+    db = SessionLocal()
+    worker_id = worker_id or default_worker_id()
+    parse_options = {
+        "max_reviews": max_reviews,
+        "scroll_attempts": scroll_attempts,
+        "incremental": incremental,
+        "save_snapshots": save_snapshots,
+        "run_id": _new_run_id(),
+    }
+    counters = _new_run_counters()
+    logger.info(f"Воркер очереди {worker_id} запущен")
+
+    driver_factory = partial(setup_driver, blocking_profile)
+    try:
+        with DriverPool(driver_factory) as pool, _open_http_fetcher() as http_fetcher:
+            while True:
+                fail_exhausted_scrape_items(db, QUEUE_MAX_ATTEMPTS)
+                item = claim_scrape_item(
+                    db, worker_id, QUEUE_LEASE_SECONDS, QUEUE_MAX_ATTEMPTS
+                )
+                if not item:
+                    if exit_when_empty:
+                        break
+                    time.sleep(QUEUE_POLL_INTERVAL)
+                    continue
+
+                item_id, notion_id, attempts = item.id, item.notion_id, item.attempts
+                logger.info(f"[{worker_id}] задание {item_id}: {notion_id}")
+                with LeaseHeartbeat(item_id, worker_id) as heartbeat:
+                    try:
+                        result = parse_and_save_reviews(
+                            notion_id=notion_id,
+                            pool=pool,
+                            http_fetcher=http_fetcher,
+                            **parse_options,
+                        )
+                    except Exception as e:
+                        logger.error(f"Критическая ошибка: {e!s}")
+                        result = {"success": False, "error": str(e)}
+
+                if heartbeat.lost:
+                    # Задание уже забрал другой воркер: его метрики и статус
+                    # запишет он, отзывы же сохранены без дублей
+                    logger.warning(
+                        f"[{worker_id}] аренда задания {item_id} потеряна, "
+                        f"результат {notion_id} не записывается"
+                    )
+                    continue
+
+                _tally_result(counters, result)
+                restaurant = get_restaurant_by_notion_id(db, notion_id)
+                if restaurant:
+                    _record_scrape_attempt(db, restaurant.id, result)
+                    _store_scrape_metrics(
+                        db, restaurant.id, parse_options["run_id"], result
+                    )
+
+                # Отложенные по бюджету времени возвращаются в очередь, как ошибки
+                if _result_status(result) not in ("error", "deferred"):
+                    queue_status = "done"
+                elif attempts < QUEUE_MAX_ATTEMPTS:
+                    queue_status = "queued"
+                else:
+                    queue_status = "failed"
+                complete_scrape_item(
+                    db, item_id, worker_id, queue_status, error=result.get("error")
+                )
+
+    except KeyboardInterrupt:
+        logger.info(f"Воркер очереди {worker_id} остановлен")
+    finally:
+        db.close()
+
+    logger.info(
+        f"Воркер {worker_id}: успешно {counters['success']}, "
+        f"без отзывов {counters['warning']}, пропущено {counters['skipped']}, "
+        f"ошибок {counters['error']}"
+    )
+    return {
+        "success": True,
+        "worker_id": worker_id,
+        "processed_successfully": counters["success"],
+        "unchanged": counters["unchanged"],
+        "no_reviews": counters["warning"],
+        "skipped": counters["skipped"],
+        "deferred": counters["deferred"],
+        "errors": counters["error"],
+        "total_new_reviews": counters["new_reviews"],
+        "phase_timings": _phase_timings(counters),
+    }
+
+
 if __name__ == "__main__":
     import argparse
 
@@ -737,7 +2346,34 @@ if __name__ == "__main__":
         help="Количество попыток прокрутки",
     )
     parser.add_argument(
-        "--limit", type=int, help="Количество ресторанов для обработки (самые свежие)"
+        "--limit",
+        type=int,
+        help="Количество ресторанов для обработки (самые приоритетные)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Количество параллельных браузеров"
+    )
+    parser.add_argument(
+        "--tabs",
+        type=int,
+        default=BROWSER_TABS,
+        help="Сколько ресторанов браузер парсит одновременно во вкладках",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Собирать только новые отзывы, останавливаясь на уже сохраненных",
+    )
+    parser.add_argument(
+        "--block-resources",
+        choices=list(BLOCKING_PROFILES),
+        default=SCRAPER_BLOCKING_PROFILE,
+        help="Профиль блокировки тяжелых ресурсов в браузере",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Продолжить последний незавершенный прогон",
     )
 
     args = parser.parse_args()
@@ -747,6 +2383,11 @@ if __name__ == "__main__":
             max_reviews=args.max_reviews,
             scroll_attempts=args.scroll_attempts,
             limit_restaurants=args.limit,
+            workers=args.workers,
+            incremental=args.incremental,
+            blocking_profile=args.block_resources,
+            resume=args.resume,
+            tabs=args.tabs,
         )
         if result.get("success"):
             logger.success("Парсинг всех ресторанов завершен успешно!")
@@ -758,14 +2399,18 @@ if __name__ == "__main__":
             notion_id=args.notion_id,
             max_reviews=args.max_reviews,
             scroll_attempts=args.scroll_attempts,
+            incremental=args.incremental,
         )
-        if result["success"]:
+        if result["success"] and result.get("unchanged"):
+            logger.success("Рейтинг и число отзывов не изменились, парсинг пропущен")
+        elif result["success"]:
             logger.success("Парсинг завершен успешно!")
             logger.info(
                 f"Статистика: {result['reviews_new']} новых отзывов "
                 f"из {result['reviews_found']} найденных"
             )
-            logger.info(f"Средний рейтинг: {result['avg_rating']:.1f}")
+            if result.get("avg_rating") is not None:
+                logger.info(f"Средний рейтинг: {result['avg_rating']:.1f}")
         else:
             logger.error(f"Ошибка при парсинге: {result['error']}")
 
@@ -773,7 +2418,7 @@ if __name__ == "__main__":
         logger.info("\nПримеры использования:")
         logger.info("  python ya_maps_reviews_parser.py --all")
         logger.info(
-            "  python ya_maps_reviews_parser.py --all --limit 50  # только 50 самых свежих"
+            "  python ya_maps_reviews_parser.py --all --limit 50  # 50 приоритетных"
         )
         logger.info(
             "  python ya_maps_reviews_parser.py --notion-id "
@@ -0,0 +1,106 @@
+import argparse
+from pathlib import Path
+import time
+from typing import Any
+
+from logger import logger
+from parsers.review_html import (
+    LXML_AVAILABLE,
+    SELECTOLAX_AVAILABLE,
+    parse_review_cards,
+)
+
+BASELINE_BACKEND = "html.parser"
+
+
+def load_pages(paths: list[str]) -> list[str]:
+    """Загрузить сохраненные страницы (файлы или каталоги с *.html)"""
+    pages = []
+    for raw_path in paths:
+        path = Path(raw_path)
+        files = sorted(path.glob("*.html")) if path.is_dir() else [path]
+        pages.extend(file.read_text(encoding="utf-8") for file in files)
+    return pages
+
+
+def available_backends() -> list[str]:
+    backends = [BASELINE_BACKEND]
+    if LXML_AVAILABLE:
+        backends.append("lxml")
+    if SELECTOLAX_AVAILABLE:
+        backends.append("selectolax")
+    return backends
+
+
+def benchmark_backends(
+    pages: list[str], backends: list[str], repeat: int = 3
+) -> dict[str, dict[str, Any]]:
+    """Сравнить скорость бэкендов и совпадение результата с html.parser"""
+    baseline = [parse_review_cards(page, BASELINE_BACKEND) for page in pages]
+    results = {}
+
+    for backend in backends:
+        best = float("inf")
+        parsed: list[list[dict[str, Any] | None]] = []
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            parsed = [parse_review_cards(page, backend) for page in pages]
+            best = min(best, time.perf_counter() - started)
+
+        cards = sum(len(page_cards) for page_cards in parsed)
+        mismatches = sum(
+            a != b
+            for page_cards, base_cards in zip(parsed, baseline, strict=True)
+            for a, b in zip(page_cards, base_cards, strict=False)
+        ) + sum(
+            abs(len(page_cards) - len(base_cards))
+            for page_cards, base_cards in zip(parsed, baseline, strict=True)
+        )
+
+        results[backend] = {
+            "cards": cards,
+            "seconds": round(best, 4),
+            "cards_per_sec": round(cards / best, 1) if best else 0.0,
+            "mismatches": mismatches,
+        }
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк бэкендов разбора карточек отзывов"
+    )
+    parser.add_argument("paths", nargs="+", help="HTML-файлы или каталоги со страницами")
+    parser.add_argument("--repeat", type=int, default=3, help="Число повторов")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=None,
+        help="Бэкенды для сравнения (по умолчанию все доступные)",
+    )
+
+    args = parser.parse_args()
+
+    pages = load_pages(args.paths)
+    if not pages:
+        logger.error("Не найдено ни одной сохраненной страницы")
+        return
+
+    results = benchmark_backends(
+        pages, args.backends or available_backends(), repeat=args.repeat
+    )
+    base_speed = results.get(BASELINE_BACKEND, {}).get("cards_per_sec") or None
+
+    logger.info(f"Страниц: {len(pages)}, повторов: {args.repeat}")
+    for backend, stats in results.items():
+        speedup = f", x{stats['cards_per_sec'] / base_speed:.1f}" if base_speed else ""
+        logger.info(
+            f"{backend:<12} {stats['cards_per_sec']:>10} карточек/с"
+            f"{speedup}, расхождений: {stats['mismatches']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,567 @@
+import argparse
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import partial
+import json
+import os
+from pathlib import Path
+import sys
+import threading
+import time
+from typing import Any
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database.crud import create_restaurant, save_reviews_batch
+from database.models import Base, Restaurant
+from logger import logger
+from parsers.browser_memory import MEMORY_SAMPLE_INTERVAL, browser_memory_mb
+from parsers.browser_tabs import TabPool
+from parsers.driver_pool import DriverPool
+from parsers.http_reviews_fetcher import HttpReviewsFetcher
+from parsers.resource_blocking import (
+    BLOCKING_PROFILES,
+    SCRAPER_BLOCKING_PROFILE,
+    apply_blocking_profile,
+)
+from parsers.review_html import parse_review_cards
+from parsers.snapshot_store import SNAPSHOT_DIR, SnapshotStore
+from parsers.ya_maps_reviews_parser import (
+    DEFAULT_MAX_REVIEWS,
+    _phase_timings,
+    parse_yandex_reviews,
+    setup_driver,
+)
+from scripts.stub_maps_server import serve
+
+# Раскладка как у scripts/stub_maps_server.py: <business_id>/page.html
+BENCH_FIXTURES_DIR = os.getenv("BENCH_FIXTURES_DIR", "bench_fixtures")
+# Допустимое падение метрики относительно базового замера
+BENCH_TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "0.2"))
+# html.parser — разбор через extract_review_data, как в исходном парсере
+BENCH_HTML_BACKEND = "html.parser"
+
+# Метрики, по которым сравнивается с базовым замером (больше — лучше)
+THROUGHPUT_METRICS = (
+    ("browser", "restaurants_per_min"),
+    ("browser", "reviews_per_sec"),
+    ("pipeline", "extract_reviews_per_sec"),
+    ("pipeline", "save_reviews_per_sec"),
+)
+# Метрики замера вкладок против браузеров (--tabs)
+CONCURRENCY_METRICS = (
+    ("browsers", "restaurants_per_min"),
+    ("tabs", "restaurants_per_min"),
+    ("tabs", "restaurants_per_min_per_gb"),
+)
+
+
+def list_fixtures(root: str | Path) -> list[str]:
+    """business_id записанных страниц в каталоге фикстур"""
+    root = Path(root)
+    if not root.is_dir():
+        return []
+    return sorted(
+        path.name for path in root.iterdir() if (path / "page.html").is_file()
+    )
+
+
+def export_snapshot_fixtures(
+    out_dir: str | Path, snapshot_dir: str = SNAPSHOT_DIR, limit: int | None = None
+) -> int:
+    """Разложить последние снимки страниц из SnapshotStore в каталог фикстур"""
+    store = SnapshotStore(snapshot_dir)
+    out_dir = Path(out_dir)
+    exported = 0
+
+    for notion_id, ref in store.iter_snapshots():
+        if limit and exported >= limit:
+            break
+        html = store.load(ref["digest"])
+        business_id = HttpReviewsFetcher._business_id(ref.get("url") or "", html)
+        if not business_id:
+            logger.warning(f"{notion_id}: в снимке нет businessId, пропущен")
+            continue
+
+        path = out_dir / business_id / "page.html"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(html, encoding="utf-8")
+        exported += 1
+
+    logger.info(f"Экспортировано фикстур: {exported} -> {out_dir}")
+    return exported
+
+
+@contextmanager
+def fixture_server(root: str | Path) -> Iterator[str]:
+    """Локальный сервер с фикстурами на свободном порту; отдает базовый URL"""
+    server = serve(str(root), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address[:2]
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _phase_summary(samples: dict[str, list[float]]) -> dict[str, dict[str, float]]:
+    """p50/p95 фаз тем же методом, что и в логе прогона парсера"""
+    return _phase_timings({"phase_samples": samples})
+
+
+def benchmark_browser(
+    base_url: str,
+    business_ids: list[str],
+    max_reviews: int = DEFAULT_MAX_REVIEWS,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+    repeat: int = 1,
+) -> dict[str, Any]:
+    """parse_yandex_reviews в headless Chromium по всем фикстурам"""
+    phase_samples: dict[str, list[float]] = {}
+    reviews_total = 0
+    failures = 0
+    restaurants = 0
+
+    driver_factory = partial(setup_driver, blocking_profile)
+    with DriverPool(driver_factory) as pool:
+        # Запуск браузера не входит в замер
+        pool.release(pool.acquire())
+        started = time.perf_counter()
+        for _ in range(repeat):
+            for business_id in business_ids:
+                stats: dict[str, Any] = {}
+                reviews = parse_yandex_reviews(
+                    f"{base_url}/maps/org/bench/{business_id}/reviews/",
+                    max_reviews,
+                    pool=pool,
+                    stats=stats,
+                )
+                restaurants += 1
+                reviews_total += len(reviews)
+                failures += not reviews
+                for phase, seconds in stats.get("phases", {}).items():
+                    phase_samples.setdefault(phase, []).append(seconds)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "restaurants": restaurants,
+        "reviews": reviews_total,
+        "failures": failures,
+        "seconds": round(elapsed, 2),
+        "restaurants_per_min": round(restaurants / elapsed * 60, 2) if elapsed else 0.0,
+        "reviews_per_sec": round(reviews_total / elapsed, 1) if elapsed else 0.0,
+        "phases": _phase_summary(phase_samples),
+    }
+
+
+def benchmark_concurrency(
+    base_url: str,
+    business_ids: list[str],
+    concurrency: int,
+    tabs: bool,
+    max_reviews: int = DEFAULT_MAX_REVIEWS,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+    repeat: int = 1,
+) -> dict[str, Any]:
+    """Замер параллельного парсинга concurrency ресторанов
+
+    Рестораны идут во вкладках одного Chrome (tabs=True) или по браузеру
+    на ресторан; пик памяти — сумма по всем браузерам.
+    """
+    drivers = []
+
+    def driver_factory():
+        driver = setup_driver(blocking_profile, tabs=tabs)
+        drivers.append(driver)
+        return driver
+
+    if tabs:
+        pool = TabPool(
+            driver_factory,
+            size=concurrency,
+            on_new_tab=partial(apply_blocking_profile, profile=blocking_profile),
+        )
+    else:
+        pool = DriverPool(driver_factory, size=concurrency)
+
+    urls = iter(
+        [
+            f"{base_url}/maps/org/bench/{business_id}/reviews/"
+            for _ in range(repeat)
+            for business_id in business_ids
+        ]
+    )
+    urls_lock = threading.Lock()
+    totals = {"restaurants": 0, "reviews": 0, "failures": 0}
+    memory = {"peak_mb": None}
+    stop = threading.Event()
+
+    def sample_memory() -> None:
+        while not stop.wait(MEMORY_SAMPLE_INTERVAL):
+            samples = [browser_memory_mb(driver) for driver in list(drivers)]
+            samples = [sample for sample in samples if sample is not None]
+            if samples:
+                memory["peak_mb"] = max(memory["peak_mb"] or 0.0, sum(samples))
+
+    def worker() -> None:
+        while True:
+            with urls_lock:
+                url = next(urls, None)
+            if url is None:
+                return
+            reviews = parse_yandex_reviews(url, max_reviews, pool=pool, stats={})
+            with urls_lock:
+                totals["restaurants"] += 1
+                totals["reviews"] += len(reviews)
+                totals["failures"] += not reviews
+
+    with pool:
+        # Запуск браузеров не входит в замер
+        warm = [pool.acquire() for _ in range(1 if tabs else concurrency)]
+        for driver in warm:
+            pool.release(driver)
+
+        sampler = threading.Thread(target=sample_memory, daemon=True)
+        sampler.start()
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        sampler.join()
+
+    restaurants_per_min = totals["restaurants"] / elapsed * 60 if elapsed else 0.0
+    peak_mb = memory["peak_mb"]
+    return {
+        "mode": "tabs" if tabs else "browsers",
+        "concurrency": concurrency,
+        **totals,
+        "seconds": round(elapsed, 2),
+        "restaurants_per_min": round(restaurants_per_min, 2),
+        "peak_memory_mb": round(peak_mb, 1) if peak_mb else None,
+        "restaurants_per_min_per_gb": (
+            round(restaurants_per_min / (peak_mb / 1024), 2) if peak_mb else None
+        ),
+    }
+
+
+def benchmark_pipeline(
+    root: str | Path,
+    business_ids: list[str],
+    database_url: str | None = None,
+    backend: str = BENCH_HTML_BACKEND,
+    repeat: int = 3,
+) -> dict[str, Any]:
+    """Разбор фикстур (extract_review_data) и, если задана БД, save_reviews_batch
+
+    Отзывы пишутся во временные рестораны bench-*, которые удаляются после
+    замера; использовать отдельную базу, а не рабочую.
+    """
+    pages = [
+        (Path(root) / business_id / "page.html").read_text(encoding="utf-8")
+        for business_id in business_ids
+    ]
+
+    best = float("inf")
+    parsed: list[list[dict[str, Any]]] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parsed = [[r for r in parse_review_cards(page, backend) if r] for page in pages]
+        best = min(best, time.perf_counter() - started)
+
+    reviews_total = sum(len(reviews) for reviews in parsed)
+    result: dict[str, Any] = {
+        "pages": len(pages),
+        "reviews": reviews_total,
+        "backend": backend,
+        "extract_seconds": round(best, 4),
+        "extract_reviews_per_sec": round(reviews_total / best, 1) if best else 0.0,
+    }
+
+    if database_url:
+        result.update(_benchmark_save(database_url, parsed))
+    else:
+        logger.info("База для замера записи не задана, save_reviews_batch пропущен")
+    return result
+
+
+def _benchmark_save(
+    database_url: str, parsed: list[list[dict[str, Any]]]
+) -> dict[str, Any]:
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    restaurants = []
+
+    try:
+        for _ in parsed:
+            restaurants.append(
+                create_restaurant(db, notion_id=f"bench-{uuid.uuid4()}", name="bench")
+            )
+
+        timings = {}
+        # Первый проход — все отзывы новые, второй — все уже известны
+        for label in ("save_new_seconds", "save_known_seconds"):
+            started = time.perf_counter()
+            for restaurant, reviews in zip(restaurants, parsed, strict=True):
+                save_reviews_batch(db, restaurant.id, reviews)
+            timings[label] = round(time.perf_counter() - started, 3)
+
+        reviews_total = sum(len(reviews) for reviews in parsed)
+        seconds = timings["save_new_seconds"]
+        timings["save_reviews_per_sec"] = (
+            round(reviews_total / seconds, 1) if seconds else 0.0
+        )
+        return timings
+
+    finally:
+        db.rollback()
+        for restaurant in restaurants:
+            db.delete(db.get(Restaurant, restaurant.id))
+        db.commit()
+        db.close()
+        engine.dispose()
+
+
+def compare_with_baseline(
+    results: dict[str, Any],
+    baseline: dict[str, Any],
+    tolerance: float = BENCH_TOLERANCE,
+    metrics: tuple[tuple[str, str], ...] = THROUGHPUT_METRICS,
+) -> list[str]:
+    """Метрики, упавшие больше чем на tolerance относительно базового замера"""
+    regressions = []
+    for section, metric in metrics:
+        current = results.get(section, {}).get(metric)
+        previous = baseline.get(section, {}).get(metric)
+        if current is None or not previous:
+            continue
+        if current < previous * (1 - tolerance):
+            regressions.append(
+                f"{section}.{metric}: {current} против {previous} "
+                f"({(current / previous - 1) * 100:+.0f}%)"
+            )
+    return regressions
+
+
+def run_benchmark(
+    fixtures_dir: str | Path = BENCH_FIXTURES_DIR,
+    max_reviews: int = DEFAULT_MAX_REVIEWS,
+    repeat: int = 1,
+    database_url: str | None = None,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+    browser: bool = True,
+) -> dict[str, Any]:
+    business_ids = list_fixtures(fixtures_dir)
+    if not business_ids:
+        return {"success": False, "error": f"В {fixtures_dir} нет фикстур"}
+
+    logger.info(f"Фикстур: {len(business_ids)}, повторов: {repeat}")
+    results: dict[str, Any] = {"success": True, "fixtures": len(business_ids)}
+
+    if browser:
+        with fixture_server(fixtures_dir) as base_url:
+            results["browser"] = benchmark_browser(
+                base_url, business_ids, max_reviews, blocking_profile, repeat
+            )
+
+    results["pipeline"] = benchmark_pipeline(
+        fixtures_dir, business_ids, database_url, repeat=max(repeat, 3)
+    )
+    return results
+
+
+def run_concurrency_benchmark(
+    fixtures_dir: str | Path = BENCH_FIXTURES_DIR,
+    concurrency: int = 4,
+    max_reviews: int = DEFAULT_MAX_REVIEWS,
+    repeat: int = 1,
+    blocking_profile: str = SCRAPER_BLOCKING_PROFILE,
+) -> dict[str, Any]:
+    """Вкладки одного браузера против браузера на ресторан на тех же фикстурах"""
+    business_ids = list_fixtures(fixtures_dir)
+    if not business_ids:
+        return {"success": False, "error": f"В {fixtures_dir} нет фикстур"}
+
+    logger.info(
+        f"Фикстур: {len(business_ids)}, повторов: {repeat}, "
+        f"одновременно: {concurrency}"
+    )
+    results: dict[str, Any] = {"success": True, "fixtures": len(business_ids)}
+    with fixture_server(fixtures_dir) as base_url:
+        for mode, tabs in (("browsers", False), ("tabs", True)):
+            results[mode] = benchmark_concurrency(
+                base_url,
+                business_ids,
+                concurrency,
+                tabs,
+                max_reviews,
+                blocking_profile,
+                repeat,
+            )
+    return results
+
+
+def log_concurrency_results(results: dict[str, Any]) -> None:
+    for mode in ("browsers", "tabs"):
+        result = results[mode]
+        memory = (
+            f"пик памяти {result['peak_memory_mb']:.0f} МБ, "
+            f"{result['restaurants_per_min_per_gb']} ресторанов/мин на ГБ"
+            if result["peak_memory_mb"]
+            else "память не измерена (нет psutil)"
+        )
+        logger.info(
+            f"{mode:<8} x{result['concurrency']}: "
+            f"{result['restaurants_per_min']} ресторанов/мин, {memory} "
+            f"(без отзывов: {result['failures']})"
+        )
+
+    browsers = results["browsers"]["restaurants_per_min_per_gb"]
+    tabs = results["tabs"]["restaurants_per_min_per_gb"]
+    if browsers and tabs:
+        logger.info(f"Вкладки / браузеры по ресторанам/мин на ГБ: {tabs / browsers:.2f}x")
+
+
+def log_results(results: dict[str, Any]) -> None:
+    browser = results.get("browser")
+    if browser:
+        logger.info(
+            f"Браузер: {browser['restaurants_per_min']} ресторанов/мин, "
+            f"{browser['reviews_per_sec']} отзывов/с "
+            f"({browser['restaurants']} страниц за {browser['seconds']}с, "
+            f"без отзывов: {browser['failures']})"
+        )
+        for phase, timing in browser["phases"].items():
+            logger.info(
+                f"  {phase:<16} p50 {timing['p50']:.3f}с / p95 {timing['p95']:.3f}с"
+            )
+
+    pipeline = results["pipeline"]
+    logger.info(
+        f"Разбор ({pipeline['backend']}): {pipeline['extract_reviews_per_sec']} "
+        f"отзывов/с на {pipeline['reviews']} отзывах"
+    )
+    if "save_reviews_per_sec" in pipeline:
+        logger.info(
+            f"Запись: {pipeline['save_reviews_per_sec']} отзывов/с "
+            f"(новые {pipeline['save_new_seconds']}с, "
+            f"известные {pipeline['save_known_seconds']}с)"
+        )
+
+
+def save_and_compare(
+    results: dict[str, Any],
+    output: str | None = None,
+    baseline: str | None = None,
+    tolerance: float = BENCH_TOLERANCE,
+    metrics: tuple[tuple[str, str], ...] = THROUGHPUT_METRICS,
+) -> list[str]:
+    """Сохранить результаты и сравнить с базовым замером; возвращает регрессии"""
+    if output:
+        Path(output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+        logger.info(f"Результаты сохранены в {output}")
+    if not baseline:
+        return []
+
+    previous = json.loads(Path(baseline).read_text(encoding="utf-8"))
+    regressions = compare_with_baseline(results, previous, tolerance, metrics)
+    for regression in regressions:
+        logger.warning(f"Регрессия: {regression}")
+    if not regressions:
+        logger.success(f"Регрессий относительно {baseline} нет")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк парсинга отзывов на записанных страницах"
+    )
+    parser.add_argument("--fixtures", default=BENCH_FIXTURES_DIR)
+    parser.add_argument("--max-reviews", type=int, default=DEFAULT_MAX_REVIEWS)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--database-url", help="Отдельная БД для замера записи")
+    parser.add_argument("--no-browser", action="store_true")
+    parser.add_argument(
+        "--export-snapshots",
+        action="store_true",
+        help="Перед замером разложить снимки страниц из SNAPSHOT_DIR в фикстуры",
+    )
+    parser.add_argument("--output", help="Сохранить результаты в JSON")
+    parser.add_argument("--baseline", help="JSON прошлого замера для сравнения")
+    parser.add_argument("--tolerance", type=float, default=BENCH_TOLERANCE)
+    parser.add_argument(
+        "--tabs",
+        type=int,
+        help="Сравнить N вкладок одного браузера с N браузерами вместо обычного замера",
+    )
+    parser.add_argument(
+        "--block-resources",
+        choices=list(BLOCKING_PROFILES),
+        default=SCRAPER_BLOCKING_PROFILE,
+        help="Профиль блокировки картинок, тайлов и трекеров в браузере",
+    )
+
+    args = parser.parse_args()
+
+    if args.tabs:
+        # Замер вкладок всегда идет в браузере и не пишет в БД
+        ignored = [
+            flag
+            for flag, value in (
+                ("--database-url", args.database_url),
+                ("--no-browser", args.no_browser),
+                ("--export-snapshots", args.export_snapshots),
+            )
+            if value
+        ]
+        if ignored:
+            parser.error(f"--tabs несовместим с {', '.join(ignored)}")
+
+        results = run_concurrency_benchmark(
+            args.fixtures,
+            args.tabs,
+            args.max_reviews,
+            args.repeat,
+            args.block_resources,
+        )
+        if not results["success"]:
+            logger.error(results["error"])
+            sys.exit(1)
+        log_concurrency_results(results)
+        regressions = save_and_compare(
+            results, args.output, args.baseline, args.tolerance, CONCURRENCY_METRICS
+        )
+        if regressions:
+            sys.exit(1)
+        return
+
+    if args.export_snapshots:
+        export_snapshot_fixtures(args.fixtures)
+
+    results = run_benchmark(
+        args.fixtures,
+        args.max_reviews,
+        args.repeat,
+        args.database_url,
+        args.block_resources,
+        browser=not args.no_browser,
+    )
+    if not results["success"]:
+        logger.error(results["error"])
+        sys.exit(1)
+
+    log_results(results)
+    if save_and_compare(results, args.output, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ import httpx
 
 from config.settings import settings
 from logger import logger
+from parsers.rate_limiter import rate_limiter
 
 
 async def get_coord_by_address(address: str) -> dict[str, Any] | None:
@@ -23,7 +24,10 @@ async def get_coord_by_address(address: str) -> dict[str, Any] | None:
     async with httpx.AsyncClient() as client:
         try:
             logger.info(f"Геокодирование адреса инициировано: '{address}'")
-            response = await client.get(url, params=params)
+            async with rate_limiter.slot_async(url) as slot:
+                response = await client.get(url, params=params)
+                if response.status_code == 429:
+                    slot.throttled()
             response.raise_for_status()
             data = response.json()
 
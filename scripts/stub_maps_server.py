@@ -0,0 +1,87 @@
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import re
+from urllib.parse import parse_qs, urlsplit
+
+from logger import logger
+from parsers.http_reviews_fetcher import FETCH_REVIEWS_PATH
+
+_BUSINESS_ID = re.compile(r"oid=(\d+)|/org/[^/]+/(\d+)")
+
+
+def make_handler(root: Path) -> type[BaseHTTPRequestHandler]:
+    """Обработчик, отдающий записанные ответы Яндекс.Карт
+
+    Раскладка каталога root:
+        <business_id>/page.html        — исходный HTML страницы места
+        <business_id>/reviews_<N>.json — N-я страница ответа fetchReviews
+    """
+
+    class RecordedMapsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802 — имя задает BaseHTTPRequestHandler
+            parts = urlsplit(self.path)
+            params = parse_qs(parts.query)
+
+            if parts.path == FETCH_REVIEWS_PATH:
+                business_id = params.get("businessId", [""])[0]
+                page = params.get("page", ["1"])[0]
+                self._send_file(
+                    root / business_id / f"reviews_{page}.json", "application/json"
+                )
+                return
+
+            match = _BUSINESS_ID.search(self.path)
+            if not match:
+                self.send_error(404)
+                return
+            business_id = match.group(1) or match.group(2)
+            self._send_file(root / business_id / "page.html", "text/html")
+
+        def _send_file(self, path: Path, content_type: str) -> None:
+            if not path.is_file():
+                self.send_error(404)
+                return
+            body = path.read_bytes()
+            self.send_response(200)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(f"stub: {format % args}")
+
+    return RecordedMapsHandler
+
+
+def serve(root: str, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """Создать сервер с записанными ответами (запуск — serve_forever)"""
+    return ThreadingHTTPServer((host, port), make_handler(Path(root)))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Локальная подмена Яндекс.Карт на записанных ответах"
+    )
+    parser.add_argument("root", help="Каталог с записанными ответами")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+
+    args = parser.parse_args()
+
+    server = serve(args.root, args.host, args.port)
+    logger.info(
+        f"Сервер запущен: http://{args.host}:{args.port} "
+        f"(YANDEX_MAPS_BASE_URL для парсера)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Остановлено пользователем")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+from collections.abc import Iterator
+from pathlib import Path
+import threading
+
+import pytest
+
+from scripts.stub_maps_server import serve
+
+
+@pytest.fixture
+def stub_maps(tmp_path: Path) -> Iterator[tuple[str, Path]]:
+    """Локальный сервер с записанными ответами: (базовый URL, каталог ответов)"""
+    server = serve(str(tmp_path), port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    try:
+        yield f"http://{host}:{port}", tmp_path
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,83 @@
+import json
+
+from scripts.bench_scraper import (
+    CONCURRENCY_METRICS,
+    _phase_summary,
+    compare_with_baseline,
+    list_fixtures,
+    save_and_compare,
+)
+
+BASELINE = {
+    "browser": {"restaurants_per_min": 10.0, "reviews_per_sec": 50.0},
+    "pipeline": {"extract_reviews_per_sec": 1000.0, "save_reviews_per_sec": 0},
+}
+
+
+def test_phase_summary():
+    summary = _phase_summary({"load": [float(value) for value in range(1, 21)]})
+
+    # Ближайший ранг, как в _phase_timings парсера
+    assert summary == {"load": {"p50": 10.0, "p95": 19.0, "count": 20}}
+
+
+def test_phase_summary_single_sample():
+    assert _phase_summary({"sort": [0.25]}) == {
+        "sort": {"p50": 0.25, "p95": 0.25, "count": 1}
+    }
+
+
+def test_drop_within_tolerance_is_not_a_regression():
+    results = {
+        "browser": {"restaurants_per_min": 8.5, "reviews_per_sec": 50.0},
+        "pipeline": {"extract_reviews_per_sec": 1200.0},
+    }
+
+    assert compare_with_baseline(results, BASELINE, tolerance=0.2) == []
+
+
+def test_drop_beyond_tolerance_is_reported():
+    results = {"browser": {"restaurants_per_min": 7.0, "reviews_per_sec": 50.0}}
+
+    assert compare_with_baseline(results, BASELINE, tolerance=0.2) == [
+        "browser.restaurants_per_min: 7.0 против 10.0 (-30%)"
+    ]
+
+
+def test_missing_or_zero_metrics_are_skipped():
+    results = {"pipeline": {"save_reviews_per_sec": 1.0}}
+
+    assert compare_with_baseline(results, BASELINE, tolerance=0.0) == []
+
+
+def test_tabs_benchmark_metrics():
+    baseline = {"browsers": {"restaurants_per_min": 10.0}, "tabs": {}}
+    results = {"browsers": {"restaurants_per_min": 5.0}, "tabs": {}}
+
+    assert compare_with_baseline(results, baseline, 0.2) == []
+    assert compare_with_baseline(results, baseline, 0.2, CONCURRENCY_METRICS) == [
+        "browsers.restaurants_per_min: 5.0 против 10.0 (-50%)"
+    ]
+
+
+def test_save_and_compare(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(BASELINE), encoding="utf-8")
+    output = tmp_path / "results.json"
+    results = {"browser": {"restaurants_per_min": 5.0}}
+
+    regressions = save_and_compare(results, str(output), str(baseline), 0.2)
+
+    assert json.loads(output.read_text(encoding="utf-8")) == results
+    assert len(regressions) == 1
+    assert save_and_compare(results, None, None) == []
+
+
+def test_list_fixtures(tmp_path):
+    for business_id in ("222", "111"):
+        (tmp_path / business_id).mkdir()
+        (tmp_path / business_id / "page.html").write_text("<html></html>")
+    (tmp_path / "empty").mkdir()
+
+    assert list_fixtures(tmp_path) == ["111", "222"]
+    assert list_fixtures(tmp_path / "missing") == []
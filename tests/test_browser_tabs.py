@@ -0,0 +1,172 @@
+import json
+import threading
+import time
+
+from selenium.webdriver.remote.command import Command
+
+from parsers.browser_tabs import TabPool, _target_id
+
+
+class FakeChrome:
+    """Драйвер без браузера: помнит активную вкладку и ловит параллельные команды"""
+
+    def __init__(self):
+        self.current_window_handle = "CDwindow-home"
+        self.window = self.current_window_handle
+        self.windows = [self.window]
+        self.opened = 0
+        self.visits: list[tuple[str, str]] = []
+        self.log: list[dict] = []
+        self.alive = True
+        # Вкладка закрывается, но сам браузер на команды уже не отвечает
+        self.session_lost = False
+        self.quit_called = False
+        self.overlaps = 0
+        self._busy = False
+
+    def execute(self, driver_command, params=None):
+        if self._busy:
+            self.overlaps += 1
+        self._busy = True
+        try:
+            # Окно для параллельной команды из другого потока
+            time.sleep(0.001)
+            return {"value": self._run(driver_command, params or {})}
+        finally:
+            self._busy = False
+
+    def _run(self, driver_command, params):
+        if not self.alive:
+            raise RuntimeError("chrome not reachable")
+        if driver_command == Command.NEW_WINDOW:
+            self.opened += 1
+            handle = f"CDwindow-tab{self.opened}"
+            self.windows.append(handle)
+            return {"handle": handle}
+        if driver_command == Command.SWITCH_TO_WINDOW:
+            self.window = params["handle"]
+        elif driver_command == Command.CLOSE:
+            self.windows.remove(self.window)
+        elif driver_command == Command.GET:
+            self.visits.append((self.window, params["url"]))
+            message = {"webview": _target_id(self.window), "message": {}}
+            self.log.append({"message": json.dumps(message)})
+        elif driver_command == Command.GET_LOG:
+            entries, self.log = self.log, []
+            return entries
+        elif driver_command == Command.W3C_EXECUTE_SCRIPT:
+            return True
+        elif driver_command == Command.W3C_GET_WINDOW_HANDLES:
+            if self.session_lost:
+                raise RuntimeError("session deleted")
+            return list(self.windows)
+        return None
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})
+
+    def execute_script(self, script, *args):
+        return self.execute(
+            Command.W3C_EXECUTE_SCRIPT, {"script": script, "args": list(args)}
+        )["value"]
+
+    def get_log(self, log_type):
+        return self.execute(Command.GET_LOG, {"type": log_type})["value"]
+
+    def quit(self):
+        self.quit_called = True
+
+
+def _pool(drivers, **kwargs):
+    def factory():
+        drivers.append(FakeChrome())
+        return drivers[-1]
+
+    return TabPool(factory, memory_limit_mb=None, **kwargs)
+
+
+def test_each_thread_commands_go_to_its_own_tab():
+    drivers: list[FakeChrome] = []
+    seen: dict[str, tuple[str, list]] = {}
+
+    def worker(pool, name):
+        driver = pool.acquire()
+        handle = pool._browser.handle
+        for page in range(3):
+            driver.get(f"http://stub/{name}/{page}")
+        seen[name] = (handle, driver.get_log("performance"))
+        pool.release(driver)
+
+    with _pool(drivers, size=4) as pool:
+        threads = [
+            threading.Thread(target=worker, args=(pool, f"r{i}")) for i in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert len(drivers) == 1
+    chrome = drivers[0]
+    assert chrome.overlaps == 0
+    for name, (handle, log) in seen.items():
+        urls = [url for window, url in chrome.visits if window == handle]
+        assert urls == [f"http://stub/{name}/{page}" for page in range(3)]
+        webviews = {json.loads(entry["message"])["webview"] for entry in log}
+        assert len(log) == 3
+        assert webviews == {_target_id(handle)}
+    assert chrome.windows == ["CDwindow-home"]
+    assert chrome.quit_called
+
+
+def test_broken_page_replaces_tab_in_live_browser():
+    drivers: list[FakeChrome] = []
+    with _pool(drivers, size=1) as pool:
+        driver = pool.acquire()
+        first_tab = pool._browser.handle
+        pool.release(driver, broken=True)
+
+        assert pool.acquire() is driver
+        assert pool._browser.handle != first_tab
+        assert drivers[0].windows == ["CDwindow-home", pool._browser.handle]
+        pool.release(driver)
+
+    assert len(drivers) == 1
+
+
+def test_broken_page_in_dead_browser_recycles_it():
+    drivers: list[FakeChrome] = []
+    with _pool(drivers, size=1) as pool:
+        driver = pool.acquire()
+        drivers[0].session_lost = True
+        pool.release(driver, broken=True)
+
+        assert drivers[0].quit_called
+        assert pool.acquire() is drivers[1]
+        pool.release(drivers[1])
+
+    assert len(drivers) == 2
+
+
+def test_failed_tab_close_recycles_browser():
+    drivers: list[FakeChrome] = []
+    with _pool(drivers, size=1) as pool:
+        driver = pool.acquire()
+        drivers[0].alive = False
+        pool.release(driver)
+
+        assert drivers[0].quit_called
+        assert pool.acquire() is drivers[1]
+        pool.release(drivers[1])
+
+
+def test_browser_recycled_after_max_pages():
+    drivers: list[FakeChrome] = []
+    with _pool(drivers, size=2, max_pages=2) as pool:
+        for _ in range(3):
+            driver = pool.acquire()
+            driver.get("http://stub/page")
+            pool.release(driver)
+
+    assert len(drivers) == 2
+    assert drivers[0].quit_called
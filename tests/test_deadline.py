@@ -0,0 +1,62 @@
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+from parsers import ya_maps_reviews_parser as parser
+from parsers.deadline import deadline_scope
+
+
+class SlowDriver:
+    """Страница, которая не успевает загрузиться: ожидание шапки съедает бюджет"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.urls = []
+        self.scripts = []
+
+    def get_log(self, log_type):
+        assert log_type == "performance"
+        return []
+
+    def set_page_load_timeout(self, time_to_wait):
+        assert time_to_wait >= 1.0
+
+    def get(self, url):
+        self.urls.append(url)
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        time.sleep(self.delay)
+        raise WebDriverException("tab crashed")
+
+
+class FakePool:
+    def __init__(self, driver):
+        self.driver = driver
+        self.released = []
+
+    def acquire(self):
+        return self.driver
+
+    def release(self, driver, broken=False, memory_mb=None):
+        self.released.append((driver, broken, memory_mb))
+
+
+def test_deadline_expired_during_wait_is_reported_as_deadline(monkeypatch):
+    # Последняя попытка: без проверки бюджета это был бы обычный сбой страницы
+    monkeypatch.setattr(parser, "MAX_RETRY_ATTEMPTS", 1)
+    driver = SlowDriver(delay=0.1)
+    pool = FakePool(driver)
+    stats = {}
+
+    with deadline_scope(0.05):
+        reviews = parser.parse_yandex_reviews(
+            "http://stub/maps/org/1/reviews/", pool=pool, stats=stats
+        )
+
+    assert reviews == []
+    assert driver.urls == ["http://stub/maps/org/1/reviews/"]
+    assert stats["deadline_exceeded"] is True
+    assert stats["partial"] is True
+    assert len(driver.scripts) == 1
+    assert pool.released == [(driver, True, None)]
@@ -0,0 +1,54 @@
+from parsers import ya_maps_reviews_parser as parser
+from parsers.deadline import DEFERRED_TIME_BUDGET
+
+
+def _fake_results(first: dict, retry: dict):
+    calls = []
+
+    def iter_results(restaurants, parse_options, **_kwargs):
+        calls.append((list(restaurants), parse_options.get("time_budget")))
+        results = retry if len(calls) > 1 else first
+        for notion_id, _name in restaurants:
+            yield notion_id, results[notion_id]
+
+    return iter_results, calls
+
+
+def test_deferred_restaurant_yields_only_final_result(monkeypatch):
+    first = {
+        "a": {"success": True, "reviews_found": 3, "reviews_new": 3},
+        "b": {
+            "success": True,
+            "deadline_exceeded": True,
+            "reviews_found": 5,
+            "reviews_new": 5,
+        },
+    }
+    retry = {"b": {"success": True, "reviews_found": 20, "reviews_new": 15}}
+    iter_results, calls = _fake_results(first, retry)
+    monkeypatch.setattr(parser, "_iter_restaurant_results", iter_results)
+
+    results = list(
+        parser._iter_with_deferred_pass([("a", "Кафе"), ("b", "Бар")], {})
+    )
+
+    assert [notion_id for notion_id, _ in results] == ["a", "b"]
+    assert calls[1] == ([("b", "Бар")], DEFERRED_TIME_BUDGET)
+
+    counters = parser._new_run_counters()
+    for _, result in results:
+        parser._tally_result(counters, result)
+    assert counters["success"] == 2
+    assert counters["deferred"] == 0
+    assert counters["new_reviews"] == 3 + 5 + 15
+
+
+def test_no_retry_pass_without_deferred(monkeypatch):
+    first = {"a": {"success": False, "error": "boom"}}
+    iter_results, calls = _fake_results(first, {})
+    monkeypatch.setattr(parser, "_iter_restaurant_results", iter_results)
+
+    results = list(parser._iter_with_deferred_pass([("a", "Кафе")], {}))
+
+    assert results == [("a", first["a"])]
+    assert len(calls) == 1
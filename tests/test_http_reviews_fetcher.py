@@ -0,0 +1,110 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from parsers.http_reviews_fetcher import HttpReviewsFetcher
+
+BUSINESS_ID = "1234567890"
+PLACE_URL = f"https://yandex.ru/maps/org/cafe/{BUSINESS_ID}/reviews/"
+
+# Карточки в исходном HTML идут по релевантности, а не по новизне
+PAGE_HTML = f"""
+<html><body>
+<script>{{"businessId":"{BUSINESS_ID}","csrfToken":"token"}}</script>
+<div class="business-reviews-card-view__review">
+  <span itemprop="name">Старый популярный</span>
+  <span class="business-review-view__date">
+    <meta itemprop="datePublished" content="2020-01-01T00:00:00.000Z">
+  </span>
+  <span class="spoiler-view__text-container">Релевантный отзыв</span>
+</div>
+</body></html>
+"""
+
+
+def _api_review(number: int) -> dict:
+    return {
+        "reviewId": f"review-{number}",
+        "author": {"name": f"Автор {number}", "publicId": f"public-id-{number}"},
+        "rating": 5,
+        "text": f"Отзыв {number}",
+        "updatedTime": f"2024-05-{30 - number:02d}T10:00:00.000Z",
+    }
+
+
+def _write_place(root: Path, pages: list[list[int]]) -> None:
+    place = root / BUSINESS_ID
+    place.mkdir()
+    (place / "page.html").write_text(PAGE_HTML, encoding="utf-8")
+    for number, reviews in enumerate(pages, 1):
+        payload = {
+            "data": {
+                "reviews": [_api_review(review) for review in reviews],
+                "params": {"totalPages": len(pages)},
+            }
+        }
+        (place / f"reviews_{number}.json").write_text(
+            json.dumps(payload), encoding="utf-8"
+        )
+
+
+@pytest.fixture
+def fetcher(stub_maps):
+    base_url, _ = stub_maps
+    with HttpReviewsFetcher(base_url=base_url) as fetcher:
+        yield fetcher
+
+
+def test_reviews_come_from_api_sorted_by_time(stub_maps, fetcher):
+    _write_place(stub_maps[1], [[1, 2], [3, 4]])
+
+    reviews = fetcher.fetch(PLACE_URL)
+
+    assert [review["text"] for review in reviews] == [
+        "Отзыв 1",
+        "Отзыв 2",
+        "Отзыв 3",
+        "Отзыв 4",
+    ]
+
+
+def test_small_max_reviews_does_not_use_relevance_ordered_html(stub_maps, fetcher):
+    _write_place(stub_maps[1], [[1, 2]])
+
+    reviews = fetcher.fetch(PLACE_URL, max_reviews=1)
+
+    assert [review["text"] for review in reviews] == ["Отзыв 1"]
+
+
+def test_without_api_response_browser_is_needed(stub_maps, fetcher):
+    _write_place(stub_maps[1], [])
+
+    assert fetcher.fetch(PLACE_URL) is None
+
+
+def test_missing_next_page_falls_back_to_browser(stub_maps, fetcher):
+    _write_place(stub_maps[1], [[1, 2], [3, 4]])
+    (stub_maps[1] / BUSINESS_ID / "reviews_2.json").unlink()
+
+    assert fetcher.fetch(PLACE_URL) is None
+
+
+def test_incremental_stops_on_known_reviews(stub_maps, fetcher):
+    _write_place(stub_maps[1], [[1, 2, 3, 4, 5]])
+    known = {review["yandex_review_id"] for review in fetcher.fetch(PLACE_URL)[2:]}
+
+    reviews = fetcher.fetch(PLACE_URL, known_review_ids=known, stop_after=2)
+
+    assert [review["text"] for review in reviews] == [
+        "Отзыв 1",
+        "Отзыв 2",
+        "Отзыв 3",
+        "Отзыв 4",
+    ]
+
+
+def test_unchanged_header_skips_reviews(stub_maps, fetcher):
+    _write_place(stub_maps[1], [[1]])
+
+    assert fetcher.fetch(PLACE_URL, header_check=lambda _header: True) == []
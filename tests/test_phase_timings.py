@@ -0,0 +1,47 @@
+from parsers.ya_maps_reviews_parser import (
+    _new_run_counters,
+    _percentile,
+    _phase_timings,
+    _result_status,
+    _tally_result,
+)
+
+
+def test_percentile_nearest_rank():
+    values = [float(value) for value in range(1, 21)]
+
+    assert _percentile(values, 50) == 10.0
+    assert _percentile(values, 95) == 19.0
+    assert _percentile(values, 100) == 20.0
+    assert _percentile([3.0], 95) == 3.0
+
+
+def test_percentile_does_not_depend_on_order():
+    assert _percentile([5.0, 1.0, 3.0, 2.0, 4.0], 50) == 3.0
+
+
+def test_phase_timings_from_tallied_results():
+    counters = _new_run_counters()
+    for seconds in (1.0, 2.0, 3.0, 4.0):
+        result = {
+            "success": True,
+            "scrape_stats": {"phases": {"page_load": seconds, "scroll": seconds * 10}},
+        }
+        _tally_result(counters, result)
+
+    assert _phase_timings(counters) == {
+        "page_load": {"p50": 2.0, "p95": 4.0, "count": 4},
+        "scroll": {"p50": 20.0, "p95": 40.0, "count": 4},
+    }
+
+
+def test_phase_timings_empty_run():
+    assert _phase_timings(_new_run_counters()) == {}
+
+
+def test_result_status():
+    assert _result_status({"success": True}) == "success"
+    assert _result_status({"success": True, "warning": "нет отзывов"}) == "warning"
+    assert _result_status({"success": False, "skip": True}) == "skipped"
+    assert _result_status({"success": True, "deadline_exceeded": True}) == "deferred"
+    assert _result_status({"success": False}) == "error"
@@ -0,0 +1,95 @@
+import asyncio
+import time
+
+import pytest
+
+from parsers import rate_limiter as rl
+from parsers.deadline import DeadlineExceededError, deadline_scope
+
+
+def test_ok_grows_concurrency_and_rate_up_to_limits():
+    limiter = rl.HostRateLimiter("yandex.ru", rate=2.0, max_concurrency=3)
+    limiter.rate = 1.0
+
+    for _ in range(50):
+        limiter.release("ok")
+
+    assert limiter.concurrency == 3
+    assert limiter.rate == 2.0
+
+
+def test_throttled_halves_limits_and_pauses_host():
+    limiter = rl.HostRateLimiter("yandex.ru", rate=10.0, max_concurrency=8)
+    limiter.concurrency = 8.0
+
+    limiter.release("throttled")
+
+    assert limiter.concurrency == 8 * rl.RATE_LIMIT_DECREASE
+    assert limiter.rate == 10 * rl.RATE_LIMIT_DECREASE
+    assert limiter.paused_until > time.monotonic()
+    assert limiter._reserve() > 0
+
+
+def test_throttled_does_not_go_below_floor():
+    limiter = rl.HostRateLimiter("yandex.ru", rate=10.0, max_concurrency=8)
+
+    for _ in range(20):
+        limiter.release("throttled")
+
+    assert limiter.concurrency == 1.0
+    assert limiter.rate == pytest.approx(10 * rl.RATE_LIMIT_MIN_FRACTION)
+
+
+def test_error_keeps_limits():
+    limiter = rl.HostRateLimiter("yandex.ru", rate=5.0, max_concurrency=4)
+    limiter.concurrency = 2.0
+
+    limiter.release("error")
+
+    assert (limiter.concurrency, limiter.rate, limiter.paused_until) == (2.0, 5.0, 0.0)
+
+
+def test_reserve_waits_for_free_slot():
+    limiter = rl.HostRateLimiter("yandex.ru", rate=100.0, max_concurrency=4)
+
+    assert limiter._reserve() == 0.0
+    assert limiter._reserve() == rl.RATE_LIMIT_POLL_INTERVAL
+
+    limiter.release("error")
+    assert limiter._reserve() == 0.0
+
+
+def test_share_divides_limits_between_workers():
+    limiter = rl.RateLimiter(
+        {"yandex.ru": (1.0, 4), "suggest-maps.yandex.ru": (10.0, 1)}
+    )
+    before = limiter.for_url("https://yandex.ru/maps/")
+
+    limiter.share(4)
+
+    after = limiter.for_url("https://yandex.ru/maps/")
+    assert after is not before
+    assert (after.max_rate, after.max_concurrency) == (0.25, 1)
+    suggest = limiter.for_url("https://suggest-maps.yandex.ru/v1/suggest")
+    assert (suggest.max_rate, suggest.max_concurrency) == (2.5, 1)
+    assert limiter.for_url("http://127.0.0.1:8765/") is None
+
+
+def test_acquire_respects_deadline():
+    limiter = rl.HostRateLimiter("yandex.ru", rate=1.0, max_concurrency=1)
+    limiter.paused_until = time.monotonic() + 60
+
+    with deadline_scope(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceededError):
+            limiter.acquire()
+
+
+def test_acquire_async_respects_deadline():
+    limiter = rl.HostRateLimiter("yandex.ru", rate=1.0, max_concurrency=1)
+    limiter.paused_until = time.monotonic() + 60
+
+    with deadline_scope(0.01):
+        time.sleep(0.02)
+        with pytest.raises(DeadlineExceededError):
+            asyncio.run(limiter.acquire_async())
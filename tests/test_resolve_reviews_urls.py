@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+from parsers import ya_maps_reviews_parser as parser
+
+
+class FakeSession:
+    def __init__(self):
+        self.committed = False
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        raise AssertionError("rollback не ожидался")
+
+
+def _restaurant(notion_id: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        notion_id=notion_id,
+        name=f"Место {notion_id}",
+        address="Москва",
+        latitude=55.75,
+        longitude=37.61,
+        yandex_url_status="unknown",
+        yandex_maps_url=None,
+    )
+
+
+def test_not_found_places_are_passed_through(monkeypatch):
+    queried = []
+
+    async def resolve(places, concurrency):
+        queried.extend(notion_id for notion_id, _name, _coordinates in places)
+        assert concurrency >= 1
+        return {
+            "found": ("https://yandex.ru/maps/org/found/1/reviews/", True),
+            "missing": (None, True),
+            "failed": (None, False),
+        }
+
+    monkeypatch.setattr(parser, "_resolve_urls_concurrently", resolve)
+    restaurants = [
+        _restaurant(notion_id) for notion_id in ("found", "missing", "failed")
+    ]
+    db = FakeSession()
+
+    resolved = parser.resolve_reviews_urls(db, restaurants)
+
+    assert queried == ["found", "missing", "failed"]
+    # "failed" нет в результате: после ошибки API место ищется еще раз
+    assert resolved == {
+        "found": "https://yandex.ru/maps/org/found/1/reviews/",
+        "missing": None,
+    }
+    assert restaurants[0].yandex_maps_url == resolved["found"]
+    assert restaurants[1].yandex_maps_url is None
+    assert db.committed
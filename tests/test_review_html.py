@@ -0,0 +1,156 @@
+import pytest
+
+from parsers.review_html import (
+    build_review_from_json,
+    parse_place_header,
+    parse_review_cards,
+)
+
+BACKENDS = ["html.parser", "lxml", "selectolax"]
+
+PAGE_HTML = """
+<html><body>
+<div itemprop="aggregateRating">
+  <meta itemprop="ratingValue" content="4,6">
+  <meta itemprop="reviewCount" content="1 234">
+</div>
+<div class="business-reviews-card-view__review">
+  <div class="business-review-view__author-container">
+    <a href="/maps/user/abcdef123456/reviews/"><span itemprop="name">Иван</span></a>
+  </div>
+  <div class="business-rating-badge-view__stars" aria-label="Оценка 5 Из 5"></div>
+  <span class="business-review-view__date">
+    <meta itemprop="datePublished" content="2024-05-20T10:00:00.000Z">
+    20 мая
+  </span>
+  <span class="spoiler-view__text-container">Отличный <b>кофе</b></span>
+</div>
+<div class="business-reviews-card-view__review">
+  <div class="user-icon-view__icon"
+    style='background-image: url("https://avatars.mds.yandex.net/get-yapic/12345/x/islands-68")'>
+  </div>
+  <div class="business-review-view__author-name">Ольга</div>
+  <span class="business-rating-badge-view__star _full"></span>
+  <span class="business-rating-badge-view__star _full"></span>
+  <span class="business-rating-badge-view__star _full"></span>
+  <span class="business-rating-badge-view__star _empty"></span>
+  <span class="business-review-view__date">2024-04-01</span>
+  <div class="business-review-view__body">Долго ждали</div>
+  <script>"не текст отзыва"</script>
+</div>
+<div class="business-reviews-card-view__review"></div>
+</body></html>
+"""
+
+EXPECTED_CARDS = [
+    {
+        "author": "Иван",
+        "yandex_review_id": "abcdef123456",
+        "rating": 5,
+        "text": "Отличныйкофе",
+        "date_iso": "2024-05-20T10:00:00.000Z",
+    },
+    {
+        "author": "Ольга",
+        "yandex_review_id": "12345_2024-04-01",
+        "rating": 3,
+        "text": "Долго ждали",
+        "date_iso": "2024-04-01",
+    },
+    {
+        "author": "Аноним",
+        "yandex_review_id": "Аноним_Дата не ук",
+        "rating": 0,
+        "text": "Нет текста",
+        "date_iso": "Дата не указана",
+    },
+]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_review_cards_parsed_the_same_by_every_backend(backend):
+    assert parse_review_cards(PAGE_HTML, backend=backend) == EXPECTED_CARDS
+
+
+def test_page_without_cards():
+    assert parse_review_cards("<html><body></body></html>") == []
+
+
+def test_place_header():
+    assert parse_place_header(PAGE_HTML) == {"rating": 4.6, "review_count": 1234}
+
+
+def _json_review(**fields) -> dict:
+    return {
+        "reviewId": "aBcD1234-review",
+        "author": {"name": "Мария", "publicId": "public-id-42"},
+        "rating": 4,
+        "text": "Хороший кофе",
+        "updatedTime": "2024-05-20T10:00:00.000Z",
+        **fields,
+    }
+
+
+def test_json_review_uses_the_html_id_scheme():
+    assert build_review_from_json(_json_review()) == {
+        "author": "Мария",
+        "yandex_review_id": "public-id-42",
+        "rating": 4,
+        "text": "Хороший кофе",
+        "date_iso": "2024-05-20T10:00:00.000Z",
+    }
+
+
+def test_json_review_without_author_id_uses_name_and_date():
+    review = build_review_from_json(_json_review(author={"name": "Мария"}))
+
+    assert review["yandex_review_id"] == "Мария_2024-05-20"
+
+
+def _html_card(profile: str) -> str:
+    return f"""
+<div class="business-reviews-card-view__review">
+  <div class="business-review-view__author-container">{profile}
+    <span itemprop="name">Мария</span>
+  </div>
+  <div class="business-rating-badge-view__stars" aria-label="Оценка 4 Из 5"></div>
+  <span class="business-review-view__date">
+    <meta itemprop="datePublished" content="2024-05-20T10:00:00.000Z">
+  </span>
+  <span class="spoiler-view__text-container">Хороший кофе</span>
+</div>
+"""
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize(
+    ("author", "profile"),
+    [
+        (
+            {"name": "Мария", "publicId": "public-id-42"},
+            '<a href="/maps/user/public-id-42/"></a>',
+        ),
+        ({"name": "Мария"}, ""),
+    ],
+)
+def test_same_review_gets_same_id_from_json_and_html(backend, author, profile):
+    from_json = build_review_from_json(_json_review(author=author))
+    (from_html,) = parse_review_cards(_html_card(profile), backend=backend)
+
+    assert from_json == from_html
+
+
+def test_json_review_defaults_for_missing_fields():
+    review = build_review_from_json({"reviewId": "r1"})
+
+    assert review == {
+        "author": "Аноним",
+        "yandex_review_id": "Аноним_Дата не ук",
+        "rating": 0,
+        "text": "Нет текста",
+        "date_iso": "Дата не указана",
+    }
+
+
+def test_broken_json_review_is_skipped():
+    assert build_review_from_json(_json_review(rating="пять")) is None
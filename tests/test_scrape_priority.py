@@ -0,0 +1,96 @@
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from parsers import scrape_priority
+from parsers.scrape_priority import (
+    NEVER_SCRAPED_SCORE,
+    PRIORITY_FAILURE_PENALTY,
+    PRIORITY_MAX_STALE_DAYS,
+    PRIORITY_MIN_DAILY_RATE,
+    order_by_priority,
+    priority_score,
+)
+
+
+def test_score_is_expected_new_reviews():
+    assert priority_score(2.0, 10) == pytest.approx(20.0)
+
+
+def test_never_scraped_goes_first():
+    assert priority_score(0.0, None) == NEVER_SCRAPED_SCORE
+    assert priority_score(0.0, None) > priority_score(100.0, PRIORITY_MAX_STALE_DAYS)
+
+
+def test_quiet_place_gets_minimum_rate():
+    assert priority_score(0.0, 10) == pytest.approx(PRIORITY_MIN_DAILY_RATE * 10)
+
+
+def test_staleness_is_capped():
+    capped = priority_score(1.0, PRIORITY_MAX_STALE_DAYS)
+
+    assert priority_score(1.0, PRIORITY_MAX_STALE_DAYS * 10) == capped
+
+
+def test_each_failure_lowers_priority():
+    healthy = priority_score(1.0, 10)
+
+    assert priority_score(1.0, 10, consecutive_failures=2) == pytest.approx(
+        healthy * PRIORITY_FAILURE_PENALTY**2
+    )
+
+
+def test_order_by_priority(monkeypatch):
+    now = datetime.now(UTC)
+    restaurants = [
+        SimpleNamespace(
+            id=1, name="Тихое", yandex_url_status="ok", yandex_url_last_checked=None
+        ),
+        SimpleNamespace(
+            id=2,
+            name="Новое",
+            yandex_url_status="unknown",
+            yandex_url_last_checked=None,
+        ),
+        SimpleNamespace(
+            id=3,
+            name="Популярное",
+            yandex_url_status="ok",
+            yandex_url_last_checked=None,
+        ),
+        SimpleNamespace(
+            id=4,
+            name="Старая история",
+            yandex_url_status="ok",
+            # Без часового пояса, как в старых записях
+            yandex_url_last_checked=(now - timedelta(days=30)).replace(tzinfo=None),
+        ),
+    ]
+    states = {
+        1: SimpleNamespace(
+            last_success_at=now - timedelta(days=5), consecutive_failures=0
+        ),
+        3: SimpleNamespace(
+            last_success_at=now - timedelta(days=5), consecutive_failures=0
+        ),
+    }
+    monkeypatch.setattr(scrape_priority, "get_scrape_states", lambda _db, _ids: states)
+    monkeypatch.setattr(
+        scrape_priority,
+        "get_recent_review_counts",
+        lambda _db, _ids, _since: {3: 90, 4: 9},
+    )
+
+    ordered = order_by_priority(None, restaurants)
+
+    assert [r.name for r in ordered] == [
+        "Новое",
+        "Популярное",
+        "Старая история",
+        "Тихое",
+    ]
+
+
+def test_order_nothing():
+    assert order_by_priority(None, []) == []
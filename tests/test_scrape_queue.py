@@ -0,0 +1,127 @@
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+from database.crud import enqueue_scrape_items
+from database.models import ScrapeQueueItem
+from parsers import ya_maps_reviews_parser as parser
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Сессия без БД: запоминает запросы и отвечает заданными строками RETURNING"""
+
+    def __init__(self, inserted_ids=()):
+        self.inserted_ids = list(inserted_ids)
+        self.statements = []
+        self.committed = False
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult([(item_id,) for item_id in self.inserted_ids])
+
+    def commit(self):
+        self.committed = True
+
+    def close(self):
+        pass
+
+
+def test_active_items_have_partial_unique_index():
+    (index,) = ScrapeQueueItem.__table__.indexes
+
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+
+    assert ddl == (
+        "CREATE UNIQUE INDEX unique_active_scrape_item ON scrape_queue (notion_id) "
+        "WHERE status IN ('queued', 'leased')"
+    )
+
+
+def test_enqueue_skips_conflicts_with_active_items():
+    # Одна из двух строк уже активна и пропущена ON CONFLICT
+    db = FakeSession(inserted_ids=[7])
+
+    added = enqueue_scrape_items(db, [("a", 1.0), ("b", 0.5), ("a", 2.0)])
+
+    (statement,) = db.statements
+    compiled = statement.compile(dialect=postgresql.dialect())
+    assert (
+        "ON CONFLICT (notion_id) WHERE status IN ('queued', 'leased') DO NOTHING"
+        in str(compiled)
+    )
+    notion_ids = [
+        value for name, value in compiled.params.items() if name.startswith("notion_id")
+    ]
+    assert sorted(notion_ids) == ["a", "b"]
+    assert compiled.params["priority_m0"] == 2.0
+    assert added == 1
+    assert db.committed
+
+
+def test_enqueue_nothing():
+    db = FakeSession()
+
+    assert enqueue_scrape_items(db, []) == 0
+    assert db.statements == []
+
+
+class LostLease:
+    """LeaseHeartbeat, у которого задание перехватил другой воркер"""
+
+    def __init__(self, item_id, worker_id):
+        self.item_id = item_id
+        self.worker_id = worker_id
+        self.lost = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.lost = True
+
+
+def test_worker_skips_writes_for_lost_lease(monkeypatch):
+    items = [SimpleNamespace(id=5, notion_id="n1", attempts=1)]
+    parsed = []
+    completed = []
+
+    def parse(notion_id, **options):
+        parsed.append((notion_id, options["save_snapshots"]))
+        return {"success": True, "new_reviews": 3}
+
+    monkeypatch.setattr(parser, "init_db", lambda: None)
+    monkeypatch.setattr(parser, "SessionLocal", lambda: FakeSession())
+    monkeypatch.setattr(parser, "_open_http_fetcher", nullcontext)
+    monkeypatch.setattr(parser, "fail_exhausted_scrape_items", lambda *_: 0)
+    monkeypatch.setattr(
+        parser, "claim_scrape_item", lambda *_: items.pop() if items else None
+    )
+    monkeypatch.setattr(parser, "LeaseHeartbeat", LostLease)
+    monkeypatch.setattr(parser, "parse_and_save_reviews", parse)
+    monkeypatch.setattr(
+        parser,
+        "get_restaurant_by_notion_id",
+        lambda *_: pytest.fail("метрики потерянного задания не пишутся"),
+    )
+    monkeypatch.setattr(
+        parser, "complete_scrape_item", lambda *args, **_: completed.append(args)
+    )
+
+    result = parser.run_reviews_queue_worker(
+        save_snapshots=False, worker_id="w1", exit_when_empty=True
+    )
+
+    assert parsed == [("n1", False)]
+    assert completed == []
+    assert result["processed_successfully"] == 0
@@ -0,0 +1,35 @@
+import math
+
+from parsers.ya_maps_reviews_parser import (
+    SCROLL_MAX_ATTEMPTS,
+    SCROLL_STALL_LIMIT,
+    _scroll_budget,
+)
+
+
+def test_without_statistics_scrolls_up_to_the_cap():
+    assert _scroll_budget(100, 5) == max(5, SCROLL_MAX_ATTEMPTS)
+    assert _scroll_budget(100, 5, cards_per_scroll=0) == max(5, SCROLL_MAX_ATTEMPTS)
+
+
+def test_all_reviews_scroll_up_to_the_cap():
+    assert _scroll_budget(-1, 5, cards_per_scroll=10.0) == max(5, SCROLL_MAX_ATTEMPTS)
+
+
+def test_budget_from_cards_per_scroll():
+    needed = math.ceil(100 / 10.0) + SCROLL_STALL_LIMIT
+
+    assert _scroll_budget(100, 1, cards_per_scroll=10.0) == min(
+        needed, SCROLL_MAX_ATTEMPTS
+    )
+
+
+def test_scroll_attempts_is_the_minimum():
+    assert _scroll_budget(10, 30, cards_per_scroll=50.0) == 30
+
+
+def test_budget_is_capped():
+    assert _scroll_budget(10_000, 1, cards_per_scroll=1.0) == SCROLL_MAX_ATTEMPTS
+    assert _scroll_budget(10_000, 100, cards_per_scroll=1.0) == max(
+        100, SCROLL_MAX_ATTEMPTS
+    )
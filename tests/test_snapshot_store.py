@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import zstandard
+
+from parsers import snapshot_store
+from parsers.snapshot_store import SnapshotStore
+
+THREADS = 4
+ZstdCompressor = zstandard.ZstdCompressor
+
+
+class RacingCompressor:
+    """Сжатие заканчивается у всех потоков одновременно: все пишут один объект"""
+
+    barrier = threading.Barrier(THREADS)
+
+    def __init__(self, level):
+        self.compressor = ZstdCompressor(level=level)
+
+    def compress(self, data):
+        compressed = self.compressor.compress(data)
+        self.barrier.wait(timeout=5)
+        return compressed
+
+
+def test_same_page_saved_from_many_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshot_store.zstandard, "ZstdCompressor", RacingCompressor)
+    store = SnapshotStore(tmp_path)
+    html = "<html><body>" + "отзыв " * 1000 + "</body></html>"
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        digests = list(
+            executor.map(
+                lambda run: store.save("n1", f"run{run}", html), range(THREADS)
+            )
+        )
+
+    assert len(set(digests)) == 1
+    files = [path.name for path in (tmp_path / "objects").rglob("*") if path.is_file()]
+    assert files == [f"{digests[0]}.html.zst"]
+    assert len(store.refs("n1")) == THREADS
+    monkeypatch.undo()
+    assert store.load(digests[0]) == html